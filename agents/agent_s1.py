@@ -1,6 +1,11 @@
 import os
 from neuro_lattice.llm_interface import with_brand_context
+from neuro_lattice.provider_stream import stream_brand_context
 
 def respond(context, brand_data):  # fast proposal
     provider = os.environ.get("S1_PROVIDER", "codex")
     return with_brand_context(provider, f"S1 (fast, visual/somatic): {context}", brand_data)
+
+def stream(context, brand_data):  # same prompt as respond, yielded as it arrives
+    provider = os.environ.get("S1_PROVIDER", "codex")
+    return stream_brand_context(provider, f"S1 (fast, visual/somatic): {context}", brand_data)
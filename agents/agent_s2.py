@@ -1,6 +1,11 @@
 import os
 from neuro_lattice.llm_interface import with_brand_context
+from neuro_lattice.provider_stream import stream_brand_context
 
 def respond(context, brand_data, provider: str | None = None):  # reflective critique
     actual_provider = provider or os.environ.get("S2_PROVIDER", "codex")
     return with_brand_context(actual_provider, f"S2 (ethical, social-moral, linguistic): {context}", brand_data)
+
+def stream(context, brand_data, provider: str | None = None):  # same prompt as respond, yielded as it arrives
+    provider = provider or os.environ.get("S2_PROVIDER", "codex")
+    return stream_brand_context(provider, f"S2 (ethical, social-moral, linguistic): {context}", brand_data)
@@ -0,0 +1,198 @@
+# agents/bus_writer.py
+"""Buffered, rotating, append-only writer for the lattice message bus.
+
+Messages are buffered and written in batches to segment files under
+``<root>/<session>/``; segments rotate by size and age. Each segment is either
+JSON lines (``.jsonl``) or length-prefixed frames (``.bin``: a 4-byte
+big-endian length followed by the UTF-8 JSON payload).
+
+``LATTICE_BUS_DIR`` sets the default root (``/tmp/lattice_bus``).
+"""
+from __future__ import annotations
+
+import itertools
+import json
+import os
+import struct
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator
+
+DEFAULT_BUS_DIR = "/tmp/lattice_bus"
+FSYNC_POLICIES = ("never", "batch", "always")
+_FRAME = struct.Struct(">I")
+_SUFFIX = {"jsonl": ".jsonl", "binary": ".bin"}
+_sessions = itertools.count(1)
+
+
+def bus_dir() -> Path:
+    return Path(os.environ.get("LATTICE_BUS_DIR", DEFAULT_BUS_DIR))
+
+
+def new_session_id() -> str:
+    """``<timestamp>-<pid>-<n>``; ``n`` keeps writers of one process in the same second apart."""
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{next(_sessions):04d}"
+
+
+class BusWriter:
+    """Append-only bus writer with batching, an fsync policy and segment rotation.
+
+    Parameters
+    ----------
+    root:
+        Bus directory; defaults to ``LATTICE_BUS_DIR``.
+    session:
+        Session name; each session writes its own segment directory.
+    framing:
+        ``"jsonl"`` or ``"binary"`` (length-prefixed frames).
+    batch_size, flush_interval:
+        Buffered messages are written once ``batch_size`` are pending or
+        ``flush_interval`` seconds have passed since the last write. Both are
+        checked on :meth:`post` only (there is no background timer), so a
+        caller that goes idle should :meth:`flush` at its own boundaries.
+    fsync:
+        ``"never"`` (leave it to the OS), ``"batch"`` (after every write) or
+        ``"always"`` (every message is written and synced immediately).
+    max_bytes, max_age:
+        Rotate to a new segment once the current one reaches this size (bytes)
+        or age (seconds).
+    """
+
+    def __init__(
+        self,
+        root: str | Path | None = None,
+        session: str | None = None,
+        framing: str = "jsonl",
+        batch_size: int = 64,
+        flush_interval: float = 1.0,
+        fsync: str = "never",
+        max_bytes: int = 64 << 20,
+        max_age: float = 3600.0,
+    ):
+        if framing not in _SUFFIX:
+            raise ValueError(f"Unsupported framing: {framing}")
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unsupported fsync policy: {fsync}")
+        self.session = session or new_session_id()
+        self.directory = Path(root or bus_dir()) / self.session
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.framing = framing
+        self.batch_size = 1 if fsync == "always" else max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._buffer: list[bytes] = []
+        self._last_flush = time.monotonic()
+        self._file = None
+        self._index = len(self.segments)
+        self.messages = 0
+
+    # ------------------------------------------------------------------
+    @property
+    def segments(self) -> list[Path]:
+        return sorted(self.directory.glob(f"segment-*{_SUFFIX[self.framing]}"))
+
+    @property
+    def path(self) -> Path | None:
+        return Path(self._file.name) if self._file is not None else None
+
+    def _encode(self, msg: Dict[str, Any]) -> bytes:
+        payload = json.dumps(msg).encode()
+        if self.framing == "binary":
+            return _FRAME.pack(len(payload)) + payload
+        return payload + b"\n"
+
+    def _open_segment(self) -> None:
+        # Segments are created exclusively: a writer sharing the session
+        # directory never appends to another writer's segment.
+        while True:
+            self._index += 1
+            path = self.directory / f"segment-{self._index:06d}{_SUFFIX[self.framing]}"
+            try:
+                fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | os.O_APPEND, 0o644)
+            except FileExistsError:
+                continue
+            break
+        self._file = os.fdopen(fd, "ab")
+        self._opened = time.monotonic()
+
+    def _rotate_due(self) -> bool:
+        return self._file.tell() >= self.max_bytes or time.monotonic() - self._opened >= self.max_age
+
+    # ------------------------------------------------------------------
+    def post(self, msg: Dict[str, Any]) -> None:
+        self._buffer.append(self._encode(msg))
+        self.messages += 1
+        if len(self._buffer) >= self.batch_size or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write buffered messages to the current segment, rotating first if it is due."""
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return
+        if self._file is None:
+            self._open_segment()
+        elif self._rotate_due():
+            self._file.close()
+            self._open_segment()
+        self._file.write(b"".join(self._buffer))
+        self._buffer.clear()
+        self._file.flush()
+        if self.fsync != "never":
+            os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> "BusWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def read(self) -> Iterator[Dict[str, Any]]:
+        """Messages of this session, including any still buffered."""
+        self.flush()
+        return read_bus(self.directory)
+
+
+def _read_segment(path: Path) -> Iterator[Dict[str, Any]]:
+    if path.suffix == ".bin":
+        with path.open("rb") as f:
+            while header := f.read(_FRAME.size):
+                if len(header) < _FRAME.size:
+                    break  # torn final frame
+                payload = f.read(_FRAME.unpack(header)[0])
+                try:
+                    yield json.loads(payload)
+                except json.JSONDecodeError:
+                    break
+        return
+    with path.open("r") as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+def read_bus(path: str | Path | None = None) -> Iterator[Dict[str, Any]]:
+    """Iterate messages from a segment file, a session directory or a whole bus root.
+
+    Sessions are read in name order (their ids start with a timestamp), and
+    segments within a session in write order.
+    """
+    path = Path(path) if path is not None else bus_dir()
+    if path.is_file():
+        yield from _read_segment(path)
+        return
+    if not path.is_dir():
+        return
+    for segment in sorted(path.glob("**/segment-*")):
+        if segment.suffix in (".jsonl", ".bin"):
+            yield from _read_segment(segment)
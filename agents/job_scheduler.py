@@ -0,0 +1,220 @@
+# agents/job_scheduler.py
+"""Batch session jobs with per-provider concurrency caps and fair queueing.
+
+A job is a list of :class:`SessionReq`. Sessions from all jobs share one
+scheduler:
+
+* at most ``max_sessions`` sessions run at once, admitted round-robin
+  across jobs, so a small job submitted behind a large one is not starved;
+* every provider call holds that provider's semaphore, so throughput is
+  bounded by provider capacity (``PROVIDER_CONCURRENCY`` per provider,
+  overridable as ``PROVIDER_CONCURRENCY_<NAME>``, e.g. ``..._CODEX=2``).
+
+Sessions run through :func:`agents.session.astream_session`, so a job's
+transcripts match those of ``/session``.
+"""
+import asyncio
+import os
+import time
+import uuid
+from collections import deque
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Literal, Optional
+
+from pydantic import BaseModel
+
+from agents.session import SessionReq, TurnMsg, astream_session, providers, stopped_on_strain
+
+DEFAULT_PROVIDER_CONCURRENCY = 4
+MAX_FINISHED_JOBS = 100
+
+JobState = Literal["queued", "running", "done", "cancelled"]
+
+
+class JobReq(BaseModel):
+    sessions: List[SessionReq]
+
+
+class SessionResult(BaseModel):
+    index: int
+    messages: List[TurnMsg] = []
+    stopped_on_strain: bool = False
+    error: Optional[str] = None
+
+
+class JobStatus(BaseModel):
+    id: str
+    state: JobState
+    total: int
+    completed: int
+    failed: int
+    running: int
+    created: float
+    finished: Optional[float] = None
+
+
+def provider_limit(provider: str) -> int:
+    default = int(os.environ.get("PROVIDER_CONCURRENCY", DEFAULT_PROVIDER_CONCURRENCY))
+    return max(1, int(os.environ.get(f"PROVIDER_CONCURRENCY_{provider.upper()}", default)))
+
+
+class Job:
+    def __init__(self, sessions: List[SessionReq]):
+        self.id = uuid.uuid4().hex[:12]
+        self.sessions = sessions
+        self.results: List[Optional[SessionResult]] = [None] * len(sessions)
+        self.order: List[int] = []  # session indices in completion order
+        self.pending = deque(range(len(sessions)))
+        self.tasks: Dict[int, asyncio.Task] = {}
+        self.created = time.time()
+        self.finished: Optional[float] = None
+        self.cancelled = False
+        self.changed = asyncio.Condition()
+
+    @property
+    def state(self) -> JobState:
+        if self.cancelled:
+            return "cancelled"
+        if len(self.order) == len(self.sessions):
+            return "done"
+        return "running" if self.order or self.tasks else "queued"
+
+    def status(self) -> JobStatus:
+        return JobStatus(
+            id=self.id, state=self.state, total=len(self.sessions), completed=len(self.order),
+            failed=sum(1 for i in self.order if self.results[i].error), running=len(self.tasks),
+            created=self.created, finished=self.finished,
+        )
+
+    async def _notify(self) -> None:
+        async with self.changed:
+            self.changed.notify_all()
+
+    async def updates(self) -> AsyncIterator[SessionResult]:
+        """Yield results in completion order until the job is done or cancelled."""
+        seen = 0
+        while True:
+            async with self.changed:
+                await self.changed.wait_for(lambda: len(self.order) > seen or self.state in ("done", "cancelled"))
+                fresh = self.order[seen:]
+            for i in fresh:
+                yield self.results[i]
+            seen += len(fresh)
+            if self.state in ("done", "cancelled") and seen == len(self.order):
+                return
+
+
+class JobScheduler:
+    """Runs job sessions concurrently under per-provider caps.
+
+    Parameters
+    ----------
+    call:
+        Async provider call ``call(provider, prompt, kernel) -> text``.
+    limits:
+        Per-provider concurrency caps; missing providers use :func:`provider_limit`.
+    max_sessions:
+        Sessions running at once; defaults to the S1 cap plus the S2 cap
+        (or just one cap when both roles use the same provider), enough to
+        keep every provider slot busy.
+    """
+
+    def __init__(self, call: Callable[[str, str, dict], Awaitable[str]], limits: Optional[Dict[str, int]] = None,
+                 max_sessions: Optional[int] = None):
+        self.call = call
+        self.limits = dict(limits or {})
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._max_sessions = max_sessions
+        self.jobs: Dict[str, Job] = {}
+        self._queue: deque = deque()  # jobs with pending sessions, in round-robin order
+        self._running = 0
+        self.loop = asyncio.get_running_loop()
+
+    @property
+    def max_sessions(self) -> int:
+        if self._max_sessions is not None:
+            return self._max_sessions
+        return sum(self.limit(p) for p in set(providers()))
+
+    def limit(self, provider: str) -> int:
+        return self.limits.get(provider) or provider_limit(provider)
+
+    def _semaphore(self, provider: str) -> asyncio.Semaphore:
+        if provider not in self._semaphores:
+            self._semaphores[provider] = asyncio.Semaphore(self.limit(provider))
+        return self._semaphores[provider]
+
+    async def _call(self, provider: str, prompt: str, kernel: dict) -> str:
+        async with self._semaphore(provider):
+            return await self.call(provider, prompt, kernel)
+
+    # ------------------------------------------------------------------
+    def submit(self, sessions: List[SessionReq]) -> Job:
+        job = Job(list(sessions))
+        self.jobs[job.id] = job
+        if job.sessions:
+            self._queue.append(job)
+        else:
+            job.finished = time.time()
+        self._evict()
+        self._fill()
+        return job
+
+    def queue_depth(self) -> Dict[str, int]:
+        """Sessions waiting for a slot and sessions running."""
+        return {"queued": sum(len(job.pending) for job in self.jobs.values()), "running": self._running}
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.jobs.get(job_id)
+
+    async def cancel(self, job_id: str) -> Optional[Job]:
+        job = self.jobs.get(job_id)
+        if job is None or job.state in ("done", "cancelled"):
+            return job
+        job.cancelled = True
+        job.finished = time.time()
+        job.pending.clear()
+        for task in list(job.tasks.values()):
+            task.cancel()
+        await job._notify()
+        return job
+
+    def _evict(self) -> None:
+        finished = [j for j in self.jobs.values() if j.finished is not None]
+        for job in sorted(finished, key=lambda j: j.finished)[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self.jobs[job.id]
+
+    def _fill(self) -> None:
+        """Start sessions round-robin across jobs while session slots are free."""
+        while self._running < self.max_sessions and self._queue:
+            job = self._queue.popleft()
+            if not job.pending:
+                continue
+            index = job.pending.popleft()
+            if job.pending:
+                self._queue.append(job)
+            self._running += 1
+            job.tasks[index] = self.loop.create_task(self._run(job, index))
+
+    async def _run(self, job: Job, index: int) -> None:
+        req = job.sessions[index]
+        messages: List[TurnMsg] = []
+        result = None
+        try:
+            async for msg in astream_session(req, self._call):
+                messages.append(msg)
+            result = SessionResult(index=index, messages=messages, stopped_on_strain=stopped_on_strain(req, messages))
+        except asyncio.CancelledError:
+            raise  # after the bookkeeping in finally; cancel() notifies watchers
+        except Exception as e:
+            result = SessionResult(index=index, messages=messages, error=str(e))
+        finally:
+            self._running -= 1
+            job.tasks.pop(index, None)
+            if result is not None and not job.cancelled:
+                job.results[index] = result
+                job.order.append(index)
+                if job.state == "done":
+                    job.finished = time.time()
+            self._fill()
+        await job._notify()
+
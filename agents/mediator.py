@@ -1,13 +1,20 @@
+import atexit
 import json
-import pathlib
 from neuro_lattice.llm_interface import codex_with_brand_context
+from agents.bus_writer import BusWriter
 
-BUS = pathlib.Path("/tmp/lattice_bus.jsonl")
+_bus = None
 
-def post(msg):
-    mode = "a" if BUS.exists() else "w"
-    with BUS.open(mode) as f:
-        f.write(json.dumps(msg) + "\n")
+def get_bus() -> BusWriter:
+    """Process-wide bus writer (one session per process), flushed at exit."""
+    global _bus
+    if _bus is None:
+        _bus = BusWriter()
+        atexit.register(_bus.close)
+    return _bus
+
+def post(msg, bus: BusWriter | None = None):
+    (bus or get_bus()).post(msg)
 
 def run_interactive(systems, modals, brand_data, turns=3, s2_provider: str | None = None):
     from agents import agent_s1, agent_s2
@@ -18,27 +25,30 @@ def run_interactive(systems, modals, brand_data, turns=3, s2_provider: str | Non
     s1 = system_map[s1_id]
     s2 = system_map[s2_id]
 
-    BUS.unlink(missing_ok=True)
+    bus = BusWriter()
 
     prompt = input("Enter the initial prompt for the interactive session: ")
 
     for turn in range(1, turns + 1):
         s1_prompt = f"System {s1_id} (propose): Based on the context of {modals}, {prompt}"
         s1_response = s1.respond(s1_prompt, brand_data)
-        post({"turn": turn, "system": s1_id, "action": "propose", "response": s1_response})
+        post({"turn": turn, "system": s1_id, "action": "propose", "response": s1_response}, bus)
         print(f"\nSystem {s1_id} (propose):\n{s1_response}")
 
         s2_prompt = f"System {s2_id} (critique): Critique the following proposal from System {s1_id}:\n{s1_response}"
         s2_response = s2.respond(s2_prompt, brand_data, provider=s2_provider)
-        post({"turn": turn, "system": s2_id, "action": "critique", "response": s2_response})
+        post({"turn": turn, "system": s2_id, "action": "critique", "response": s2_response}, bus)
         print(f"\nSystem {s2_id} (critique):\n{s2_response}")
 
         s1_revise_prompt = f"System {s1_id} (revise): Revise your proposal based on the critique from System {s2_id}:\nCritique: {s2_response}\nOriginal proposal: {s1_response}"
         s1_revised_response = s1.respond(s1_revise_prompt, brand_data)
-        post({"turn": turn, "system": s1_id, "action": "revise", "response": s1_revised_response})
+        post({"turn": turn, "system": s1_id, "action": "revise", "response": s1_revised_response}, bus)
         print(f"\nSystem {s1_id} (revise):\n{s1_revised_response}")
 
         prompt = s1_revised_response
+        bus.flush()  # flush_interval is only checked on post; persist each completed turn
 
     print("\n=== INTERACTIVE SESSION COMPLETE ===")
-    print(BUS.read_text())
\ No newline at end of file
+    bus.close()
+    for msg in bus.read():
+        print(json.dumps(msg))
\ No newline at end of file
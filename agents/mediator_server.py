@@ -1,107 +1,118 @@
 # agents/mediator_server.py
-from fastapi import FastAPI
-from pydantic import BaseModel
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from typing import List, Dict, Any, Literal
+import asyncio
+import json
 import sys
 import pathlib
 sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
-from cli_agent.actions.load_kernel import load_brand_kernel
-from cli_agent.actions.trace_modal import trace_modal_input
-from cli_agent.actions.evaluate_resonance import evaluate_resonance
+from cli_agent.actions.compiled_kernel import get_compiled_kernel
 import os
-from neuro_lattice.llm_interface import with_brand_context
+from neuro_lattice.llm_interface import with_brand_context, awith_brand_context
+from neuro_lattice.response_cache import default_cache
+from neuro_lattice import tracing
+from agents.session import (  # noqa: F401  (models and helpers re-exported for callers)
+    SessionReq, TurnMsg, SessionResp, is_composite, strain_score,
+    iter_session, astream_session, stopped_on_strain,
+)
+from agents.job_scheduler import JobReq, JobScheduler, JobStatus
 
 app = FastAPI(title="NeuroLattice Mediator")
 
-# ---- Simple models ----
-class SessionReq(BaseModel):
-    prompt: str
-    modal: str = "visual"
-    event: str = "amplify_brand_colours"
-    event_kind: Literal["inputs","outputs"] = "outputs"
-    turns: int = 6
-    strain_threshold: float = 0.25
-
-class TurnMsg(BaseModel):
-    turn: int
-    speaker: str
-    text: str
-    strain: float
-    prime: int
-    resonance: List[str]
-
-class SessionResp(BaseModel):
-    messages: List[TurnMsg]
-    stopped_on_strain: bool = False
-
-# ---- Helpers ----
-def is_composite(n: int) -> bool:
-    if n is None: return False
-    return n not in (2,3,5,7,11,13,17,19)
-
-def strain_score(prime: int, resonance: list[str]) -> float:
-    base = 0.30
-    if is_composite(prime): base -= 0.02
-    if any(r.startswith("S1-") for r in resonance): base -= 0.06
-    if any(r.startswith("S2-") for r in resonance): base -= 0.06
-    return max(0.01, base)
-
 # ---- Routes ----
 @app.get("/health")
 def health() -> Dict[str, Any]:
     return {"ok": True}
 
+@app.get("/cache/stats")
+def cache_stats() -> Dict[str, Any]:
+    cache = default_cache()
+    return {"enabled": cache is not None, **(cache.stats() if cache else {})}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    """Prometheus text exposition: provider latency, turns, queue depth and span timings."""
+    if _scheduler is not None:
+        for state, depth in _scheduler.queue_depth().items():
+            tracing.QUEUE_DEPTH.labels(state).set(depth)
+    return PlainTextResponse(tracing.render_metrics(), media_type="text/plain; version=0.0.4")
+
 @app.get("/kernel")
 def kernel_meta():
-    k = load_brand_kernel()
-    domains = k["brand_identity_kernel"]["modal_domains"]
-    return {
-        "modal_names": list(domains.keys()),
-        "events": {
-            m: {
-                "inputs":  list(domains[m].get("inputs", {}).keys()),
-                "outputs": list(domains[m].get("outputs", {}).keys())
-            }
-            for m in domains
-        }
-    }
+    return get_compiled_kernel().meta()
 
 @app.post("/session", response_model=SessionResp)
 def run_session(req: SessionReq) -> SessionResp:
-    kernel = load_brand_kernel()
-    prime = trace_modal_input(req.modal, req.event, kernel, kind=req.event_kind)
-    if prime is None:
-        # Handle case where event is not found
-        prime = 0 # or some default value
-    resonance = evaluate_resonance(prime, kernel["brand_identity_kernel"]["resonance_map"])
+    messages: List[TurnMsg] = list(iter_session(req, with_brand_context))
+    return SessionResp(messages=messages, stopped_on_strain=stopped_on_strain(req, messages))
 
-    messages: List[TurnMsg] = []
+def _frame(event: str, data: Dict[str, Any], fmt: str) -> str:
+    if fmt == "sse":
+        return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+    return json.dumps({"event": event, **data}) + "\n"
 
-    # Resolve providers from env (defaults: both codex)
-    s1_provider = os.environ.get("S1_PROVIDER", "codex")
-    s2_provider = os.environ.get("S2_PROVIDER", "codex")
-
-    # Turn 1: S1 proposes
-    seed = f"(Prime={prime}, Resonance={resonance})\n{req.prompt}"
-    s1_text = with_brand_context(s1_provider, f"S1: Propose an on-brand concept.\n{seed}", kernel)
-    s1_strain = strain_score(prime, resonance)
-    messages.append(TurnMsg(turn=1, speaker="S1", text=s1_text, strain=s1_strain, prime=prime, resonance=resonance))
-
-    # Subsequent turns alternate S2 critique ↔ S1 revision
-    speaker = "S2"
-    for t in range(2, req.turns + 1):
-        last = messages[-1].text
-        role = "Critique & refine (ethical, relational, clarity)" if speaker == "S2" else "Revise proposal (concise, concrete, visual tokens)"
-        prompt = f'''{role}.\nBRAND CONTEXT: {req.modal}/{req.event}, Prime={prime}, Resonance={resonance}\nLAST MESSAGE ({messages[-1].speaker}): {last}\nRespond with one short paragraph + 3 bullet improvements.'''
-        provider = s2_provider if speaker == "S2" else s1_provider
-        text = with_brand_context(provider, prompt, kernel)
-        s = strain_score(prime, resonance)
-        msg = TurnMsg(turn=t, speaker=speaker, text=text, strain=s, prime=prime, resonance=resonance)
-        messages.append(msg)
-
-        if s > req.strain_threshold:
-            return SessionResp(messages=messages, stopped_on_strain=True)
-
-        speaker = "S1" if speaker == "S2" else "S2"
-
-    return SessionResp(messages=messages, stopped_on_strain=False)
+async def _session_frames(req: SessionReq, fmt: str, call=awith_brand_context):
+    messages: List[TurnMsg] = []
+    try:
+        async for msg in astream_session(req, call):
+            messages.append(msg)
+            yield _frame("turn", msg.model_dump(), fmt)
+    except Exception as e:
+        yield _frame("error", {"detail": str(e)}, fmt)
+        return
+    yield _frame("done", {"turns": len(messages), "stopped_on_strain": stopped_on_strain(req, messages)}, fmt)
+
+@app.post("/session/stream")
+async def stream_session(req: SessionReq, format: Literal["ndjson","sse"] = "ndjson") -> StreamingResponse:
+    """Stream each turn as it is produced, as NDJSON lines or Server-Sent Events."""
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    return StreamingResponse(_session_frames(req, format), media_type=media_type, headers={"Cache-Control": "no-cache"})
+
+# ---- Batch jobs ----
+_scheduler: JobScheduler | None = None
+
+def get_scheduler() -> JobScheduler:
+    """Scheduler bound to the running event loop (created on first use)."""
+    global _scheduler
+    if _scheduler is None or _scheduler.loop is not asyncio.get_running_loop():
+        _scheduler = JobScheduler(awith_brand_context)
+    return _scheduler
+
+def _job(job_id: str):
+    job = get_scheduler().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return job
+
+@app.post("/jobs", response_model=JobStatus, status_code=202)
+async def submit_job(req: JobReq) -> JobStatus:
+    """Queue a batch of sessions; poll ``/jobs/{id}`` or stream ``/jobs/{id}/stream``."""
+    return get_scheduler().submit(req.sessions).status()
+
+@app.get("/jobs/{job_id}", response_model=JobStatus)
+async def job_status(job_id: str) -> JobStatus:
+    return _job(job_id).status()
+
+@app.get("/jobs/{job_id}/results")
+async def job_results(job_id: str) -> Dict[str, Any]:
+    """Status plus the finished sessions' results, in submission order."""
+    job = _job(job_id)
+    return {**job.status().model_dump(), "results": [r.model_dump() for r in job.results if r is not None]}
+
+@app.delete("/jobs/{job_id}", response_model=JobStatus)
+async def cancel_job(job_id: str) -> JobStatus:
+    _job(job_id)
+    return (await get_scheduler().cancel(job_id)).status()
+
+async def _job_frames(job, fmt: str):
+    async for result in job.updates():
+        yield _frame("result", result.model_dump(), fmt)
+    yield _frame("done", job.status().model_dump(), fmt)
+
+@app.get("/jobs/{job_id}/stream")
+async def stream_job(job_id: str, format: Literal["ndjson","sse"] = "ndjson") -> StreamingResponse:
+    """Stream each session result as it completes, then a final status frame."""
+    job = _job(job_id)
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    return StreamingResponse(_job_frames(job, format), media_type=media_type, headers={"Cache-Control": "no-cache"})
@@ -0,0 +1,108 @@
+# agents/session.py
+"""S1/S2 session turns shared by the mediator's blocking and streaming endpoints."""
+from typing import AsyncIterator, Awaitable, Callable, Iterator, List, Literal, Tuple
+import os
+
+from pydantic import BaseModel
+
+from cli_agent.actions.compiled_kernel import get_compiled_kernel
+from neuro_lattice import tracing
+from neuro_lattice.brand_context import slice_kernel
+
+# ---- Simple models ----
+class SessionReq(BaseModel):
+    prompt: str
+    modal: str = "visual"
+    event: str = "amplify_brand_colours"
+    event_kind: Literal["inputs","outputs"] = "outputs"
+    turns: int = 6
+    strain_threshold: float = 0.25
+
+class TurnMsg(BaseModel):
+    turn: int
+    speaker: str
+    text: str
+    strain: float
+    prime: int
+    resonance: List[str]
+
+class SessionResp(BaseModel):
+    messages: List[TurnMsg]
+    stopped_on_strain: bool = False
+
+# ---- Helpers ----
+def is_composite(n: int) -> bool:
+    if n is None: return False
+    return n not in (2,3,5,7,11,13,17,19)
+
+def strain_score(prime: int, resonance: list[str]) -> float:
+    base = 0.30
+    if is_composite(prime): base -= 0.02
+    if any(r.startswith("S1-") for r in resonance): base -= 0.06
+    if any(r.startswith("S2-") for r in resonance): base -= 0.06
+    return max(0.01, base)
+
+def session_context(req: SessionReq) -> Tuple[dict, int, List[str]]:
+    """Kernel to send (sliced to the session's modal/event), prime and resonance."""
+    compiled = get_compiled_kernel()
+    prime = compiled.prime(req.modal, req.event, kind=req.event_kind)
+    if prime is None:
+        # Handle case where event is not found
+        prime = 0 # or some default value
+        kernel = slice_kernel(compiled.data, req.modal)
+    else:
+        kernel = slice_kernel(compiled.data, req.modal, req.event)
+    return kernel, prime, compiled.resonance(prime)
+
+def providers() -> Tuple[str, str]:
+    # Resolve providers from env (defaults: both codex)
+    return os.environ.get("S1_PROVIDER", "codex"), os.environ.get("S2_PROVIDER", "codex")
+
+def turn_prompt(req: SessionReq, turn: int, speaker: str, prime: int, resonance: List[str], last: TurnMsg | None) -> str:
+    if turn == 1:
+        # Turn 1: S1 proposes
+        seed = f"(Prime={prime}, Resonance={resonance})\n{req.prompt}"
+        return f"S1: Propose an on-brand concept.\n{seed}"
+    # Subsequent turns alternate S2 critique ↔ S1 revision
+    role = "Critique & refine (ethical, relational, clarity)" if speaker == "S2" else "Revise proposal (concise, concrete, visual tokens)"
+    return f'''{role}.\nBRAND CONTEXT: {req.modal}/{req.event}, Prime={prime}, Resonance={resonance}\nLAST MESSAGE ({last.speaker}): {last.text}\nRespond with one short paragraph + 3 bullet improvements.'''
+
+def stopped_on_strain(req: SessionReq, messages: List[TurnMsg]) -> bool:
+    # Strain is only checked from turn 2 on; a session that stopped early ends on the offending turn.
+    return len(messages) > 1 and messages[-1].strain > req.strain_threshold
+
+def _speakers(req: SessionReq) -> Iterator[Tuple[int, str]]:
+    speaker = "S1"
+    for t in range(1, req.turns + 1):
+        yield t, speaker
+        speaker = "S1" if speaker == "S2" else "S2"
+
+def iter_session(req: SessionReq, call: Callable[[str, str, dict], str]) -> Iterator[TurnMsg]:
+    """Yield each turn as soon as ``call(provider, prompt, kernel)`` returns it."""
+    kernel, prime, resonance = session_context(req)
+    s1_provider, s2_provider = providers()
+    last = None
+    for t, speaker in _speakers(req):
+        prompt = turn_prompt(req, t, speaker, prime, resonance, last)
+        with tracing.span("mediator.turn", turn=t, speaker=speaker, modal=req.modal):
+            text = call(s2_provider if speaker == "S2" else s1_provider, prompt, kernel)
+        tracing.TURNS.labels(speaker).inc()
+        last = TurnMsg(turn=t, speaker=speaker, text=text, strain=strain_score(prime, resonance), prime=prime, resonance=resonance)
+        yield last
+        if t > 1 and last.strain > req.strain_threshold:
+            return
+
+async def astream_session(req: SessionReq, call: Callable[[str, str, dict], Awaitable[str]]) -> AsyncIterator[TurnMsg]:
+    """Async :func:`iter_session`; ``call`` is awaited, so no thread is held per session."""
+    kernel, prime, resonance = session_context(req)
+    s1_provider, s2_provider = providers()
+    last = None
+    for t, speaker in _speakers(req):
+        prompt = turn_prompt(req, t, speaker, prime, resonance, last)
+        with tracing.span("mediator.turn", turn=t, speaker=speaker, modal=req.modal):
+            text = await call(s2_provider if speaker == "S2" else s1_provider, prompt, kernel)
+        tracing.TURNS.labels(speaker).inc()
+        last = TurnMsg(turn=t, speaker=speaker, text=text, strain=strain_score(prime, resonance), prime=prime, resonance=resonance)
+        yield last
+        if t > 1 and last.strain > req.strain_threshold:
+            return
@@ -0,0 +1,106 @@
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+DEFAULT_KERNEL_PATH = 'memory/brand_identity_kernel.json'
+NO_RESONANCE = ["No resonance found"]
+
+
+class CompiledKernel:
+    """Brand kernel parsed once, with flat lookup indexes.
+
+    Per-modal ``(kind, event) -> prime`` tables are flattened the first time
+    a modal is queried, and the reverse ``prime -> events`` index the first
+    time it is asked for, so large kernels only pay for what they use.
+    ``prime`` and ``resonance`` mirror ``trace_modal_input`` and
+    ``evaluate_resonance``.
+    """
+
+    def __init__(self, path=DEFAULT_KERNEL_PATH):
+        self.path = Path(path)
+        stat = self.path.stat()
+        self.stamp = (stat.st_mtime_ns, stat.st_size)
+        raw = self.path.read_bytes()
+        self.digest = hashlib.sha256(raw).hexdigest()
+        self.data = json.loads(raw)
+        kernel = self.data["brand_identity_kernel"]
+        self._domains = kernel["modal_domains"]
+        self._resonance_map = kernel.get("resonance_map", {})
+        self._events = {}
+        self._resonance = {}
+        self._reverse = None
+        self._meta = None
+        self._lock = threading.Lock()
+
+    @property
+    def modal_names(self):
+        return list(self._domains)
+
+    def _modal(self, modal_name):
+        table = self._events.get(modal_name)
+        if table is None:
+            modal = self._domains[modal_name]
+            table = {
+                (kind, event): prime
+                for kind in ("inputs", "outputs")
+                for event, prime in modal.get(kind, {}).items()
+            }
+            with self._lock:
+                self._events[modal_name] = table
+        return table
+
+    def prime(self, modal_name, event_key, kind="outputs"):
+        """(modal, kind, event) -> prime; ``None`` for unknown events, KeyError for unknown modals."""
+        return self._modal(modal_name).get((kind, event_key))
+
+    def resonance(self, prime):
+        nodes = self._resonance.get(prime)
+        if nodes is None:
+            nodes = self._resonance[prime] = self._resonance_map.get(str(prime), NO_RESONANCE)
+        return nodes
+
+    def events_for_prime(self, prime):
+        """Reverse index: every ``(modal, kind, event)`` mapped to ``prime``."""
+        if self._reverse is None:
+            reverse = {}
+            for modal_name in self._domains:
+                for (kind, event), p in self._modal(modal_name).items():
+                    reverse.setdefault(p, []).append((modal_name, kind, event))
+            self._reverse = reverse
+        return list(self._reverse.get(prime, []))
+
+    def events(self, modal_name):
+        modal = self._domains[modal_name]
+        return {kind: list(modal.get(kind, {}).keys()) for kind in ("inputs", "outputs")}
+
+    def meta(self):
+        """Payload served by the mediator's ``/kernel`` endpoint."""
+        if self._meta is None:
+            self._meta = {
+                "modal_names": self.modal_names,
+                "events": {m: self.events(m) for m in self._domains},
+            }
+        return self._meta
+
+
+_KERNELS = {}
+_KERNELS_LOCK = threading.Lock()
+
+
+def get_compiled_kernel(path=None):
+    """Return the process-wide compiled kernel, reloading it when the file changes.
+
+    ``path`` defaults to ``KERNEL_FILE`` or ``memory/brand_identity_kernel.json``.
+    A request only costs one ``stat`` when the file is unchanged.
+    """
+    path = os.path.abspath(path or os.environ.get('KERNEL_FILE', DEFAULT_KERNEL_PATH))
+    stat = os.stat(path)
+    compiled = _KERNELS.get(path)
+    if compiled is None or compiled.stamp != (stat.st_mtime_ns, stat.st_size):
+        with _KERNELS_LOCK:
+            compiled = _KERNELS.get(path)
+            if compiled is None or compiled.stamp != (stat.st_mtime_ns, stat.st_size):
+                compiled = _KERNELS[path] = CompiledKernel(path)
+    return compiled
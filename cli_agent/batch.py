@@ -0,0 +1,180 @@
+"""Resumable parallel runner for S1<->S2 sessions over a set of briefs.
+
+Briefs are streamed from a JSON file, a JSONL file or a directory of them.
+Each brief runs through :func:`agents.session.iter_session` on a thread pool.
+One JSON line per finished brief is appended to the results file as soon as
+it completes, and the brief's id is then appended to a checkpoint file. A
+rerun skips every id already in the checkpoint. Failed briefs (an exception
+or a provider error reply) are recorded with their error but not
+checkpointed, so they are retried.
+
+A brief is a mapping with a ``prompt`` (or a ``title``/``body`` pair, as in
+``requests.jsonl``) and optional ``modal``, ``event``, ``event_kind``,
+``turns`` and ``strain_threshold``. Its id is the first of ``id``,
+``brief_id`` and ``request_id`` that is present, else the file stem (plus
+the line number for JSONL).
+"""
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+ID_KEYS = ("id", "brief_id", "request_id")
+
+
+def _brief_id(brief: Dict[str, Any], default: str) -> str:
+    return str(next((brief[k] for k in ID_KEYS if brief.get(k) is not None), default))
+
+
+def _read_file(path: Path) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    if path.suffix == ".jsonl":
+        with path.open() as f:
+            for n, line in enumerate(f, 1):
+                if line.strip():
+                    brief = json.loads(line)
+                    yield _brief_id(brief, f"{path.stem}:{n}"), brief
+    else:
+        brief = json.loads(path.read_text())
+        yield _brief_id(brief, path.stem), brief
+
+
+def iter_briefs(source) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Yield ``(brief_id, brief)`` from a ``.json``/``.jsonl`` file or a directory of them."""
+    source = Path(source)
+    if source.is_dir():
+        for path in sorted(source.iterdir()):
+            if path.suffix in (".json", ".jsonl"):
+                yield from _read_file(path)
+    else:
+        yield from _read_file(source)
+
+
+def session_request(brief: Dict[str, Any], **overrides):
+    from agents.session import SessionReq
+
+    fields = {k: brief[k] for k in ("modal", "event", "event_kind", "turns", "strain_threshold") if k in brief}
+    prompt = brief.get("prompt") or "\n\n".join(str(brief[k]) for k in ("title", "body") if brief.get(k))
+    if not prompt:
+        raise ValueError("brief has no prompt")
+    fields.update({k: v for k, v in overrides.items() if v is not None})
+    return SessionReq(prompt=prompt, **fields)
+
+
+class Checkpoint:
+    """Append-only file of completed brief ids, one per line."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.done = set()
+        if self.path.exists():
+            self.done = {line.strip() for line in self.path.read_text().splitlines() if line.strip()}
+        self._lock = threading.Lock()
+
+    def __contains__(self, brief_id: str) -> bool:
+        return brief_id in self.done
+
+    def add(self, brief_id: str) -> None:
+        with self._lock:
+            with self.path.open("a") as f:
+                f.write(brief_id + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self.done.add(brief_id)
+
+
+def run_brief(brief_id: str, brief: Dict[str, Any], call: Callable, **overrides) -> Dict[str, Any]:
+    from agents.session import iter_session, stopped_on_strain
+    from neuro_lattice.response_cache import is_error
+
+    start = time.monotonic()
+    record: Dict[str, Any] = {"id": brief_id}
+    try:
+        req = session_request(brief, **overrides)
+        messages = list(iter_session(req, call))
+        # Provider failures come back as "[..._ERROR]" text rather than exceptions.
+        failed = next((m.text for m in messages if is_error(m.text)), None)
+        record.update(
+            messages=[m.model_dump() for m in messages],
+            stopped_on_strain=stopped_on_strain(req, messages),
+            error=f"provider error in turn text: {failed[:200]}" if failed is not None else None,
+        )
+    except Exception as e:
+        record.update(messages=[], stopped_on_strain=False, error=f"{type(e).__name__}: {e}")
+    record["elapsed"] = time.monotonic() - start
+    return record
+
+
+def run_batch(
+    source,
+    out,
+    checkpoint=None,
+    workers: int = 4,
+    call: Optional[Callable] = None,
+    turns: Optional[int] = None,
+    strain_threshold: Optional[float] = None,
+    progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """Run every brief in ``source`` not yet in ``checkpoint``; returns run counts.
+
+    Parameters
+    ----------
+    out:
+        Results JSONL file (appended to).
+    checkpoint:
+        Checkpoint file; defaults to ``<out>.done``.
+    workers:
+        Sessions run concurrently. At most ``2 * workers`` briefs are read
+        ahead of the ones running.
+    call:
+        ``call(provider, prompt, kernel)``; defaults to ``with_brand_context``.
+    turns, strain_threshold:
+        Override the values given in each brief.
+    progress:
+        Called with each result record as it is written.
+    """
+
+    if call is None:
+        from neuro_lattice.llm_interface import with_brand_context as call
+    out = Path(out)
+    done = Checkpoint(checkpoint or out.with_name(out.name + ".done"))
+    overrides = {"turns": turns, "strain_threshold": strain_threshold}
+    counts = {"completed": 0, "failed": 0, "skipped": 0}
+    start = time.monotonic()
+    window = 2 * max(1, workers)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="brief") as pool, out.open("a") as results:
+        def drain():
+            nonlocal pending
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                record = future.result()
+                results.write(json.dumps(record) + "\n")
+                results.flush()
+                if record["error"] is None:
+                    # The result must be durable before its checkpoint id is.
+                    os.fsync(results.fileno())
+                    done.add(record["id"])
+                    counts["completed"] += 1
+                else:
+                    counts["failed"] += 1
+                if progress:
+                    progress(record)
+
+        pending = set()
+        seen = set()
+        for brief_id, brief in iter_briefs(source):
+            if brief_id in done or brief_id in seen:
+                counts["skipped"] += 1
+                continue
+            seen.add(brief_id)
+            while len(pending) >= window:
+                drain()
+            pending.add(pool.submit(run_brief, brief_id, brief, call, **overrides))
+        while pending:
+            drain()
+
+    counts["elapsed"] = time.monotonic() - start
+    return counts
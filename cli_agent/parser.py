@@ -33,12 +33,14 @@ def trace_command(args, context):
     prompt = args.prompt
     brand_data = context['kernel_data']
 
-    if args.system == 1:
-        response = agent_s1.respond(prompt, brand_data)
+    agent = agent_s1 if args.system == 1 else agent_s2
+    if args.stream:
+        # Print provider output as it arrives rather than after the CLI exits.
+        for chunk in agent.stream(prompt, brand_data):
+            print(chunk, end="", flush=True)
+        print()
     else:
-        response = agent_s2.respond(prompt, brand_data)
-
-    print(response)
+        print(agent.respond(prompt, brand_data))
 
     if args.log:
         # TODO: Implement logging
@@ -58,29 +60,26 @@ def interactive_command(args, context):
     run_interactive(systems, modals, brand_data, s2_provider=s2_provider)
 
 def report_command(args, context):
-    import json
     import pathlib
     from collections import defaultdict
 
-    BUS = pathlib.Path("/tmp/lattice_bus.jsonl")
+    from agents.bus_writer import bus_dir, read_bus
 
-    if not BUS.exists():
+    # Segmented bus (agents/bus_writer.py), plus the legacy single-file bus if present.
+    sources = [p for p in (pathlib.Path("/tmp/lattice_bus.jsonl"), bus_dir()) if p.exists()]
+    if not sources:
         print("Error: Log file not found. Run a session first.")
         return
 
     strain_by_modal = defaultdict(list)
 
-    with BUS.open("r") as f:
-        for line in f:
-            try:
-                log_entry = json.loads(line)
-                strain = log_entry.get("strain")
-                modal = log_entry.get("modal")
-                turn = log_entry.get("turn")
-                if strain is not None and modal is not None:
-                    strain_by_modal[modal].append((turn, strain))
-            except json.JSONDecodeError:
-                continue
+    for source in sources:
+        for log_entry in read_bus(source):
+            strain = log_entry.get("strain")
+            modal = log_entry.get("modal")
+            turn = log_entry.get("turn")
+            if strain is not None and modal is not None:
+                strain_by_modal[modal].append((turn, strain))
 
     print("Strain Report:")
     for modal, strains in strain_by_modal.items():
@@ -88,6 +87,20 @@ def report_command(args, context):
         for turn, strain in sorted(strains):
             print(f"  Turn {turn}: Strain = {strain}")
 
+def batch_command(args, context):
+    from cli_agent.batch import run_batch
+
+    def progress(record):
+        status = f"error: {record['error']}" if record["error"] else f"{len(record['messages'])} turns"
+        print(f"[{record['id']}] {status} ({record['elapsed']:.1f}s)", flush=True)
+
+    counts = run_batch(
+        args.source, args.out, checkpoint=args.checkpoint, workers=args.workers,
+        turns=args.turns, strain_threshold=args.strain_threshold, progress=progress,
+    )
+    print(f"Completed {counts['completed']}, failed {counts['failed']}, skipped {counts['skipped']} "
+          f"in {counts['elapsed']:.1f}s. Results: {args.out}")
+
 def setup_parser(context):
     parser = argparse.ArgumentParser(description='NeuroLattice CLI')
     subparsers = parser.add_subparsers(dest='command')
@@ -104,6 +117,7 @@ def setup_parser(context):
     trace_parser.add_argument('--modal', required=True, help='Modal for the prompt')
     trace_parser.add_argument('--prompt', required=True, help='Prompt for the system')
     trace_parser.add_argument('--log', action='store_true', help='Log outputs and strain')
+    trace_parser.add_argument('--stream', action='store_true', help='Print the response incrementally as it arrives')
     trace_parser.set_defaults(func=trace_command)
 
     # Interactive command
@@ -118,4 +132,14 @@ def setup_parser(context):
     report_parser.add_argument('report_type', choices=['strain'], help='Type of report to generate')
     report_parser.set_defaults(func=report_command)
 
+    # Batch command
+    batch_parser = subparsers.add_parser('batch', help='Run S1/S2 sessions for a set of briefs in parallel')
+    batch_parser.add_argument('source', help='Brief JSON/JSONL file or a directory of them')
+    batch_parser.add_argument('--out', default='batch_results.jsonl', help='Results JSONL file (appended to)')
+    batch_parser.add_argument('--checkpoint', default=None, help='Completed-brief checkpoint file (default: <out>.done)')
+    batch_parser.add_argument('--workers', type=int, default=4, help='Sessions to run concurrently')
+    batch_parser.add_argument('--turns', type=int, default=None, help='Override turns per session')
+    batch_parser.add_argument('--strain-threshold', type=float, default=None, help='Override the strain stop threshold')
+    batch_parser.set_defaults(func=batch_command)
+
     return parser, subparsers
@@ -1,21 +1,44 @@
-"""NeuroLattice package: build lattices, run routing, inject perturbations, and visualize."""
-
-from .lattice_builder import LatticeBuilder
-from .routing_engine import RoutingEngine
-from .metrics import calculate_strain, calculate_coherence, spectral_symmetry
-from .perturbations import PerturbationInjector, PerturbationEngine
-from .visualizer import plot_lattice
-from .llm_interface import run_codex, codex_with_brand_context
-
-__all__ = [
-    "LatticeBuilder",
-    "RoutingEngine",
-    "calculate_strain",
-    "calculate_coherence",
-    "spectral_symmetry",
-    "PerturbationInjector",
-    "PerturbationEngine",
-    "plot_lattice",
-    "run_codex",
-    "codex_with_brand_context",
-]
+"""NeuroLattice package: build lattices, run routing, inject perturbations, and visualize.
+
+Public names are loaded on first access (PEP 562), so ``import neuro_lattice``
+does not import networkx, scipy or the LLM tooling until they are needed.
+"""
+
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+_EXPORTS = {
+    "LatticeBuilder": ".lattice_builder",
+    "RoutingEngine": ".routing_engine",
+    "calculate_strain": ".metrics",
+    "calculate_coherence": ".metrics",
+    "spectral_symmetry": ".metrics",
+    "PerturbationInjector": ".perturbations",
+    "PerturbationEngine": ".perturbations",
+    "plot_lattice": ".visualizer",
+    "run_codex": ".llm_interface",
+    "codex_with_brand_context": ".llm_interface",
+}
+
+__all__ = list(_EXPORTS)
+
+if TYPE_CHECKING:
+    from .lattice_builder import LatticeBuilder
+    from .routing_engine import RoutingEngine
+    from .metrics import calculate_strain, calculate_coherence, spectral_symmetry
+    from .perturbations import PerturbationInjector, PerturbationEngine
+    from .visualizer import plot_lattice
+    from .llm_interface import run_codex, codex_with_brand_context
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,299 @@
+"""Throughput and perturbation-recovery benchmarks.
+
+Two measurements, written together as one JSON document:
+
+* **throughput**: wall-clock time to build, perturb, route and re-score
+  tetrahedral/cubic supercells of increasing size;
+* **recovery**: after each ``PerturbationEngine`` fault type (weight noise,
+  edge drop, data poisoning), the number of healing steps until coherence,
+  strain, visit imbalance and the corrupted-node fraction return to within a
+  tolerance of their clean baseline.
+
+The lattice has no built-in repair mechanism, so the healing itself is a
+*synthetic model* (reported under ``healing`` in each recovery run): each step,
+perturbed weights relax a fraction ``relax`` of the way back to baseline, each
+dropped edge regrows with probability ``regrow``, and each corrupted node is
+cleaned with probability ``clean``. The faults and the measurements are real:
+the fault is injected by :class:`PerturbationEngine` into a copy of the graph,
+and after every step the graph is re-scored and re-routed by
+:class:`RoutingEngine` with a fixed packet population and seed (common random
+numbers). Regrown edges are re-inserted in the clean graph's edge order, so
+the successor order seen by the router, and therefore visit imbalance,
+reproduces the baseline exactly once the lattice is restored.
+
+Run ``python -m neuro_lattice.benchmark --out bench.json``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import time
+from importlib import metadata
+
+import networkx as nx
+import numpy as np
+
+from .campaign import PerturbationCampaign
+from .lattice_builder import LatticeBuilder
+from .metrics import compute_coherence, compute_strain
+from .neuro_lattice.perturbation import PerturbationEngine
+from .routing_engine import RoutingEngine
+
+PERTURBATIONS = ("noise", "drop", "poison")
+RECOVERY_METRICS = ("coherence", "strain", "visit_imbalance", "corrupted_fraction")
+
+
+def _timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def _start_nodes(lattice: nx.DiGraph) -> list:
+    return [n for n in lattice.nodes if n != "EC" and lattice.out_degree(n)] or list(lattice.nodes)
+
+
+# ---------------------------------------------------------------------------
+# Throughput
+def throughput(
+    lattice_type: str = "tetrahedral",
+    cells: int = 1,
+    packets: int = 1000,
+    max_steps: int = 100,
+    noise_level: float = 0.2,
+    drop_fraction: float = 0.1,
+    seed: int = 0,
+) -> dict:
+    """Time one build -> perturb -> route -> re-score cycle on an ``cells**3`` supercell.
+
+    All randomness comes from generators seeded with ``seed``; the global
+    :mod:`random` and :mod:`numpy.random` state is left untouched.
+    """
+
+    lattice, t_build = _timed(LatticeBuilder(lattice_type).build_supercell, (cells, cells, cells))
+    n_edges = lattice.number_of_edges()
+
+    engine = PerturbationEngine(lattice.copy(), seed=seed)
+    _, t_noise = _timed(engine.random_weight_noise, noise_level)
+    _, t_drop = _timed(engine.random_edge_drop, drop_fraction)
+
+    campaign, t_snapshot = _timed(PerturbationCampaign, lattice)
+    variant = campaign.variant()
+    _, t_variant = _timed(lambda: (variant.noise(noise_level, rng=seed), variant.drop(drop_fraction, rng=seed)))
+
+    starts = _start_nodes(lattice)
+    population = [{"location": starts[i % len(starts)], "confidence": 0.5} for i in range(packets)]
+    router = RoutingEngine(lattice)
+    _, t_route = _timed(router.run_batched, population, max_steps=max_steps, rng=seed)
+    moves = len(router.transition_log)
+
+    _, t_score = _timed(lambda: (compute_strain(engine.lattice), compute_coherence(engine.lattice)))
+    _, t_score_arrays = _timed(variant.metrics)
+
+    return {
+        "lattice_type": lattice_type,
+        "cells": cells,
+        "nodes": lattice.number_of_nodes(),
+        "edges": n_edges,
+        "packets": packets,
+        "seconds": {
+            "build": t_build,
+            "perturb_graph": t_noise + t_drop,
+            "perturb_arrays": t_snapshot + t_variant,
+            "route": t_route,
+            "rescore_graph": t_score,
+            "rescore_arrays": t_score_arrays,
+        },
+        "rates": {
+            "edges_built_per_s": n_edges / t_build if t_build else None,
+            "moves_per_s": moves / t_route if t_route else None,
+        },
+    }
+
+
+# ---------------------------------------------------------------------------
+# Recovery
+CORRUPTED = "CORRUPTED"  # value PerturbationEngine.data_poisoning writes
+
+
+def _inject(engine: PerturbationEngine, perturbation: str, severity: float, node_attr: str) -> None:
+    if perturbation == "noise":
+        engine.random_weight_noise(severity)
+    elif perturbation == "drop":
+        engine.random_edge_drop(severity)
+    else:
+        engine.data_poisoning(node_attr, severity)
+
+
+def heal_step(lattice: nx.DiGraph, clean: nx.DiGraph, relax: float, regrow: float, repair: float, rng,
+              node_attr: str = "goal") -> None:
+    """One step of the synthetic healing model (see module docstring), in place on ``lattice``."""
+    for u, v, data in lattice.edges(data=True):
+        base = clean.edges[u, v].get("weight", 1.0)
+        weight = data.get("weight", 1.0)
+        if weight != base:
+            healed = weight + relax * (base - weight)
+            # Snap once within rounding of the baseline so "recovered" is exact.
+            data["weight"] = base if abs(healed - base) < 1e-12 else healed
+    dropped = [(u, v) for u, v in clean.edges if not lattice.has_edge(u, v)]
+    regrown = [edge for edge, hit in zip(dropped, rng.random(len(dropped)) < regrow) if hit]
+    if regrown:
+        # add_edge would append to the adjacency lists; re-insert every edge in
+        # the clean graph's order so successor order (and with it the router's
+        # random stream) matches the baseline.
+        data = {(u, v): d for u, v, d in lattice.edges(data=True)}
+        data.update({edge: dict(clean.edges[edge]) for edge in regrown})
+        lattice.remove_edges_from(list(data))
+        lattice.add_edges_from((u, v, data.pop((u, v))) for u, v in clean.edges if (u, v) in data)
+        lattice.add_edges_from((u, v, d) for (u, v), d in data.items())
+    corrupted = [n for n, value in lattice.nodes(data=node_attr) if value == CORRUPTED]
+    for node, hit in zip(corrupted, rng.random(len(corrupted)) < repair):
+        if hit:
+            if node_attr in clean.nodes[node]:
+                lattice.nodes[node][node_attr] = clean.nodes[node][node_attr]
+            else:
+                del lattice.nodes[node][node_attr]
+
+
+def _observe(lattice: nx.DiGraph, population: list, max_steps: int, seed: int, node_attr: str) -> dict:
+    # Re-route the same packet population with the same seed every step
+    # (common random numbers): visits reproduce the baseline once restored.
+    router = RoutingEngine(lattice)
+    router.run_batched([dict(p) for p in population], max_steps=max_steps, rng=seed, record_transitions=False)
+    visits = np.array(list(router.visit_counts.values()), dtype=np.float64)
+    corrupted = [value == CORRUPTED for _, value in lattice.nodes(data=node_attr)]
+    return {
+        "coherence": float(compute_coherence(lattice)),
+        "strain": float(compute_strain(lattice)),
+        "visit_imbalance": float(visits.max() / (visits.mean() + 1e-8)) if visits.size else 0.0,
+        "corrupted_fraction": float(np.mean(corrupted)) if corrupted else 0.0,
+    }
+
+
+def _recovered(value: float, baseline: float, tol: float) -> bool:
+    # Relative tolerance, absolute below 1 (the clean cubic lattice has zero strain).
+    return abs(value - baseline) <= tol * max(abs(baseline), 1.0)
+
+
+def recovery(
+    lattice: nx.DiGraph,
+    perturbation: str,
+    severity: float,
+    steps: int = 50,
+    relax: float = 0.2,
+    regrow: float = 0.2,
+    clean: float = 0.2,
+    tol: float = 0.05,
+    packets: int = 200,
+    max_steps: int = 50,
+    seed: int = 0,
+    node_attr: str = "goal",
+) -> dict:
+    """Healing steps until each metric returns within ``tol`` of its baseline.
+
+    The fault is injected by a seeded :class:`PerturbationEngine` into a copy
+    of ``lattice``; ``severity`` is its noise level, drop fraction or
+    corruption rate. ``time_to_baseline`` counts steps of the synthetic
+    healing model (``relax``/``regrow``/``clean``, echoed under ``healing``)
+    and is ``None`` for metrics that had not recovered after ``steps`` steps.
+    """
+
+    if perturbation not in PERTURBATIONS:
+        raise ValueError(f"Unsupported perturbation: {perturbation}")
+    rng = np.random.default_rng(seed)
+    starts = _start_nodes(lattice)
+    population = [{"location": starts[i % len(starts)], "confidence": 0.5} for i in range(packets)]
+    baseline = _observe(lattice, population, max_steps, seed, node_attr)
+
+    damaged = lattice.copy()
+    _inject(PerturbationEngine(damaged, seed=seed), perturbation, severity, node_attr)
+
+    trace = [_observe(damaged, population, max_steps, seed, node_attr)]
+    recovered_at = {m: 0 if _recovered(trace[0][m], baseline[m], tol) else None for m in RECOVERY_METRICS}
+    for step in range(1, steps + 1):
+        if all(v is not None for v in recovered_at.values()):
+            break
+        heal_step(damaged, lattice, relax, regrow, clean, rng, node_attr)
+        trace.append(_observe(damaged, population, max_steps, seed, node_attr))
+        for m in RECOVERY_METRICS:
+            if recovered_at[m] is None and _recovered(trace[-1][m], baseline[m], tol):
+                recovered_at[m] = step
+
+    return {
+        "perturbation": perturbation,
+        "severity": severity,
+        "healing": {"model": "synthetic", "relax": relax, "regrow": regrow, "clean": clean},
+        "baseline": baseline,
+        "peak_deviation": {m: max(abs(t[m] - baseline[m]) for t in trace) for m in RECOVERY_METRICS},
+        "time_to_baseline": recovered_at,
+        "trace": trace,
+    }
+
+
+# ---------------------------------------------------------------------------
+def run_benchmarks(
+    sizes=(1, 2, 4),
+    lattice_types=("tetrahedral", "cubic"),
+    packets: int = 1000,
+    recovery_cells: int = 2,
+    severities=None,
+    recovery_steps: int = 50,
+    seed: int = 0,
+) -> dict:
+    """Run the throughput grid and one recovery run per (lattice type, perturbation)."""
+
+    severities = {"noise": 0.2, "drop": 0.1, "poison": 0.2, **(severities or {})}
+    try:
+        version = metadata.version("neuro_lattice")
+    except metadata.PackageNotFoundError:
+        version = None
+    results = {
+        "neuro_lattice_version": version,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "seed": seed,
+        "throughput": [],
+        "recovery": [],
+    }
+    for lattice_type in lattice_types:
+        for cells in sizes:
+            results["throughput"].append(throughput(lattice_type, cells, packets=packets, seed=seed))
+        lattice = LatticeBuilder(lattice_type).build_supercell((recovery_cells,) * 3)
+        for perturbation in PERTURBATIONS:
+            run = recovery(lattice, perturbation, severities[perturbation], steps=recovery_steps, seed=seed)
+            results["recovery"].append({"lattice_type": lattice_type, "cells": recovery_cells, **run})
+    return results
+
+
+def main(argv=None) -> dict:
+    parser = argparse.ArgumentParser(description="NeuroLattice throughput and recovery benchmarks")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 2, 4], help="Supercell edge lengths (cells per axis)")
+    parser.add_argument("--lattice-types", nargs="+", default=["tetrahedral", "cubic"])
+    parser.add_argument("--packets", type=int, default=1000)
+    parser.add_argument("--recovery-cells", type=int, default=2)
+    parser.add_argument("--recovery-steps", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="bench_results.json", help="Output JSON path ('-' for stdout)")
+    args = parser.parse_args(argv)
+    results = run_benchmarks(
+        sizes=args.sizes,
+        lattice_types=args.lattice_types,
+        packets=args.packets,
+        recovery_cells=args.recovery_cells,
+        recovery_steps=args.recovery_steps,
+        seed=args.seed,
+    )
+    text = json.dumps(results, indent=2)
+    if args.out == "-":
+        print(text)
+    else:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""Brand kernel slicing and pre-serialised brand context for provider prompts.
+
+Prompts used to embed the whole kernel as ``json.dumps(kernel, indent=2)``:
+every modal domain and the full resonance map, re-serialised on every call.
+:func:`slice_kernel` keeps only what a modal/event needs:
+
+* ``blueprint`` and ``core_nodes`` (small, always relevant);
+* the requested modal domain (its description and, with an event, just that
+  event; otherwise all of its inputs and outputs);
+* the ``resonance_map`` entries of the primes left in the slice, plus the
+  blueprint entry.
+
+:func:`render_context` serialises compactly and caches the string per
+``(kernel hash, modal, event)``. Kernels are treated as immutable: the hash
+is memoised by object identity, so mutate a copy rather than a kernel that
+has already been rendered. :func:`size_report` reports what slicing saves.
+"""
+from __future__ import annotations
+
+import json
+import sys
+import threading
+from collections import OrderedDict
+
+from .response_cache import kernel_hash
+
+ROOT = "brand_identity_kernel"
+DEFAULT_KERNEL_PATH = "memory/brand_identity_kernel.json"
+KINDS = ("inputs", "outputs")
+#: Rendered contexts (and memoised kernel hashes) kept per process.
+MAX_ENTRIES = 256
+
+
+class KernelSlice(dict):
+    """A kernel restricted to one modal (and optionally one event).
+
+    A plain ``dict`` for JSON and hashing purposes; ``modal`` and ``event``
+    tell :func:`~neuro_lattice.llm_interface.with_brand_context` to render it
+    compactly.
+    """
+
+    def __init__(self, data, modal=None, event=None):
+        super().__init__(data)
+        self.modal = modal
+        self.event = event
+
+
+class _LRU:
+    def __init__(self, size=MAX_ENTRIES):
+        self.size = size
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.size:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+_hashes = _LRU()  # id(kernel) -> (kernel, hash); the kernel pins the id
+_slices = _LRU()  # (hash, modal, event) -> KernelSlice
+_rendered = _LRU()  # (hash, modal, event, compact) -> str
+
+
+def clear_cache() -> None:
+    for cache in (_hashes, _slices, _rendered):
+        cache.clear()
+
+
+def _hash(kernel) -> str:
+    entry = _hashes.get(id(kernel))
+    if entry is None or entry[0] is not kernel:
+        entry = (kernel, kernel_hash(kernel))
+        _hashes.put(id(kernel), entry)
+    return entry[1]
+
+
+def _slice(kernel, modal, event):
+    wrapped = ROOT in kernel
+    body = kernel[ROOT] if wrapped else kernel
+    domains = body.get("modal_domains", {})
+    if modal not in domains:
+        raise KeyError(f"Unknown modal: {modal}")
+    domain = domains[modal]
+    if event is not None:
+        found = {kind: {event: domain[kind][event]} for kind in KINDS if event in domain.get(kind, {})}
+        if not found:
+            raise KeyError(f"Unknown event for modal {modal}: {event}")
+        domain = {**{k: v for k, v in domain.items() if k not in KINDS}, **found}
+    primes = {str(p) for kind in KINDS for p in domain.get(kind, {}).values()}
+    blueprint = body.get("blueprint")
+    if blueprint is not None:
+        primes.add(str(blueprint))
+    sliced = {k: v for k, v in body.items() if k not in ("modal_domains", "resonance_map")}
+    sliced["modal_domains"] = {modal: domain}
+    if "resonance_map" in body:
+        sliced["resonance_map"] = {p: nodes for p, nodes in body["resonance_map"].items() if p in primes}
+    return {ROOT: sliced} if wrapped else sliced
+
+
+def slice_kernel(kernel: dict, modal: str | None = None, event: str | None = None) -> dict:
+    """The part of ``kernel`` relevant to ``modal``/``event`` (the kernel itself when ``modal`` is ``None``).
+
+    Raises ``KeyError`` for an unknown modal or an event the modal does not have.
+    """
+    if modal is None:
+        if event is not None:
+            raise ValueError("event requires a modal")
+        return kernel
+    key = (_hash(kernel), modal, event)
+    sliced = _slices.get(key)
+    if sliced is None:
+        sliced = KernelSlice(_slice(kernel, modal, event), modal, event)
+        _slices.put(key, sliced)
+    return sliced
+
+
+def render_context(kernel: dict, modal: str | None = None, event: str | None = None, compact: bool = True) -> str:
+    """JSON of the kernel slice for ``modal``/``event``, cached per (kernel hash, modal, event).
+
+    ``compact=False`` gives the ``indent=2`` form used by the original prompt format.
+    """
+    key = (_hash(kernel), modal, event, compact)
+    text = _rendered.get(key)
+    if text is None:
+        data = slice_kernel(kernel, modal, event)
+        if compact:
+            text = json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+        else:
+            text = json.dumps(data, indent=2)
+        _rendered.put(key, text)
+    return text
+
+
+def size_report(kernel: dict, modal: str | None = None, event: str | None = None) -> dict:
+    """Characters of brand context before (full, ``indent=2``) and after slicing.
+
+    With no ``modal``, reports every modal and every (modal, event) pair
+    under ``"modals"``/``"events"`` together with their mean reduction.
+    """
+    full = len(render_context(kernel, compact=False))
+    if modal is not None:
+        sliced = len(render_context(kernel, modal, event))
+        return {"modal": modal, "event": event, "full": full, "sliced": sliced, "reduction": 1 - sliced / full}
+    body = kernel.get(ROOT, kernel)
+    modals, events = [], []
+    for name, domain in body.get("modal_domains", {}).items():
+        modals.append(size_report(kernel, name))
+        for ev in dict.fromkeys(e for kind in KINDS for e in domain.get(kind, {})):
+            events.append(size_report(kernel, name, ev))
+    mean = lambda rows: sum(r["reduction"] for r in rows) / len(rows) if rows else 0.0
+    return {
+        "full": full,
+        "compact": len(render_context(kernel)),
+        "modals": modals,
+        "events": events,
+        "mean_modal_reduction": mean(modals),
+        "mean_event_reduction": mean(events),
+    }
+
+
+def main(argv=None) -> int:
+    """``python -m neuro_lattice.brand_context [KERNEL]``: print the size report as JSON."""
+    argv = sys.argv[1:] if argv is None else argv
+    path = argv[0] if argv else DEFAULT_KERNEL_PATH
+    with open(path, encoding="utf-8") as f:
+        report = size_report(json.load(f))
+    summary = {k: v for k, v in report.items() if k not in ("modals", "events")}
+    summary["modals"] = {r["modal"]: round(r["reduction"], 3) for r in report["modals"]}
+    print(json.dumps(summary, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
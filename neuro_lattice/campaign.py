@@ -0,0 +1,265 @@
+"""Array-based perturbation campaigns over copy-on-write lattice variants.
+
+:class:`~neuro_lattice.neuro_lattice.perturbation.PerturbationEngine` mutates a
+networkx graph edge by edge, and the only way back is rebuilding the lattice.
+Here the lattice is captured once as an :class:`EdgeSnapshot` (edge endpoint,
+weight and presence arrays). :class:`LatticeVariant` objects share those
+arrays until they first write to them. Perturbations are batched NumPy
+operations recorded in a delta journal, so a variant can be checkpointed,
+rolled back or undone step by step. :meth:`PerturbationCampaign.trials`
+evaluates thousands of independent trials as 2-D arrays without
+materialising a single graph.
+
+The operations mirror ``PerturbationEngine``:
+
+* noise: ``max(0.1, w + N(0, level))`` on edges that carry a ``weight``;
+* drop: ``max(1, int(E * fraction))`` of the present edges, without replacement;
+* poison: each node's attribute corrupted with probability ``rate``.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+import networkx as nx
+import numpy as np
+
+CORRUPTED = "CORRUPTED"
+
+
+@dataclass(frozen=True)
+class EdgeSnapshot:
+    """Immutable array form of a lattice's edges.
+
+    Attributes
+    ----------
+    graph:
+        The source graph, used only to copy attributes in :meth:`LatticeVariant.to_graph`.
+    nodes:
+        Node labels in index order.
+    src, dst:
+        Edge endpoints as node indices.
+    weight:
+        Edge weights (``1.0`` where the edge has no ``weight`` attribute).
+    weighted:
+        Whether the edge carries a ``weight`` attribute (noise only touches these).
+    """
+
+    graph: nx.Graph
+    nodes: list
+    src: np.ndarray
+    dst: np.ndarray
+    weight: np.ndarray
+    weighted: np.ndarray
+
+    @classmethod
+    def from_graph(cls, lattice: nx.Graph) -> "EdgeSnapshot":
+        nodes = list(lattice.nodes())
+        index = {n: i for i, n in enumerate(nodes)}
+        edges = list(lattice.edges(data=True))
+        src = np.fromiter((index[u] for u, _, _ in edges), dtype=np.int64, count=len(edges))
+        dst = np.fromiter((index[v] for _, v, _ in edges), dtype=np.int64, count=len(edges))
+        weight = np.fromiter((d.get("weight", 1.0) for _, _, d in edges), dtype=np.float64, count=len(edges))
+        weighted = np.fromiter(("weight" in d for _, _, d in edges), dtype=bool, count=len(edges))
+        for array in (src, dst, weight, weighted):
+            array.flags.writeable = False
+        return cls(lattice, nodes, src, dst, weight, weighted)
+
+    @property
+    def num_edges(self) -> int:
+        return self.weight.size
+
+
+def edge_metrics(weight: np.ndarray, present: np.ndarray | None = None) -> dict:
+    """``compute_strain``/``compute_coherence`` over present edges; 2-D inputs give one value per row."""
+    weight = np.asarray(weight, dtype=np.float64)
+    if present is None:
+        present = np.ones(weight.shape, dtype=bool)
+    count = present.sum(axis=-1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(present, weight, 0.0).sum(axis=-1, keepdims=True) / count
+        dev = np.where(present, weight - mean, 0.0)
+        var = (dev ** 2).sum(axis=-1) / count[..., 0]
+    return {"strain": np.abs(dev).sum(axis=-1), "coherence": 1.0 / (var + 1e-8)}
+
+
+@dataclass
+class _Delta:
+    array: str  # "weight", "present" or "node:<attr>" for a poisoned node attribute
+    index: np.ndarray
+    old: np.ndarray
+
+
+@dataclass
+class LatticeVariant:
+    """Copy-on-write perturbed view of an :class:`EdgeSnapshot`.
+
+    Arrays are shared with the snapshot (or the variant this one was forked
+    from) until the first write. Every mutation appends a delta holding the
+    previous values of the touched entries.
+    """
+
+    base: EdgeSnapshot
+    _weight: np.ndarray = None
+    _present: np.ndarray = None
+    _poisoned: dict = field(default_factory=dict)
+    _owned: set = field(default_factory=set)
+    journal: list = field(default_factory=list)
+
+    def __post_init__(self):
+        if self._weight is None:
+            self._weight = self.base.weight
+        if self._present is None:
+            self._present = np.ones(self.base.num_edges, dtype=bool)
+            self._present.flags.writeable = False
+
+    # ------------------------------------------------------------------
+    @property
+    def weight(self) -> np.ndarray:
+        return self._weight
+
+    @property
+    def present(self) -> np.ndarray:
+        return self._present
+
+    def poisoned(self, node_attr: str = "goal") -> np.ndarray:
+        mask = self._poisoned.get(node_attr)
+        return mask if mask is not None else np.zeros(len(self.base.nodes), dtype=bool)
+
+    def _writable(self, name: str) -> np.ndarray:
+        if name not in self._owned:
+            if name == "weight":
+                self._weight = self._weight.copy()
+            elif name == "present":
+                self._present = self._present.copy()
+            else:
+                attr = name[len("node:"):]
+                self._poisoned[attr] = self.poisoned(attr).copy()
+            self._owned.add(name)
+        if name == "weight":
+            return self._weight
+        if name == "present":
+            return self._present
+        return self._poisoned[name[len("node:"):]]
+
+    def _write(self, array: str, index: np.ndarray, values) -> None:
+        target = self._writable(array)
+        self.journal.append(_Delta(array, index, target[index].copy()))
+        target[index] = values
+
+    def fork(self) -> "LatticeVariant":
+        """Child variant starting from this state; both copy on their next write."""
+        self._owned.clear()
+        for array in (self._weight, self._present, *self._poisoned.values()):
+            array.flags.writeable = False
+        return LatticeVariant(self.base, self._weight, self._present, dict(self._poisoned))
+
+    # ------------------------------------------------------------------
+    def set_weights(self, index, values) -> None:
+        self._write("weight", np.asarray(index, dtype=np.int64), values)
+
+    def noise(self, noise_level: float = 0.2, rng=None) -> np.ndarray:
+        """Gaussian weight noise on present, weighted edges; returns the touched edge indices."""
+        rng = np.random.default_rng(rng)
+        index = np.flatnonzero(self._present & self.base.weighted)
+        self.set_weights(index, np.maximum(0.1, self._weight[index] + rng.normal(0.0, noise_level, index.size)))
+        return index
+
+    def drop(self, drop_fraction: float = 0.1, rng=None) -> np.ndarray:
+        """Remove ``max(1, int(E * drop_fraction))`` present edges; returns their indices."""
+        rng = np.random.default_rng(rng)
+        live = np.flatnonzero(self._present)
+        if live.size == 0:
+            return live
+        index = np.sort(rng.choice(live, size=min(live.size, max(1, int(live.size * drop_fraction))), replace=False))
+        self._write("present", index, False)
+        return index
+
+    def restore(self, index) -> None:
+        self._write("present", np.asarray(index, dtype=np.int64), True)
+
+    def poison(self, node_attr: str = "goal", corruption_rate: float = 0.2, rng=None) -> np.ndarray:
+        """Corrupt ``node_attr`` on each node with probability ``corruption_rate``; returns node indices."""
+        rng = np.random.default_rng(rng)
+        hit = rng.random(len(self.base.nodes)) < corruption_rate
+        index = np.flatnonzero(hit & ~self.poisoned(node_attr))
+        self._write(f"node:{node_attr}", index, True)
+        return index
+
+    # ------------------------------------------------------------------
+    def checkpoint(self) -> int:
+        return len(self.journal)
+
+    def undo(self, steps: int = 1) -> None:
+        for _ in range(min(steps, len(self.journal))):
+            delta = self.journal.pop()
+            self._writable(delta.array)[delta.index] = delta.old
+
+    def rollback(self, checkpoint: int = 0) -> None:
+        """Undo every delta recorded after ``checkpoint``."""
+        self.undo(len(self.journal) - checkpoint)
+
+    # ------------------------------------------------------------------
+    def metrics(self) -> dict:
+        values = edge_metrics(self._weight[self._present])
+        return {name: float(value) for name, value in values.items()}
+
+    def to_graph(self) -> nx.Graph:
+        """Materialise the variant as a new graph (edge and node attributes copied)."""
+        base = self.base
+        graph = base.graph.__class__()
+        graph.add_nodes_from((n, dict(d)) for n, d in base.graph.nodes(data=True))
+        for attr, mask in self._poisoned.items():
+            for i in np.flatnonzero(mask).tolist():
+                graph.nodes[base.nodes[i]][attr] = CORRUPTED
+        nodes, src, dst = base.nodes, base.src, base.dst
+        for e in np.flatnonzero(self._present).tolist():
+            u, v = nodes[src[e]], nodes[dst[e]]
+            data = dict(base.graph.edges[u, v])
+            if base.weighted[e]:
+                data["weight"] = float(self._weight[e])
+            graph.add_edge(u, v, **data)
+        return graph
+
+
+class PerturbationCampaign:
+    """Perturbation campaign over one base lattice.
+
+    Parameters
+    ----------
+    lattice:
+        Graph captured once as the campaign's :class:`EdgeSnapshot`.
+    """
+
+    def __init__(self, lattice: nx.Graph):
+        self.snapshot = EdgeSnapshot.from_graph(lattice)
+
+    def variant(self) -> LatticeVariant:
+        return LatticeVariant(self.snapshot)
+
+    def trials(
+        self,
+        n_trials: int,
+        noise_level: float = 0.0,
+        drop_fraction: float = 0.0,
+        seed=None,
+    ) -> dict:
+        """Evaluate ``n_trials`` independent noise-then-drop trials at once.
+
+        Returns ``{"strain": ..., "coherence": ..., "weight": ..., "present": ...}``
+        with one row per trial; no graphs are built.
+        """
+
+        rng = np.random.default_rng(seed)
+        base = self.snapshot
+        weight = np.broadcast_to(base.weight, (n_trials, base.num_edges)).copy()
+        if noise_level:
+            noisy = np.maximum(0.1, weight + rng.normal(0.0, noise_level, weight.shape))
+            weight = np.where(base.weighted, noisy, weight)
+        present = np.ones_like(weight, dtype=bool)
+        if drop_fraction and base.num_edges:
+            k = min(base.num_edges, max(1, int(base.num_edges * drop_fraction)))
+            # A random permutation per row; its first k entries are dropped.
+            dropped = np.argpartition(rng.random(weight.shape), k - 1, axis=1)[:, :k]
+            np.put_along_axis(present, dropped, False, axis=1)
+        return {**edge_metrics(weight, present), "weight": weight, "present": present}
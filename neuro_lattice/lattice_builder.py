@@ -1,5 +1,207 @@
 import math
+from dataclasses import dataclass
+
 import networkx as nx
+import numpy as np
+
+# Unit cell of the double tetrahedron (nodes 0-7), spanning [0, 2] on each axis.
+_TETRA_CELL_POS = np.array(
+    [
+        (0.0, 0.0, 0.0), (1.0, 0.0, 0.0), (0.0, 1.0, 0.0), (0.0, 0.0, 1.0),
+        (1.0, 1.0, 1.0), (2.0, 1.0, 1.0), (1.0, 2.0, 1.0), (1.0, 1.0, 2.0),
+    ]
+)
+_TETRA_CELL_SPAN = 2.0
+_TETRA_CELL_EDGES = np.array(
+    [
+        (0, 1), (0, 2), (0, 3), (1, 2), (1, 3), (2, 3),
+        (4, 5), (4, 6), (4, 7), (5, 6), (5, 7), (6, 7),
+        (0, 4), (1, 5), (2, 6), (3, 7),
+    ]
+)
+# Links from a cell into its +x, +y and +z neighbour: (node in cell, node in neighbour).
+_TETRA_CELL_LINKS = (
+    np.array([(1, 0), (5, 4)]),
+    np.array([(2, 0), (6, 4)]),
+    np.array([(3, 0), (7, 4)]),
+)
+_TETRA_TO_EC = np.array([0, 4, 6, 7])
+_TETRA_FROM_EC = np.array([0, 4])
+
+
+@dataclass
+class SupercellArrays:
+    """Array description of a tiled lattice.
+
+    Attributes
+    ----------
+    nodes:
+        Node labels; cell nodes are integers and the tetrahedral centroids
+        are ``"IC"`` and ``"EC"``.
+    pos:
+        ``(n_nodes, 3)`` array of scaled coordinates.
+    src, dst:
+        Directed edges as indices into ``nodes``.
+    weight:
+        Euclidean length of each edge (minimum image across periodic
+        boundaries).
+    """
+
+    nodes: list
+    pos: np.ndarray
+    src: np.ndarray
+    dst: np.ndarray
+    weight: np.ndarray
+
+    @property
+    def num_edges(self):
+        return len(self.src)
+
+    def to_graph(self):
+        """Materialise the arrays as a ``networkx.DiGraph`` with ``pos``/``weight`` attributes."""
+        G = nx.DiGraph()
+        nodes = self.nodes
+        G.add_nodes_from(zip(nodes, ({"pos": p} for p in map(tuple, self.pos.tolist()))))
+        G.add_edges_from(
+            (nodes[u], nodes[v], {"weight": w})
+            for u, v, w in zip(self.src.tolist(), self.dst.tolist(), self.weight.tolist())
+        )
+        return G
+
+
+def _periodic_flags(periodic):
+    if isinstance(periodic, bool):
+        return (periodic,) * 3
+    flags = tuple(bool(p) for p in periodic)
+    if len(flags) != 3:
+        raise ValueError("periodic must be a bool or a 3-tuple of bools.")
+    return flags
+
+
+def _cell_grid(cells):
+    """Return the ``(n_cells, 3)`` integer coordinates of each cell, x-major."""
+    return np.stack(np.meshgrid(*[np.arange(n) for n in cells], indexing="ij"), axis=-1).reshape(-1, 3)
+
+
+def _neighbour_links(coords, cells, axis, periodic):
+    """Cells with a +axis neighbour: (cell index, neighbour index, wrapped mask)."""
+    _, ny, nz = cells
+    shifted = coords.copy()
+    shifted[:, axis] += 1
+    wrapped = shifted[:, axis] == cells[axis]
+    if periodic:
+        shifted[wrapped, axis] = 0
+        keep = np.ones(len(coords), dtype=bool)
+    else:
+        keep = ~wrapped
+    cell = np.flatnonzero(keep)
+    s = shifted[keep]
+    neighbour = (s[:, 0] * ny + s[:, 1]) * nz + s[:, 2]
+    return cell, neighbour, wrapped[keep]
+
+
+def supercell_arrays(lattice_type="tetrahedral", cells=(1, 1, 1), size=1.0, periodic=False):
+    """Tile a unit cell into an ``N x M x K`` supercell and return it as arrays.
+
+    Parameters
+    ----------
+    lattice_type:
+        ``'tetrahedral'`` tiles the double tetrahedron (8 nodes per cell) and
+        adds a single ``IC``/``EC`` centroid pair wired to every cell as in the
+        unit lattice. ``'cubic'`` tiles the unit cube into a point grid.
+    cells:
+        Number of unit cells along x, y and z.
+    size:
+        Scaling factor applied to all coordinates.
+    periodic:
+        Wrap the boundaries; a bool for all axes or a 3-tuple per axis.
+
+    A ``1 x 1 x 1`` non-periodic supercell reproduces
+    :meth:`LatticeBuilder.build_lattice` for the same lattice type.
+    """
+    cells = tuple(int(n) for n in cells)
+    if len(cells) != 3 or min(cells) < 1:
+        raise ValueError("cells must be three positive integers.")
+    periodic = _periodic_flags(periodic)
+    if lattice_type == "tetrahedral":
+        return _tetrahedral_supercell(cells, size, periodic)
+    if lattice_type == "cubic":
+        return _cubic_supercell(cells, size, periodic)
+    raise ValueError("Unsupported lattice type. Choose 'tetrahedral' or 'cubic'.")
+
+
+def _tetrahedral_supercell(cells, size, periodic):
+    coords = _cell_grid(cells)
+    n_cells = len(coords)
+    k = len(_TETRA_CELL_POS)
+    offsets = coords * _TETRA_CELL_SPAN
+    cell_pos = (offsets[:, None, :] + _TETRA_CELL_POS[None, :, :]).reshape(-1, 3)
+    period = np.array(cells) * _TETRA_CELL_SPAN
+
+    # Centroids sit at the supercell centre, offset as in the unit lattice.
+    centre = period / 2.0
+    pos = np.vstack([cell_pos, centre - 0.5, centre + 0.5]) * size
+    ic, ec = n_cells * k, n_cells * k + 1
+
+    base = np.arange(n_cells)[:, None] * k
+    src = [(base + _TETRA_CELL_EDGES[:, 0]).ravel()]
+    dst = [(base + _TETRA_CELL_EDGES[:, 1]).ravel()]
+    shift = [np.zeros((src[0].size, 3))]
+
+    for axis, links in enumerate(_TETRA_CELL_LINKS):
+        cell, neighbour, wrapped = _neighbour_links(coords, cells, axis, periodic[axis])
+        src.append((cell[:, None] * k + links[:, 0]).ravel())
+        dst.append((neighbour[:, None] * k + links[:, 1]).ravel())
+        s = np.zeros((cell.size, len(links), 3))
+        s[wrapped, :, axis] = period[axis]
+        shift.append(s.reshape(-1, 3))
+
+    src.append((base + _TETRA_TO_EC).ravel())
+    dst.append(np.full(n_cells * len(_TETRA_TO_EC), ec))
+    src.append(np.full(n_cells * len(_TETRA_FROM_EC), ec))
+    dst.append((base + _TETRA_FROM_EC).ravel())
+    src.append(np.array([ec]))
+    dst.append(np.array([ic]))
+    shift.append(np.zeros((n_cells * (len(_TETRA_TO_EC) + len(_TETRA_FROM_EC)) + 1, 3)))
+
+    src, dst, shift = np.concatenate(src), np.concatenate(dst), np.concatenate(shift)
+    weight = np.linalg.norm(pos[dst] + shift * size - pos[src], axis=1)
+    nodes = list(range(n_cells * k)) + ["IC", "EC"]
+    return _dedupe(SupercellArrays(nodes, pos, src, dst, weight))
+
+
+def _cubic_supercell(cells, size, periodic):
+    points = tuple(n if p else n + 1 for n, p in zip(cells, periodic))
+    coords = _cell_grid(points)
+    pos = coords.astype(float) * size
+
+    src, dst, shift = [], [], []
+    for axis in range(3):
+        cell, neighbour, wrapped = _neighbour_links(coords, points, axis, periodic[axis])
+        s = np.zeros((cell.size, 3))
+        s[wrapped, axis] = points[axis]
+        # Bidirectional edges, matching ``to_directed`` on the unit cube.
+        src += [cell, neighbour]
+        dst += [neighbour, cell]
+        shift += [s, -s]
+
+    src, dst, shift = np.concatenate(src), np.concatenate(dst), np.concatenate(shift)
+    weight = np.linalg.norm(pos[dst] + shift * size - pos[src], axis=1)
+    return _dedupe(SupercellArrays(list(range(len(coords))), pos, src, dst, weight))
+
+
+def _dedupe(arrays):
+    """Drop self-loops and repeated edges produced by short periodic axes."""
+    keep = arrays.src != arrays.dst
+    key = arrays.src * len(arrays.nodes) + arrays.dst
+    _, first = np.unique(key, return_index=True)
+    unique = np.zeros(len(key), dtype=bool)
+    unique[first] = True
+    keep &= unique
+    if keep.all():
+        return arrays
+    return SupercellArrays(arrays.nodes, arrays.pos, arrays.src[keep], arrays.dst[keep], arrays.weight[keep])
+
 
 class LatticeBuilder:
     def __init__(self, lattice_type='tetrahedral', size=1.0):
@@ -83,6 +285,15 @@ class LatticeBuilder:
 
         return G
 
+    def build_supercell(self, cells=(1, 1, 1), periodic=False):
+        """Build an ``N x M x K`` tiling of the current lattice type.
+
+        See :func:`supercell_arrays` for the tiling rules. The result keeps the
+        ``pos``/``weight`` attribute conventions of :meth:`build_lattice`.
+        """
+        self.lattice = supercell_arrays(self.lattice_type, cells, self.size, periodic).to_graph()
+        return self.lattice
+
     def set_lattice_parameters(self, lattice_type, size):
         self.lattice_type = lattice_type
         self.size = size
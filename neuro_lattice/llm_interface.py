@@ -1,14 +1,16 @@
+import asyncio
+import codecs
 import os
 import sys
 import subprocess
 import shlex
-import json
 import pty
+import time
 
-try:
-    import pexpect  # type: ignore
-except Exception:
-    pexpect = None
+from . import tracing
+from .brand_context import KernelSlice, render_context, slice_kernel
+from .provider_pool import get_pool, pool_enabled, provider_command
+from .response_cache import ResponseCache, cache_key, default_cache, is_cacheable
 
 def _run_once(prompt: str, use_pty: bool, inject_cursor_reply: bool=False) -> tuple[int, str, str]:
     """Run the codex CLI once, optionally under a pseudo‑TTY.
@@ -56,15 +58,18 @@ def _run_once(prompt: str, use_pty: bool, inject_cursor_reply: bool=False) -> tu
 
             os.close(slave)
 
+            # Decode incrementally: a 1024-byte read can split a UTF-8 character.
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
             output = []
             while True:
                 try:
                     data = os.read(master, 1024)
                     if not data:
                         break
-                    output.append(data.decode())
+                    output.append(decoder.decode(data))
                 except OSError:
                     break
+            output.append(decoder.decode(b"", final=True))
             
             process.wait(timeout=120)
             rc = process.returncode
@@ -95,7 +100,9 @@ def _run_codex_pexpect(prompt: str, timeout: int = 120) -> tuple[int, str, str]:
 
     Returns (rc, stdout, stderr_message).
     """
-    if pexpect is None:
+    try:
+        import pexpect  # type: ignore
+    except Exception:
         return 127, "", "pexpect not available"
 
     # Construct command via a shell to reuse quoting behavior
@@ -168,16 +175,80 @@ def _run_codex_pexpect(prompt: str, timeout: int = 120) -> tuple[int, str, str]:
         return 1, "", str(e)
 
 
+def _attempt(provider: str, strategy: str, run, *args, **kwargs) -> tuple[int, str, str]:
+    """One provider invocation, traced and timed per provider and strategy."""
+    rc = None
+    start = time.perf_counter()
+    with tracing.span("provider.attempt", provider=provider, strategy=strategy) as span:
+        try:
+            rc, out, err = run(*args, **kwargs)
+            span.set(returncode=rc)
+            return rc, out, err
+        finally:
+            _observe(provider, strategy, start, rc)
+
+
+async def _aattempt(provider: str, strategy: str, run, *args, **kwargs) -> tuple[int, str, str]:
+    """Async :func:`_attempt`; ``run`` is awaited."""
+    rc = None
+    start = time.perf_counter()
+    with tracing.span("provider.attempt", provider=provider, strategy=strategy) as span:
+        try:
+            rc, out, err = await run(*args, **kwargs)
+            span.set(returncode=rc)
+            return rc, out, err
+        finally:
+            _observe(provider, strategy, start, rc)
+
+
+def _observe(provider: str, strategy: str, start: float, rc: int | None) -> None:
+    tracing.PROVIDER_SECONDS.labels(provider, strategy).observe(time.perf_counter() - start)
+    if rc != 0:  # non-zero exit, or None for a timeout/exception
+        tracing.PROVIDER_ERRORS.labels(provider, strategy).inc()
+
+
+def _tty_issue(out: str, err: str) -> bool:
+    """Whether codex failed for want of a terminal (cursor-position or TTY errors)."""
+    combined = f"{err}\n{out}".lower()
+    return "cursor position" in combined or "could not be read" in combined or ("tty" in combined and "error" in combined)
+
+
+def _codex_result(rc: int, out: str, err: str) -> str:
+    """Map a single direct codex invocation (pool worker or asyncio) to run_codex's output."""
+    if "Update available" in err and rc == 0:
+        err = ""
+    if rc == 0 and out and "[codex_error]" not in out.lower():
+        return out
+    if rc != 0:
+        return f"[CODEX_ERROR] {err or out or 'Codex returned non-zero exit'}"
+    return out or "[WARN] Codex returned empty output"
+
+
+@tracing.traced("provider.run_codex")
 def run_codex(prompt: str) -> str:
     """Invoke codex robustly in non-/interactive contexts.
 
     Order of attempts:
     1) pexpect PTY (preferred for servers) unless FORCE_SUBPROCESS=1
     2) subprocess with PTY injection helpers
+
+    With PROVIDER_POOL=1 the prompt goes to a worker from the provider pool
+    first (see ``neuro_lattice.provider_pool``). Pool workers have no
+    terminal, so a reply reporting a TTY issue falls back to the strategies
+    above.
     """
+    if pool_enabled():
+        rc, out, err = _attempt("codex", "pool", get_pool("codex").run, prompt)
+        if not _tty_issue(out, err):
+            return _codex_result(rc, out, err)
+    return _run_codex_direct(prompt)
+
+
+def _run_codex_direct(prompt: str) -> str:
+    """``run_codex`` without the pool: pexpect, then the subprocess/PTY fallbacks."""
     # Prefer pexpect unless explicitly disabled
     if os.environ.get("FORCE_SUBPROCESS") != "1":
-        rc, out, err = _run_codex_pexpect(prompt)
+        rc, out, err = _attempt("codex", "pexpect", _run_codex_pexpect, prompt)
         if rc == 0 and out:
             return out
         if rc == 0 and not out:
@@ -191,30 +262,26 @@ def run_codex(prompt: str) -> str:
         # Fallback to subprocess strategy
         force_pty = os.environ.get("FORCE_PTY") == "1"
 
-        rc, out, err = _run_once(prompt, use_pty=bool(force_pty), inject_cursor_reply=True)
+        rc, out, err = _attempt("codex", "pty" if force_pty else "subprocess",
+                                _run_once, prompt, use_pty=bool(force_pty), inject_cursor_reply=True)
 
         if "Update available" in err and rc == 0:
             err = ""
 
-        combined = f"{err}\n{out}".lower()
-        has_codex_error_marker = "[codex_error]" in combined
-        tty_issue = (
-            "cursor position" in combined
-            or "could not be read" in combined
-            or ("tty" in combined and "error" in combined)
-        )
+        has_codex_error_marker = "[codex_error]" in f"{err}\n{out}".lower()
+        tty_issue = _tty_issue(out, err)
 
         if rc == 0 and out and not has_codex_error_marker and not tty_issue:
             return out
 
         if not force_pty and (tty_issue or has_codex_error_marker):
-            rc2, out2, err2 = _run_once(prompt, use_pty=False, inject_cursor_reply=True)
+            rc2, out2, err2 = _attempt("codex", "subprocess", _run_once, prompt, use_pty=False, inject_cursor_reply=True)
             if "Update available" in err2 and rc2 == 0:
                 err2 = ""
             comb2 = f"{err2}\n{out2}".lower()
             if rc2 == 0 and out2 and "[codex_error]" not in comb2:
                 return out2
-            rc3, out3, err3 = _run_once(prompt, use_pty=True, inject_cursor_reply=True)
+            rc3, out3, err3 = _attempt("codex", "pty", _run_once, prompt, use_pty=True, inject_cursor_reply=True)
             if "Update available" in err3 and rc3 == 0:
                 err3 = ""
             comb3 = f"{err3}\n{out3}".lower()
@@ -232,19 +299,24 @@ def run_codex(prompt: str) -> str:
     except subprocess.TimeoutExpired:
         return "[CODEX_ERROR] Timeout while waiting for Codex."
 
-def codex_with_brand_context(prompt: str, brand_data: dict) -> str:
+def codex_with_brand_context(prompt: str, brand_data: dict, modal: str | None = None, event: str | None = None) -> str:
 
 
     # Prime Codex with brand identity first
-    context = f"""You are a brand agent. Here is the brand's identity context:
+    return run_codex(_brand_prompt(prompt, slice_kernel(brand_data, modal, event)))
+
 
-{json.dumps(brand_data, indent=2)}
+def _brand_prompt(prompt: str, brand_data: dict) -> str:
+    # Kernel slices render as compact JSON; whole kernels keep the indented form.
+    context = render_context(brand_data, compact=isinstance(brand_data, KernelSlice))
+    return f"""You are a brand agent. Here is the brand's identity context:
+
+{context}
 
 Now complete the following task with this tone, structure, and memory:
 
 {prompt}
 """
-    return run_codex(context)
 
 
 # ---- Gemini integration (CLI or mock) ----
@@ -261,16 +333,29 @@ def _run_cli(cmd: str, env: dict | None = None, timeout: int = 120) -> tuple[int
     return result.returncode, (result.stdout or "").strip(), (result.stderr or "").strip()
 
 
+def _gemini_result(rc: int, out: str, err: str) -> str:
+    if rc == 0 and out:
+        return out
+    if rc != 0:
+        return f"[GEMINI_ERROR] {err or out or 'Gemini returned non-zero exit'}"
+    return "[WARN] Gemini returned empty output"
+
+
+@tracing.traced("provider.run_gemini")
 def run_gemini(prompt: str) -> str:
     """Invoke a Gemini CLI if available, else fall back to mock.
 
     Set GEMINI_CMD to the executable if needed (default: 'gemini').
     Set GEMINI_ARGS to additional args (e.g., model selection).
     Set GEMINI_MOCK=1 to force a mock response for testing.
+    Set PROVIDER_POOL=1 to borrow a warm worker from the provider pool.
     """
     if os.environ.get("GEMINI_MOCK") == "1":
         return f"[S2/GEMINI MOCK] {prompt[:140]}…"
 
+    if pool_enabled():
+        return _gemini_result(*_attempt("gemini", "pool", get_pool("gemini").run, prompt))
+
     gemini_cmd = os.environ.get("GEMINI_CMD", "gemini")
     gemini_args = os.environ.get("GEMINI_ARGS", "").strip()
     use_stdin = os.environ.get("GEMINI_USE_STDIN") == "1"
@@ -293,14 +378,14 @@ def run_gemini(prompt: str) -> str:
         cmd = f"{gemini_cmd} {gemini_args} {shlex.quote(prompt)}".strip()
 
     try:
-        rc, out, err = _run_cli(cmd, env=env)
+        rc, out, err = _attempt("gemini", "stdin" if use_stdin else "args", _run_cli, cmd, env=env)
         if rc == 0 and out:
             return out
         if rc != 0:
             # Fallback: if arg mode failed, try stdin mode once
             if not use_stdin:
                 alt_cmd = f"printf %s {shlex.quote(prompt)} | {gemini_cmd} {gemini_args}".strip()
-                rc2, out2, err2 = _run_cli(alt_cmd, env=env)
+                rc2, out2, err2 = _attempt("gemini", "stdin", _run_cli, alt_cmd, env=env)
                 if rc2 == 0 and out2:
                     return out2
                 return f"[GEMINI_ERROR] {err2 or err or out2 or out or 'Gemini returned non-zero exit'}"
@@ -310,15 +395,120 @@ def run_gemini(prompt: str) -> str:
         return "[GEMINI_ERROR] Timeout while waiting for Gemini."
 
 
-def with_brand_context(provider: str, prompt: str, brand_data: dict) -> str:
+def with_brand_context(provider: str, prompt: str, brand_data: dict, cache: ResponseCache | None = None,
+                       modal: str | None = None, event: str | None = None) -> str:
+    """Run ``prompt`` on ``provider`` primed with the brand kernel.
+
+    With ``modal`` (and optionally ``event``) only that slice of the kernel
+    is sent, as compact JSON (see ``neuro_lattice.brand_context``).
+    Responses are served from ``cache`` (or the ``RESPONSE_CACHE=1`` default
+    cache) when the same provider, prompt and kernel were seen before.
+    """
     provider = (provider or "codex").lower()
+    brand_data = slice_kernel(brand_data, modal, event)
+    cache = cache if cache is not None else default_cache()
+    if cache is None or provider in ("mock", "dummy"):
+        return _dispatch_brand_context(provider, prompt, brand_data)
+    return cache.get_or_call(provider, prompt, brand_data, lambda: _dispatch_brand_context(provider, prompt, brand_data))
+
+
+def _dispatch_brand_context(provider: str, prompt: str, brand_data: dict) -> str:
     if provider == "codex":
         return codex_with_brand_context(prompt, brand_data)
     if provider in ("gemini", "google", "vertex"):  # accept aliases
-        context = f"""You are a brand agent. Here is the brand's identity context:\n\n{json.dumps(brand_data, indent=2)}
-
-Now complete the following task with this tone, structure, and memory:\n\n{prompt}\n"""
-        return run_gemini(context)
+        return run_gemini(_brand_prompt(prompt, brand_data))
     if provider in ("mock", "dummy"):
         return f"[MOCK/{provider.upper()}] {prompt[:160]}…"
     return f"[LLM_ERROR] Unknown provider '{provider}'."
+
+
+
+# ---- asyncio variants (used by the streaming mediator endpoints) ----
+async def _arun_cli(provider: str, prompt: str, timeout: float = 120, force_stdin: bool = False) -> tuple[int, str, str]:
+    """Run a provider CLI directly as an asyncio subprocess (no shell, no PTY)."""
+    argv, use_stdin, env = provider_command(provider)
+    if use_stdin or force_stdin:
+        data = prompt
+    else:
+        argv = [*argv, prompt]
+        # codex: answer the cursor-position query (DSR) up front, as run_codex does.
+        data = "\033[1;1R" if provider == "codex" else ""
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            *argv,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env=env,
+        )
+    except OSError as e:
+        return 127, "", str(e)
+    try:
+        out, err = await asyncio.wait_for(proc.communicate(data.encode()), timeout)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        raise
+    return proc.returncode, out.decode(errors="replace").strip(), err.decode(errors="replace").strip()
+
+
+async def arun_codex(prompt: str, timeout: float = 120) -> str:
+    """Async ``run_codex``: one direct codex invocation (or a pool worker with PROVIDER_POOL=1).
+
+    Like ``run_codex``, a reply reporting a TTY issue is retried through the
+    PTY strategies (in a worker thread).
+    """
+    try:
+        if pool_enabled():
+            rc, out, err = await _aattempt("codex", "pool", asyncio.to_thread, get_pool("codex").run, prompt, timeout)
+        else:
+            rc, out, err = await _aattempt("codex", "async", _arun_cli, "codex", prompt, timeout)
+    except asyncio.TimeoutError:
+        return "[CODEX_ERROR] Timeout while waiting for Codex."
+    if _tty_issue(out, err):
+        return await asyncio.to_thread(_run_codex_direct, prompt)
+    return _codex_result(rc, out, err)
+
+
+async def arun_gemini(prompt: str, timeout: float = 120) -> str:
+    """Async ``run_gemini``; honours GEMINI_MOCK, GEMINI_CMD/ARGS/USE_STDIN and PROVIDER_POOL."""
+    if os.environ.get("GEMINI_MOCK") == "1":
+        return f"[S2/GEMINI MOCK] {prompt[:140]}…"
+    try:
+        if pool_enabled():
+            return _gemini_result(*await _aattempt("gemini", "pool", asyncio.to_thread, get_pool("gemini").run, prompt, timeout))
+        rc, out, err = await _aattempt("gemini", "async", _arun_cli, "gemini", prompt, timeout)
+        if rc != 0 and os.environ.get("GEMINI_USE_STDIN") != "1":
+            # Same fallback as run_gemini: retry arg mode failures via stdin.
+            rc2, out2, err2 = await _aattempt("gemini", "async_stdin", _arun_cli, "gemini", prompt, timeout, force_stdin=True)
+            if rc2 == 0 and out2:
+                return out2
+            return f"[GEMINI_ERROR] {err2 or err or out2 or out or 'Gemini returned non-zero exit'}"
+        return _gemini_result(rc, out, err)
+    except asyncio.TimeoutError:
+        return "[GEMINI_ERROR] Timeout while waiting for Gemini."
+
+
+async def awith_brand_context(provider: str, prompt: str, brand_data: dict, cache: ResponseCache | None = None,
+                              modal: str | None = None, event: str | None = None) -> str:
+    """Async ``with_brand_context`` with the same providers, aliases, kernel slicing and cache."""
+    provider = (provider or "codex").lower()
+    brand_data = slice_kernel(brand_data, modal, event)
+    if provider in ("mock", "dummy"):
+        return f"[MOCK/{provider.upper()}] {prompt[:160]}…"
+    if provider == "codex":
+        call = arun_codex
+    elif provider in ("gemini", "google", "vertex"):
+        call = arun_gemini
+    else:
+        return f"[LLM_ERROR] Unknown provider '{provider}'."
+    cache = cache if cache is not None else default_cache()
+    key = cache_key(provider, prompt, brand_data) if cache is not None else None
+    if cache is not None:
+        cached = await asyncio.to_thread(cache.get, key)
+        if cached is not None:
+            return cached
+    response = await call(_brand_prompt(prompt, brand_data))
+    if cache is not None and is_cacheable(response):
+        await asyncio.to_thread(cache.put, key, response, provider)
+    return response
@@ -0,0 +1,261 @@
+"""Exact routing statistics from the router's absorbing Markov chain.
+
+The dynamics of :meth:`RoutingEngine.decide_next` are a Markov chain on
+``(node, confidence)``. Every increment is a multiple of ``0.01``, so a
+packet starting at confidence ``c`` only ever holds ``c`` plus whole units of
+``0.01`` (until the cap at ``1.0``). Packets are grouped by the start's
+offset from the ``0.01`` grid, and each group's chain holds confidence as an
+integer level above that offset:
+
+* a System 2 node below its threshold dwells, confidence ``+5`` units;
+* a node without successors holds the packet, confidence unchanged;
+* otherwise a uniformly chosen successor, confidence ``+2`` units;
+* confidence is capped at level ``100``, which is exactly ``1.0``, and
+  ``EC`` is absorbing.
+
+:func:`solve_routing` builds the sparse transition matrix over the states
+reachable from a packet population and answers, with one sparse LU
+factorisation per offset group, what Monte Carlo sweeps only estimate:
+expected steps to ``EC``, absorption probabilities and expected visit counts.
+
+Confidence arithmetic is exact here, including off-grid starts such as
+``0.648``. The float router can differ only where its accumulated rounding
+error decides a comparison, i.e. where ``start + k * 0.01`` equals a
+threshold up to about ``1e-9``.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import networkx as nx
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
+from scipy.sparse.linalg import splu
+
+from .routing_engine import CompiledLattice, RoutingEngine
+
+#: Confidence resolution of the chain and the router's increments in those units.
+UNIT = 0.01
+LEVELS = 101
+DWELL_GAIN = 5
+MOVE_GAIN = 2
+
+
+def _levels(confidence) -> tuple[np.ndarray, np.ndarray]:
+    """Split confidences in ``[0, 1]`` into an integer level and an offset in ``[0, 1)`` units.
+
+    Offsets are rounded to 1e-9 units, so grid values such as ``0.07`` get
+    offset ``0``.
+    """
+    units = np.round(np.asarray(confidence, dtype=np.float64) / UNIT, 9)
+    if units.size and not (units.min() >= 0 and units.max() <= LEVELS - 1):
+        raise ValueError("packet confidences must lie in [0, 1]")
+    level = np.floor(units)
+    return level.astype(np.int64), np.round(units - level, 9)
+
+
+def _thresholds(compiled: CompiledLattice, offset: float) -> tuple[np.ndarray, np.ndarray]:
+    """Per node, the first unheld level below the cap and the cap's gate.
+
+    Below the cap a level ``l`` stands for ``l + offset`` units and is held
+    while ``l < ceil(T - offset)``; level ``100`` is exactly ``1.0`` whatever
+    the offset (values past it are capped), held while ``100 < T``.
+    """
+    units = compiled.threshold / UNIT
+    below = np.ceil(np.round(units - offset, 9)).astype(np.int64)
+    capped = LEVELS - 1 < np.ceil(np.round(units, 9))
+    return below, capped
+
+
+def _transitions(compiled: CompiledLattice, threshold, codes: np.ndarray):
+    """COO pieces ``(row, next_code, probability)`` of every state in ``codes``."""
+    below, capped = threshold
+    node, level = np.divmod(codes, LEVELS)
+    rows = np.arange(codes.size)
+    start = compiled.indptr[node]
+    degree = compiled.indptr[node + 1] - start
+    held = np.where(level == LEVELS - 1, capped[node], level < below[node])
+    gated = compiled.system2[node] & held
+    hold = (node == compiled.ec) | (~gated & (degree == 0))
+    movers = np.flatnonzero(~gated & ~hold)
+
+    dwell = np.flatnonzero(gated)
+    pieces = [
+        (rows[hold], codes[hold], np.ones(np.count_nonzero(hold))),
+        (dwell, node[dwell] * LEVELS + np.minimum(LEVELS - 1, level[dwell] + DWELL_GAIN), np.ones(dwell.size)),
+    ]
+    if movers.size:
+        fan = degree[movers]
+        row = np.repeat(movers, fan)
+        offset = np.arange(fan.sum()) - np.repeat(np.cumsum(fan) - fan, fan)
+        successor = compiled.indices[start[row] + offset]
+        pieces.append((row, successor * LEVELS + np.minimum(LEVELS - 1, level[row] + MOVE_GAIN), 1.0 / fan.repeat(fan)))
+    return tuple(np.concatenate(parts) for parts in zip(*pieces))
+
+
+@dataclass
+class RoutingChain:
+    """Sparse transition matrix over the reachable ``(node, confidence)`` states.
+
+    Attributes
+    ----------
+    compiled:
+        The compiled lattice the chain was built from.
+    codes:
+        Sorted state codes ``node_index * LEVELS + level``.
+    matrix:
+        Row-stochastic CSR transition matrix indexed like ``codes``.
+    offset:
+        Offset of the levels from the ``0.01`` grid, in units of ``0.01``.
+    """
+
+    compiled: CompiledLattice
+    codes: np.ndarray
+    matrix: sp.csr_array
+    offset: float = 0.0
+
+    @classmethod
+    def build(cls, compiled: CompiledLattice, start_codes, offset: float = 0.0) -> "RoutingChain":
+        """Enumerate states reachable from ``start_codes`` level by level."""
+        threshold = _thresholds(compiled, offset)
+        seen = np.zeros(compiled.num_nodes * LEVELS, dtype=bool)
+        frontier = np.unique(np.asarray(start_codes, dtype=np.int64))
+        seen[frontier] = True
+        while frontier.size:
+            _, nxt, _ = _transitions(compiled, threshold, frontier)
+            nxt = np.unique(nxt)
+            frontier = nxt[~seen[nxt]]
+            seen[frontier] = True
+        codes = np.flatnonzero(seen)
+        row, nxt, prob = _transitions(compiled, threshold, codes)
+        col = np.searchsorted(codes, nxt)
+        matrix = sp.csr_array((prob, (row, col)), shape=(codes.size, codes.size))
+        return cls(compiled, codes, matrix, offset)
+
+    @property
+    def num_states(self) -> int:
+        return self.codes.size
+
+    def index(self, codes) -> np.ndarray:
+        return np.searchsorted(self.codes, codes)
+
+    def states(self) -> list[tuple]:
+        """``(node, confidence)`` label of every state."""
+        node, level = np.divmod(self.codes, LEVELS)
+        return [
+            (self.compiled.nodes[n], 1.0 if l == LEVELS - 1 else (l + self.offset) * UNIT)
+            for n, l in zip(node.tolist(), level.tolist())
+        ]
+
+
+@dataclass
+class MarkovSolution:
+    """Exact routing statistics for a packet population.
+
+    Attributes
+    ----------
+    nodes:
+        Node labels in compiled index order.
+    expected_steps:
+        Per packet, expected steps to reach ``EC`` (``inf`` when ``EC`` is
+        not reached almost surely).
+    absorption:
+        Per packet, probability of ever reaching ``EC``.
+    visit_counts:
+        Expected arrivals per node summed over packets, the analytic
+        counterpart of ``RoutingEngine.visit_counts`` for an unbounded run
+        (``inf`` for nodes in traps the packets can fall into).
+    num_states:
+        Size of the reachable state space.
+    """
+
+    nodes: list
+    expected_steps: np.ndarray
+    absorption: np.ndarray
+    visit_counts: np.ndarray
+    num_states: int
+
+    def visits(self) -> dict:
+        return {n: float(c) for n, c in zip(self.nodes, self.visit_counts.tolist()) if c}
+
+
+def solve_routing(lattice: nx.DiGraph | CompiledLattice, packets, tol: float = 1e-9) -> MarkovSolution:
+    """Solve the routing chain for ``packets`` (dicts with ``location`` and ``confidence``).
+
+    States in closed classes (``EC`` and traps such as dead ends or cycles
+    that cannot reach ``EC``) are absorbing; with ``Q`` the transitions among
+    the remaining transient states, one LU factorisation of ``I - Q`` gives
+    absorption probabilities, expected steps and expected occupancies.
+    Packets whose starts sit at different offsets from the ``0.01`` grid are
+    solved as separate chains.
+    """
+
+    compiled = lattice if isinstance(lattice, CompiledLattice) else RoutingEngine(lattice).compile()
+    packets = list(packets)
+    node = np.fromiter((compiled.index[p["location"]] for p in packets), dtype=np.int64, count=len(packets))
+    level, offset = _levels([p["confidence"] for p in packets])
+    start = node * LEVELS + level
+    steps = np.empty(len(packets))
+    absorb = np.empty(len(packets))
+    visits = np.zeros(compiled.num_nodes)
+    n_states = 0
+    for group_offset in np.unique(offset):
+        group = np.flatnonzero(offset == group_offset)
+        group_steps, group_absorb, group_visits, group_states = _solve(compiled, start[group], group_offset, tol)
+        steps[group], absorb[group] = group_steps, group_absorb
+        visits += group_visits
+        n_states += group_states
+    return MarkovSolution(list(compiled.nodes), steps, absorb, visits, n_states)
+
+
+def _solve(compiled: CompiledLattice, start: np.ndarray, offset: float, tol: float):
+    """``(expected_steps, absorption, visit_counts, num_states)`` of one offset group."""
+    chain = RoutingChain.build(compiled, start, offset)
+    P = chain.matrix
+    n_states = chain.num_states
+    state_node = chain.codes // LEVELS
+
+    # Closed classes are strongly connected components with no exit.
+    n_comp, comp = connected_components(P, directed=True, connection="strong")
+    coo = P.tocoo()
+    exits = comp[coo.row] != comp[coo.col]
+    open_comp = np.zeros(n_comp, dtype=bool)
+    open_comp[comp[coo.row[exits]]] = True
+    closed = ~open_comp[comp]
+    is_ec = state_node == compiled.ec
+    transient = np.flatnonzero(~closed)
+    position = np.full(n_states, -1)
+    position[transient] = np.arange(transient.size)
+
+    start_state = chain.index(start)
+    mass = np.bincount(start_state, minlength=n_states).astype(np.float64)
+
+    absorb = np.zeros(n_states)
+    absorb[is_ec] = 1.0
+    steps = np.zeros(n_states)
+    steps[closed & ~is_ec] = np.inf
+    visits = np.zeros(compiled.num_nodes)
+    flow = mass.copy()
+    flow[transient] = 0.0
+    if transient.size:
+        PT = P[transient]
+        Q = PT[:, transient]
+        lu = splu(sp.csc_matrix(sp.identity(transient.size) - Q))
+        absorb[transient] = lu.solve(PT[:, np.flatnonzero(is_ec)].sum(axis=1))
+        time = lu.solve(np.ones(transient.size))
+        steps[transient] = np.where(absorb[transient] > 1 - tol, time, np.inf)
+        occupancy = lu.solve(mass[transient], trans="T")
+        np.add.at(visits, state_node[transient], occupancy - mass[transient])
+        flow[closed] += occupancy @ PT[:, np.flatnonzero(closed)]
+
+    # Mass entering EC arrives once; mass entering any other closed class
+    # circulates through its nodes forever.
+    ec_arrivals = flow[is_ec].sum() - mass[is_ec].sum()
+    if compiled.ec >= 0:
+        visits[compiled.ec] += ec_arrivals
+    trapped = np.unique(comp[closed & ~is_ec & (flow > 0)])
+    visits[np.unique(state_node[np.isin(comp, trapped)])] = np.inf
+
+    return steps[start_state], absorb[start_state], visits, n_states
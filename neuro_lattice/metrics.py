@@ -1,6 +1,9 @@
+import random
+
 import numpy as np
 import networkx as nx
-from scipy.sparse.linalg import eigsh
+
+from . import tracing
 
 def compute_coherence(lattice):
     """
@@ -39,6 +42,264 @@ class MetricsCalculator:
             "drift": _calculate_drift(lattice),
         }
 
+class _TreapNode:
+    __slots__ = ("key", "d", "priority", "left", "right", "size", "dsum", "dsq")
+
+    def __init__(self, key, d, priority):
+        self.key = key
+        self.d = d
+        self.priority = priority
+        self.left = None
+        self.right = None
+        self.size = 1
+        self.dsum = d
+        self.dsq = d * d
+
+
+def _pull(node):
+    size, dsum, dsq = 1, node.d, node.d * node.d
+    for child in (node.left, node.right):
+        if child is not None:
+            size += child.size
+            dsum += child.dsum
+            dsq += child.dsq
+    node.size, node.dsum, node.dsq = size, dsum, dsq
+    return node
+
+
+def _split(node, key):
+    """Split into (keys < key, keys >= key)."""
+    if node is None:
+        return None, None
+    if node.key < key:
+        left, right = _split(node.right, key)
+        node.right = left
+        return _pull(node), right
+    left, right = _split(node.left, key)
+    node.left = right
+    return left, _pull(node)
+
+
+def _merge(a, b):
+    if a is None:
+        return b
+    if b is None:
+        return a
+    if a.priority > b.priority:
+        a.right = _merge(a.right, b)
+        return _pull(a)
+    b.left = _merge(a, b.left)
+    return _pull(b)
+
+
+class _OrderStatisticTree:
+    """Treap of edge weights keyed by ``(weight, uid)``.
+
+    Each subtree caches its size and the sum and sum of squares of the
+    weights' offsets from a fixed ``shift``, so rank-restricted sums cost
+    ``O(log E)``. Priorities come from a private, fixed-seed generator so the
+    global :mod:`random` stream is left alone.
+    """
+
+    def __init__(self, shift=0.0):
+        self.root = None
+        self.shift = shift
+        self._random = random.Random(0)
+
+    def build(self, items):
+        """Bulk-load ``(weight, uid)`` items in ``O(E log E)`` via a Cartesian tree."""
+        stack = []
+        for key in sorted(items):
+            node = _TreapNode(key, key[0] - self.shift, self._random.random())
+            last = None
+            while stack and stack[-1].priority < node.priority:
+                last = stack.pop()
+            node.left = last
+            if stack:
+                stack[-1].right = node
+            stack.append(node)
+        self.root = stack[0] if stack else None
+        # Recompute aggregates bottom-up (post-order, iterative).
+        order, todo = [], [self.root] if self.root else []
+        while todo:
+            node = todo.pop()
+            order.append(node)
+            todo.extend(c for c in (node.left, node.right) if c is not None)
+        for node in reversed(order):
+            _pull(node)
+
+    def insert(self, key):
+        left, right = _split(self.root, key)
+        node = _TreapNode(key, key[0] - self.shift, self._random.random())
+        self.root = _merge(_merge(left, node), right)
+
+    def remove(self, key):
+        left, right = _split(self.root, key)
+        _, right = _split(right, key + (1,))
+        self.root = _merge(left, right)
+
+    def below(self, offset):
+        """Return ``(count, offset_sum)`` of entries whose offset is below ``offset``."""
+        count, dsum = 0, 0.0
+        node = self.root
+        while node is not None:
+            if node.d < offset:
+                if node.left is not None:
+                    count += node.left.size
+                    dsum += node.left.dsum
+                count += 1
+                dsum += node.d
+                node = node.right
+            else:
+                node = node.left
+        return count, dsum
+
+    def totals(self):
+        if self.root is None:
+            return 0, 0.0, 0.0
+        return self.root.size, self.root.dsum, self.root.dsq
+
+    def keys(self):
+        """All keys in order."""
+        out, stack, node = [], [], self.root
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            out.append(node.key)
+            node = node.right
+        return out
+
+    def recenter(self, shift):
+        """Rebuild with offsets measured from ``shift``."""
+        keys = self.keys()
+        self.shift = shift
+        self.build(keys)
+
+
+class MetricsTracker:
+    """Incrementally maintained :func:`compute_coherence` and :func:`compute_strain`.
+
+    The tracker mirrors the lattice's edge weights and is kept current by
+    edge events instead of rescanning ``lattice.edges`` after every mutation.
+    Weights live in an order-statistics treap whose subtrees cache counts and
+    shifted first and second moments, so coherence is read in ``O(1)`` and the
+    mean-absolute-deviation strain in ``O(log E)``. When the weights drift so
+    far from the shift that the moments would cancel (squared mean offset
+    above ``RECENTER_RATIO`` times the variance), the next read rebuilds the
+    treap around the current mean in ``O(E)``. Results agree with the
+    full-scan functions up to floating-point rounding.
+
+    The tracker is callable as ``tracker(event, u, v, weight)`` with
+    ``event`` in ``{"add", "remove", "reweight"}``, which is the listener
+    signature used by the perturbation engines' ``subscribe``.
+    """
+
+    RECENTER_RATIO = 16.0
+
+    def __init__(self, lattice=None):
+        self._edges = {}
+        self._uid = 0
+        self._directed = True
+        self._tree = _OrderStatisticTree()
+        if lattice is not None:
+            self.reset(lattice)
+
+    def reset(self, lattice):
+        """Resynchronise with every edge of ``lattice``."""
+        self._directed = lattice.is_directed()
+        self._edges = {}
+        items = []
+        for uid, (u, v, d) in enumerate(lattice.edges(data=True)):
+            key = (d.get("weight", 1.0), uid)
+            self._edges[(u, v)] = key
+            items.append(key)
+        self._uid = len(items)
+        shift = float(np.mean([k[0] for k in items])) if items else 0.0
+        self._tree = _OrderStatisticTree(shift)
+        self._tree.build(items)
+        return self
+
+    def _key(self, u, v):
+        if not self._directed and (u, v) not in self._edges:
+            return v, u
+        return u, v
+
+    # ------------------------------------------------------------------
+    def edge_added(self, u, v, weight=1.0):
+        edge = self._key(u, v)
+        if edge in self._edges:
+            self.edge_reweighted(u, v, weight)
+            return
+        key = (weight, self._uid)
+        self._uid += 1
+        self._edges[edge] = key
+        self._tree.insert(key)
+
+    def edge_removed(self, u, v):
+        key = self._edges.pop(self._key(u, v), None)
+        if key is not None:
+            self._tree.remove(key)
+
+    def edge_reweighted(self, u, v, weight):
+        edge = self._key(u, v)
+        old = self._edges.get(edge)
+        if old is None:
+            self.edge_added(u, v, weight)
+            return
+        self._tree.remove(old)
+        key = (weight, old[1])
+        self._edges[edge] = key
+        self._tree.insert(key)
+
+    def __call__(self, event, u, v, weight=None):
+        if event == "add":
+            self.edge_added(u, v, 1.0 if weight is None else weight)
+        elif event == "remove":
+            self.edge_removed(u, v)
+        elif event == "reweight":
+            self.edge_reweighted(u, v, weight)
+        else:
+            raise ValueError(f"Unsupported edge event: {event}")
+
+    # ------------------------------------------------------------------
+    def __len__(self):
+        return len(self._edges)
+
+    def _totals(self):
+        n, dsum, dsq = self._tree.totals()
+        if n:
+            mean = dsum / n
+            var = dsq / n - mean * mean
+            # The 1e-8 floor matches coherence's regulariser: below it the variance is immaterial.
+            if mean * mean > self.RECENTER_RATIO * max(var, 1e-8):
+                self._tree.recenter(self._tree.shift + mean)
+                n, dsum, dsq = self._tree.totals()
+        return n, dsum, dsq
+
+    def coherence(self):
+        """Inverse variance of the tracked edge weights (``nan`` when empty)."""
+        n, dsum, dsq = self._totals()
+        if n == 0:
+            return float("nan")
+        mean = dsum / n
+        var = max(dsq / n - mean * mean, 0.0)
+        return 1.0 / (var + 1e-8)
+
+    def strain(self):
+        """Sum of absolute deviations of the tracked weights from their mean."""
+        n, dsum, _ = self._totals()
+        if n == 0:
+            return 0.0
+        c = dsum / n
+        n_lo, dsum_lo = self._tree.below(c)
+        return (dsum - dsum_lo - c * (n - n_lo)) + (c * n_lo - dsum_lo)
+
+    def metrics(self):
+        return {"strain": self.strain(), "coherence": self.coherence()}
+
+
 def _calculate_drift(lattice):
     """Simple drift metric: use strain as proxy."""
     return compute_strain(lattice)
@@ -50,11 +311,14 @@ def node_visit_imbalance(visit_counts):
     visits = np.array(list(visit_counts.values()))
     return visits.max() / (visits.mean() + 1e-8)
 
+@tracing.traced("spectral_symmetry")
 def spectral_symmetry(lattice):
     """
     Checks for Laplacian eigenvalue degeneracy (structural symmetry).
     Returns (eigenvalues, symmetry_passed).
     """
+    from scipy.sparse.linalg import eigsh
+
     L = nx.laplacian_matrix(lattice)
     num_eigs = min(L.shape[0] - 1, 10)
     if num_eigs <= 0:
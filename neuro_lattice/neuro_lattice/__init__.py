@@ -1,9 +1,28 @@
-from .cognitive_network import CognitiveNetwork
-from .lattice_builder import LatticeBuilder
-from .perturbation import PerturbationEngine
-
-__all__ = [
-    "CognitiveNetwork",
-    "LatticeBuilder",
-    "PerturbationEngine",
-]
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+_EXPORTS = {
+    "CognitiveNetwork": ".cognitive_network",
+    "LatticeBuilder": ".lattice_builder",
+    "PerturbationEngine": ".perturbation",
+}
+
+__all__ = list(_EXPORTS)
+
+if TYPE_CHECKING:
+    from .cognitive_network import CognitiveNetwork
+    from .lattice_builder import LatticeBuilder
+    from .perturbation import PerturbationEngine
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
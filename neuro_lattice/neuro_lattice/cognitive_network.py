@@ -22,6 +22,8 @@ class CognitiveNetwork:
         self.builder = LatticeBuilder(lattice_type=lattice_type, size=size)
         self.network: nx.DiGraph = self.builder.build_lattice()
         self._assign_goals()
+        self.primes: Dict[Any, int] = {}
+        self._assign_primes()
         self.router = RoutingEngine(self.network)
         self.concept_graph: nx.DiGraph = nx.DiGraph()
 
@@ -41,8 +43,28 @@ class CognitiveNetwork:
             "EC": {"goal": "entry_exit", "threshold": 0.0},
         }
         nx.set_node_attributes(self.network, node_goals)
+        nx.set_edge_attributes(self.network, self.builder.lattice_type, "type")
+
+    def _assign_primes(self) -> None:
+        """Give each node a distinct prime (2, 3, 5, ... in node order)."""
+        primes: List[int] = []
+        candidate = 2
+        while len(primes) < self.network.number_of_nodes():
+            if all(candidate % p for p in primes if p * p <= candidate):
+                primes.append(candidate)
+            candidate += 1
+        self.primes = dict(zip(self.network.nodes, primes))
 
     # ------------------------------------------------------------------
+    @property
+    def G(self) -> nx.DiGraph:
+        """The lattice graph (alias of :attr:`network`)."""
+        return self.network
+
+    @property
+    def nodes(self):
+        return self.network.nodes
+
     def get_network(self) -> nx.DiGraph:
         """Return the underlying annotated network."""
         return self.network
@@ -52,6 +74,7 @@ class CognitiveNetwork:
         self.builder.set_lattice_parameters(lattice_type, size)
         self.network = self.builder.build_lattice()
         self._assign_goals()
+        self._assign_primes()
         self.router = RoutingEngine(self.network)
 
     def add_concept(self, concept: Any) -> None:
@@ -0,0 +1,83 @@
+import math
+
+import numpy as np
+
+
+class CoherenceAccumulator:
+    """Running aggregates of per-transition coherence contributions.
+
+    Every update is O(1): the cumulative sum and count, a sliding window of
+    the last ``window`` contributions and an exponentially weighted moving
+    average with smoothing factor ``alpha``. Coherence is ``mean + 1`` (``1.0``
+    before any transition), as in ``Simulation.calculate_coherence``.
+
+    The window sum is kept incrementally and recomputed exactly once per
+    ``window`` updates so floating-point drift cannot build up over long runs.
+    """
+
+    def __init__(self, window=1000, alpha=0.01):
+        if window < 1:
+            raise ValueError("window must be positive")
+        if not 0.0 < alpha <= 1.0:
+            raise ValueError("alpha must be in (0, 1]")
+        self.window = int(window)
+        self.alpha = float(alpha)
+        self._ring = np.zeros(self.window)
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.total = 0.0
+        self._compensation = 0.0
+        self._ring[:] = 0.0
+        self._pos = 0
+        self._window_sum = 0.0
+        self._ewma = None
+
+    def update(self, contrib):
+        contrib = float(contrib)
+        self.count += 1
+        # Kahan summation keeps the all-time total exact to rounding.
+        y = contrib - self._compensation
+        t = self.total + y
+        self._compensation = (t - self.total) - y
+        self.total = t
+
+        self._window_sum += contrib - self._ring[self._pos]
+        self._ring[self._pos] = contrib
+        self._pos += 1
+        if self._pos == self.window:
+            self._pos = 0
+            self._window_sum = math.fsum(self._ring)
+
+        self._ewma = contrib if self._ewma is None else self._ewma + self.alpha * (contrib - self._ewma)
+
+    def extend(self, contribs):
+        for contrib in contribs:
+            self.update(contrib)
+
+    # ------------------------------------------------------------------
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    @property
+    def window_mean(self):
+        n = min(self.count, self.window)
+        return self._window_sum / n if n else 0.0
+
+    @property
+    def ewma(self):
+        return self._ewma if self._ewma is not None else 0.0
+
+    def coherence(self, kind="total"):
+        """``mean + 1`` over all transitions (``"total"``), the last ``window`` or the EWMA."""
+        if kind == "total":
+            value = self.mean
+        elif kind == "window":
+            value = self.window_mean
+        elif kind == "ewma":
+            value = self.ewma
+        else:
+            raise ValueError(f"Unsupported coherence kind: {kind}")
+        return value + 1 if self.count else 1.0
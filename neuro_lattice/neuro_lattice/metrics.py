@@ -1,6 +1,7 @@
 import numpy as np
 import networkx as nx
-from scipy.sparse.linalg import eigsh
+
+from .. import tracing
 
 def compute_coherence(lattice):
     """
@@ -46,11 +47,14 @@ def node_visit_imbalance(visit_counts):
     visits = np.array(list(visit_counts.values()))
     return visits.max() / (visits.mean() + 1e-8)
 
+@tracing.traced("spectral_symmetry")
 def spectral_symmetry(lattice):
     """
     Checks for Laplacian eigenvalue degeneracy (structural symmetry).
     Returns (eigenvalues, symmetry_passed).
     """
+    from scipy.sparse.linalg import eigsh
+
     L = nx.laplacian_matrix(lattice)
     num_eigs = min(L.shape[0] - 1, 10)
     if num_eigs <= 0:
@@ -16,10 +16,28 @@ class PerturbationEngine:
     This class supersedes the former ``PerturbationInjector`` helper by
     providing a single interface for applying lightweight perturbations as
     well as more involved fault injection strategies.
+
+    Listeners registered with :meth:`subscribe` receive
+    ``(event, u, v, weight)`` for every edge removal or reweight.
+
+    With ``seed`` the engine draws from its own generators instead of the
+    global :mod:`random` and :mod:`numpy.random` state.
     """
 
-    def __init__(self, lattice=None):
+    def __init__(self, lattice=None, seed=None):
         self.lattice = lattice
+        self._listeners = []
+        self._random = random if seed is None else random.Random(seed)
+        self._np_random = np.random if seed is None else np.random.default_rng(seed)
+
+    def subscribe(self, listener):
+        """Register ``listener`` for ``"remove"``/``"reweight"`` edge events."""
+        self._listeners.append(listener)
+        return listener
+
+    def _emit(self, event, u, v, weight=None):
+        for listener in self._listeners:
+            listener(event, u, v, weight)
 
     def inject_perturbation(self, lattice=None, perturbation_type="adversarial"):
         """Apply a simple weight perturbation to an edge in the lattice.
@@ -34,30 +52,33 @@ class PerturbationEngine:
         target = lattice or self.lattice
         if target is None or target.number_of_edges() == 0:
             return target
-        edge = next(iter(target.edges(data=True)))
-        data = edge[2]
+        u, v, data = next(iter(target.edges(data=True)))
         data["weight"] = data.get("weight", 1.0) * 5
+        self._emit("reweight", u, v, data["weight"])
         return target
 
     def random_edge_drop(self, drop_fraction=0.1):
         """Randomly remove a fraction of edges."""
         edges = list(self.lattice.edges())
         n_drop = max(1, int(len(edges) * drop_fraction))
-        to_remove = random.sample(edges, n_drop)
+        to_remove = self._random.sample(edges, n_drop)
         self.lattice.remove_edges_from(to_remove)
+        for u, v in to_remove:
+            self._emit("remove", u, v)
         return to_remove
 
     def random_weight_noise(self, noise_level=0.2):
         """Add Gaussian noise to edge weights."""
         for u, v, data in self.lattice.edges(data=True):
             if "weight" in data:
-                noise = np.random.normal(0, noise_level)
+                noise = self._np_random.normal(0, noise_level)
                 data["weight"] = max(0.1, data["weight"] + noise)
+                self._emit("reweight", u, v, data["weight"])
 
     def data_poisoning(self, node_attr="goal", corruption_rate=0.2):
         """Corrupts node attributes to simulate bad data."""
         for node in self.lattice.nodes():
-            if random.random() < corruption_rate:
+            if self._random.random() < corruption_rate:
                 self.lattice.nodes[node][node_attr] = "CORRUPTED"
 
     def reset_lattice(self, builder):
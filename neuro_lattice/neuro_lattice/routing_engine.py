@@ -1,13 +1,114 @@
 import random
 from collections import defaultdict
 
-class RoutingEngine:
+import numpy as np
+
+from ..transition_log import Labels, TransitionLog
+from .coherence import CoherenceAccumulator
+
+#: Column layout of :attr:`RoutingEngine.transition_log` as written by ``Simulation.run_step``.
+TRANSITION_COLUMNS = {
+    "agent": Labels("agent"),
+    "from": Labels("node"),
+    "to": Labels("node"),
+    "strain": np.float64,
+    "resonance": np.float64,
+    "distance": np.float64,
+    "prime": np.int64,
+    "contrib": np.float64,
+}
+
+#: Score of a move along a missing edge: (strain, resonance, distance, prime, contrib).
+NO_EDGE = (0, 0, 3, 1, 0)
+
+
+class EdgeTable:
+    """Per-edge transition scores, precomputed once from the network.
+
+    ``strain``, ``resonance``, ``distance``, ``prime`` and ``contrib`` are
+    arrays indexed like ``edges``, so scoring a move is a dictionary lookup
+    plus an index. The table is an edge-event listener (``subscribe`` it to a
+    :class:`~neuro_lattice.neuro_lattice.perturbation.PerturbationEngine`):
+    reweights patch one row in place and removals retire the edge.
+    """
+
     def __init__(self, network):
+        self.network = network
+        graph = network.G
+        self.edges = list(graph.edges())
+        self.index = {edge: i for i, edge in enumerate(self.edges)}
+        n = len(self.edges)
+        self.strain = np.zeros(n)
+        self.resonance = np.zeros(n)
+        self.distance = np.zeros(n)
+        self.prime = np.zeros(n, dtype=np.int64)
+        self.contrib = np.zeros(n)
+        self._rows = [NO_EDGE] * n
+        for i, (u, v) in enumerate(self.edges):
+            self._fill(i, u, v, graph.edges[u, v])
+
+    def _fill(self, i, u, v, data, weight=None):
+        weight = data.get('weight', 1.0) if weight is None else weight
+        strain = (1*weight) if (u in [1,5] and v=='IC') else 0
+        resonance = 1.2 if data.get('type')=='tetrahedral' else 0.8
+        distance = 1*weight
+        p = self.network.primes.get(v,2)
+        contrib = strain*resonance*(p**-distance)
+        self.strain[i], self.resonance[i], self.distance[i] = strain, resonance, distance
+        self.prime[i], self.contrib[i] = p, contrib
+        self._rows[i] = (strain, resonance, distance, p, contrib)
+
+    def score(self, u, v):
+        """``(strain, resonance, distance, prime, contrib)`` of the move ``u -> v``."""
+        i = self.index.get((u, v))
+        return NO_EDGE if i is None else self._rows[i]
+
+    def __call__(self, event, u, v, weight=None):
+        """Edge-event listener: patch on ``"add"``/``"reweight"``, retire on ``"remove"``."""
+        if event == "remove":
+            i = self.index.pop((u, v), None)
+            if i is not None:
+                self._rows[i] = NO_EDGE
+                self.strain[i] = self.resonance[i] = self.contrib[i] = 0
+                self.distance[i], self.prime[i] = 3, 1
+        elif event in ("add", "reweight"):
+            i = self.index.get((u, v))
+            if i is None:
+                i = self.index[(u, v)] = len(self.edges)
+                self.edges.append((u, v))
+                self._rows.append(NO_EDGE)
+                for name in ("strain", "resonance", "distance", "prime", "contrib"):
+                    setattr(self, name, np.append(getattr(self, name), 0))
+            self._fill(i, u, v, self.network.G.get_edge_data(u, v) or {}, weight)
+        else:
+            raise ValueError(f"Unsupported edge event: {event}")
+
+
+class RoutingEngine:
+    def __init__(self, network, transition_log=None, coherence=None):
         self.network = network
         self.visit_count = defaultdict(int, {n: 0 for n in self.network.nodes})
-        self.transition_log = []
+        self.transition_log = transition_log if transition_log is not None else TransitionLog(TRANSITION_COLUMNS)
+        self.coherence = coherence if coherence is not None else CoherenceAccumulator()
         self.ic_status = "up"
         self.goals = {n: {"threshold": 0.8, "confidence": 0.0} for n in self.network.nodes}
+        self._edge_table = None
+
+    @property
+    def edge_table(self):
+        """Lazily built :class:`EdgeTable` for ``network``."""
+        if self._edge_table is None:
+            self._edge_table = EdgeTable(self.network)
+        return self._edge_table
+
+    def invalidate_edges(self):
+        """Drop the edge table; the next score rebuilds it from the graph."""
+        self._edge_table = None
+
+    def on_edge_event(self, event, u, v, weight=None):
+        """Edge-event listener keeping the edge table current (pass to ``subscribe``)."""
+        if self._edge_table is not None:
+            self._edge_table(event, u, v, weight)
 
     def select_agent(self, node):
         if node in [0,1,2,3]: return "AgentA"
@@ -16,15 +117,14 @@ class RoutingEngine:
         if node == 'EC': return "AgentC2"
 
     def calculate_coherence(self, prev, new):
-        edge_data = self.network.G.get_edge_data(prev, new)
-        if not edge_data: return 0,0,3,1,0
-        weight = edge_data.get('weight',1.0)
-        strain = (1*weight) if (prev in [1,5] and new=='IC') else 0
-        resonance = 1.2 if edge_data['type']=='tetrahedral' else 0.8
-        distance = 1*weight
-        p = self.network.primes.get(new,2)
-        contrib = strain*resonance*(p**-distance)
-        return strain,resonance,distance,p,contrib
+        return self.edge_table.score(prev, new)
+
+    def log_transition(self, prev, new):
+        """Record the ``prev -> new`` move and fold its contribution into ``coherence``."""
+        metrics = self.calculate_coherence(prev, new)
+        self.transition_log.record(self.select_agent(prev), prev, new, *metrics)
+        self.coherence.update(metrics[4])
+        return metrics
 
     def decide_route(self, packet, successors):
         current = packet['location']
@@ -1,6 +1,4 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-from .vision_agent import VisionAgent
+from .vision_agent import VisionAgent, make_packet
 from .cognitive_network import CognitiveNetwork
 from .routing_engine import RoutingEngine
 
@@ -13,8 +11,17 @@ class Simulation:
 
     def initialize(self, image):
         shapes = self.vision.detect_shapes(image)
-        description = f"Detected shapes: {', '.join(shapes)}"
-        self.packets = [{'id':0,'data':description,'location':'EC','prev':None,'priority':1.0 if shapes else 0.5}]
+        self.packets = [make_packet(0, shapes)]
+
+    def ingest(self, source):
+        """Add one packet per frame of ``source`` (directory, video, images) as it is processed.
+
+        A generator: each packet is appended to ``self.packets`` and yielded,
+        so callers can interleave ``run_step`` with frame processing.
+        """
+        for packet in self.vision.stream_packets(source, start_id=len(self.packets)):
+            self.packets.append(packet)
+            yield packet
 
     def run_step(self, verbose=False):
         new_packets = []
@@ -25,24 +32,23 @@ class Simulation:
                 new_packets.append(p)
                 continue
             new_loc = self.controller.decide_route(p, successors)
-            metrics = self.controller.calculate_coherence(prev,new_loc)
-            self.controller.transition_log.append({
-                'agent':self.controller.select_agent(prev),'from':prev,'to':new_loc,
-                'strain':metrics[0],'resonance':metrics[1],'distance':metrics[2],
-                'prime':metrics[3],'contrib':metrics[4]
-            })
+            self.controller.log_transition(prev, new_loc)
             p['prev'] = prev
             p['location'] = new_loc
             new_packets.append(p)
             self.controller.visit_count[new_loc]+=1
         self.packets = new_packets
 
-    def calculate_coherence(self):
-        if not self.controller.transition_log: return 1.0
-        total = sum(t['contrib'] for t in self.controller.transition_log)
-        return (total/len(self.controller.transition_log))+1
+    def calculate_coherence(self, kind="total"):
+        """Running coherence: ``"total"``, ``"window"`` or ``"ewma"`` (see ``CoherenceAccumulator``)."""
+        return self.controller.coherence.coherence(kind)
 
-    def visualize(self):
+    def visualize(self, path=None):
+        if path is not None:
+            from ..render import render_lattice
+            return render_lattice(self.network.get_network(), path, title="Node Visit Distribution",
+                                  values=dict(self.controller.visit_count))
+        import matplotlib.pyplot as plt
         self.network.visualize([p['location'] for p in self.packets])
         plt.figure(figsize=(10,5))
         visits = sorted([(str(k),v) for k,v in self.controller.visit_count.items()])
@@ -1,23 +1,105 @@
+import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
 import cv2
 import numpy as np
 
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff", ".webp"}
+VIDEO_SUFFIXES = {".mp4", ".avi", ".mov", ".mkv", ".webm", ".m4v"}
+
+
+def iter_directory(path, suffixes=IMAGE_SUFFIXES):
+    """Image paths in ``path`` in name order (decoded later, by the workers)."""
+    for entry in sorted(Path(path).iterdir()):
+        if entry.suffix.lower() in suffixes:
+            yield entry
+
+
+def iter_video(source, stride=1):
+    """Frames of a video file or camera index, keeping every ``stride``-th one."""
+    capture = cv2.VideoCapture(str(source) if isinstance(source, Path) else source)
+    if not capture.isOpened():
+        raise ValueError(f"Cannot open video source: {source}")
+    try:
+        index = 0
+        while True:
+            ok, frame = capture.read()
+            if not ok:
+                break
+            if index % stride == 0:
+                yield frame
+            index += 1
+    finally:
+        capture.release()
+
+
+def iter_frames(source):
+    """Frames from a directory, a video, a single image, a camera index or an iterable of them."""
+    if isinstance(source, int):
+        return iter_video(source)
+    if isinstance(source, (str, Path)):
+        path = Path(source)
+        if path.is_dir():
+            return iter_directory(path)
+        if path.suffix.lower() in VIDEO_SUFFIXES:
+            return iter_video(path)
+        return iter([path])
+    if isinstance(source, np.ndarray):
+        return iter([source])
+    return iter(source)
+
+
+def make_packet(packet_id, shapes, **extra):
+    description = f"Detected shapes: {', '.join(shapes)}"
+    return {'id': packet_id, 'data': description, 'location': 'EC', 'prev': None,
+            'priority': 1.0 if shapes else 0.5, **extra}
+
+
 class VisionAgent:
-    def __init__(self, denoise=True):
+    """Shape detector over single images, batches and frame streams.
+
+    ``detect_shapes`` reuses grayscale, blur and threshold buffers owned by
+    the calling thread, so a thread pool does not allocate them per frame.
+    ``iter_detect`` decodes and processes frames on ``workers`` threads
+    (OpenCV releases the GIL) and keeps at most ``max_in_flight`` frames
+    pending, so slow consumers hold back reading from the source.
+    """
+
+    def __init__(self, denoise=True, workers=None, max_in_flight=None):
         self.denoise = denoise
+        self.workers = workers or os.cpu_count() or 1
+        self.max_in_flight = max_in_flight or 2 * self.workers
+        self._scratch = threading.local()
+
+    def _buffers(self, shape):
+        buffers = getattr(self._scratch, 'buffers', None)
+        if buffers is None or buffers[0].shape != shape:
+            buffers = self._scratch.buffers = tuple(np.empty(shape, dtype=np.uint8) for _ in range(3))
+        return buffers
 
     def detect_shapes(self, image):
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        if isinstance(image, (str, Path)):
+            image = self.load(image)
+        gray, blurred, thresh = self._buffers(image.shape[:2])
+        if image.ndim == 2:
+            gray[...] = image
+        else:
+            cv2.cvtColor(image, cv2.COLOR_BGR2GRAY, dst=gray)
         if self.denoise:
-            gray = cv2.GaussianBlur(gray, (5, 5), 0)
-        thresh = cv2.adaptiveThreshold(
+            cv2.GaussianBlur(gray, (5, 5), 0, dst=blurred)
+            gray = blurred
+        cv2.adaptiveThreshold(
             gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
-            cv2.THRESH_BINARY_INV, 11, 2
+            cv2.THRESH_BINARY_INV, 11, 2, dst=thresh
         )
         contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
         shapes = []
         for cnt in contours:
             area = cv2.contourArea(cnt)
-            if area < 300: 
+            if area < 300:
                 continue
             perimeter = cv2.arcLength(cnt, True)
             approx = cv2.approxPolyDP(cnt, 0.04 * perimeter, True)
@@ -28,3 +110,38 @@ class VisionAgent:
             elif sides == 3:
                 shapes.append('triangle')
         return list(set(shapes)) if shapes else ["unknown"]
+
+    @staticmethod
+    def load(path):
+        image = cv2.imread(str(path), cv2.IMREAD_COLOR)
+        if image is None:
+            raise ValueError(f"Cannot decode image: {path}")
+        return image
+
+    def iter_detect(self, source):
+        """Yield ``detect_shapes`` for every frame of ``source`` (see ``iter_frames``), in order."""
+        frames = iter_frames(source)
+        if self.workers == 1:
+            for frame in frames:
+                yield self.detect_shapes(frame)
+            return
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="vision") as pool:
+            try:
+                for frame in frames:
+                    if len(pending) >= self.max_in_flight:
+                        yield pending.popleft().result()
+                    pending.append(pool.submit(self.detect_shapes, frame))
+                while pending:
+                    yield pending.popleft().result()
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def detect_batch(self, images):
+        return list(self.iter_detect(images))
+
+    def stream_packets(self, source, start_id=0):
+        """Packets (as built by ``Simulation.initialize``) for each frame of ``source``."""
+        for frame, shapes in enumerate(self.iter_detect(source)):
+            yield make_packet(start_id + frame, shapes, frame=frame)
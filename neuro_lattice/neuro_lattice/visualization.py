@@ -1,14 +1,19 @@
-import matplotlib.pyplot as plt
 import networkx as nx
 
-def plot_lattice(lattice, title="Lattice Visualization"):
+def plot_lattice(lattice, title="Lattice Visualization", path=None):
+    if path is not None:
+        from ..render import render_lattice
+        return render_lattice(lattice, path, title=title)
+    import matplotlib.pyplot as plt
     plt.figure(figsize=(10, 10))
-    pos = nx.spring_layout(lattice)
-    nx.draw(lattice, pos, with_labels=True, node_color='skyblue', node_size=700, edge_color='gray', linewidths=1, font_size=15)
+    pos = nx.get_node_attributes(lattice, "pos")
+    pos = {n: p[:2] for n, p in pos.items()} if len(pos) == len(lattice) else nx.circular_layout(lattice)
+    nx.draw(lattice, pos, with_labels=len(lattice) <= 50, node_color='skyblue', node_size=700, edge_color='gray', linewidths=1, font_size=15)
     plt.title(title)
     plt.show()
 
 def plot_routing_paths(paths, title="Routing Paths Visualization"):
+    import matplotlib.pyplot as plt
     plt.figure(figsize=(10, 10))
     for path in paths:
         nx.draw_networkx_edges(path['graph'], pos=path['positions'], edgelist=path['edges'], width=2)
@@ -16,6 +21,7 @@ def plot_routing_paths(paths, title="Routing Paths Visualization"):
     plt.show()
 
 def plot_metrics(metrics, title="Performance Metrics"):
+    import matplotlib.pyplot as plt
     plt.figure(figsize=(10, 5))
     plt.plot(metrics['x'], metrics['y'], marker='o')
     plt.title(title)
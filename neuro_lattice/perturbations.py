@@ -2,7 +2,24 @@ import random
 import networkx as nx
 
 class PerturbationInjector:
-    """Minimal perturbation helper for tests."""
+    """Minimal perturbation helper for tests.
+
+    Listeners registered with :meth:`subscribe` are called as
+    ``listener(event, u, v, weight)`` after every edge mutation, e.g. a
+    :class:`~neuro_lattice.metrics.MetricsTracker`.
+    """
+
+    def __init__(self):
+        self._listeners = []
+
+    def subscribe(self, listener):
+        """Register ``listener`` for edge mutation events."""
+        self._listeners.append(listener)
+        return listener
+
+    def _emit(self, event, u, v, weight=None):
+        for listener in self._listeners:
+            listener(event, u, v, weight)
 
     def inject_perturbation(self, lattice: nx.Graph, perturbation_type: str = "adversarial"):
         """Apply different perturbations to the first edge of the lattice.
@@ -21,8 +38,7 @@ class PerturbationInjector:
 
         # Grab the first edge and its data dictionary. This keeps the helper
         # deterministic and easy to reason about for tests.
-        edge = next(iter(lattice.edges(data=True)))
-        data = edge[2]
+        u, v, data = next(iter(lattice.edges(data=True)))
         weight = data.get("weight", 1.0)
 
         if perturbation_type == "adversarial":
@@ -37,6 +53,7 @@ class PerturbationInjector:
         else:
             raise ValueError(f"Unsupported perturbation_type: {perturbation_type}")
 
+        self._emit("reweight", u, v, data["weight"])
         return lattice
 
 
@@ -0,0 +1,358 @@
+"""Pool of long-lived provider worker processes.
+
+``run_codex`` normally spawns ``/bin/bash -lc codex ...`` through pexpect for
+every prompt and retries through several subprocess strategies on failure.
+With ``PROVIDER_POOL=1`` the provider calls instead borrow a pre-spawned
+worker from a :class:`ProviderPool`.
+
+Workers speak a JSON-lines protocol on stdin/stdout::
+
+    -> {"id": 1, "prompt": "...", "timeout": 120}
+    <- {"id": 1, "rc": 0, "out": "...", "err": ""}
+    -> {"op": "ping"}
+    <- {"op": "pong"}
+
+The default worker (``python -m neuro_lattice.provider_pool <provider>``)
+resolves the provider binary once and runs it directly, without a login
+shell or PTY. The codex and gemini CLIs take one prompt per process, so this
+worker still starts a fresh provider process for every prompt: what the pool
+saves is the interpreter, ``bash -l`` and pexpect start-up around it, not the
+provider's own cold start. Any long-running provider that implements the
+protocol can be used instead by passing ``command``, and only such a worker
+keeps the provider itself warm.
+
+Workers have no terminal. ``run_codex``/``arun_codex`` therefore retry a
+reply that reports a TTY issue through their PTY strategies.
+
+Environment:
+    PROVIDER_POOL=1              route run_codex/run_gemini through the pool
+    PROVIDER_POOL_SIZE           workers per provider (default 2)
+    PROVIDER_POOL_MAX_REQUESTS   recycle a worker after N requests (default 100)
+    CODEX_CMD / CODEX_ARGS       codex executable and extra args (worker side)
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import queue
+import selectors
+import shlex
+import shutil
+import subprocess
+import sys
+import threading
+import time
+
+
+class WorkerError(RuntimeError):
+    """Raised when a worker dies, times out, or breaks the protocol."""
+
+
+class _Worker:
+    def __init__(self, command: list[str], env: dict):
+        self.proc = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            env=env,
+            bufsize=0,
+        )
+        self.requests = 0
+        self.last_used = time.monotonic()
+        self._buffer = b""
+        self._next_id = 0
+
+    @property
+    def pid(self) -> int:
+        return self.proc.pid
+
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def _readline(self, timeout: float) -> bytes:
+        deadline = time.monotonic() + timeout
+        fd = self.proc.stdout.fileno()
+        with selectors.DefaultSelector() as sel:
+            sel.register(fd, selectors.EVENT_READ)
+            while b"\n" not in self._buffer:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError
+                if not sel.select(remaining):
+                    continue
+                chunk = os.read(fd, 65536)
+                if not chunk:
+                    raise WorkerError("worker exited")
+                self._buffer += chunk
+        line, _, self._buffer = self._buffer.partition(b"\n")
+        return line
+
+    def call(self, message: dict, timeout: float) -> dict:
+        if not self.alive():
+            raise WorkerError("worker exited")
+        try:
+            self.proc.stdin.write(json.dumps(message).encode() + b"\n")
+        except (BrokenPipeError, OSError) as e:
+            raise WorkerError(f"worker pipe closed: {e}") from e
+        try:
+            return json.loads(self._readline(timeout))
+        except json.JSONDecodeError as e:
+            raise WorkerError(f"bad worker response: {e}") from e
+        finally:
+            self.last_used = time.monotonic()
+
+    def request(self, prompt: str, timeout: float) -> tuple[int, str, str]:
+        self._next_id += 1
+        self.requests += 1
+        # Leave the worker a moment to report its own provider timeout.
+        reply = self.call({"id": self._next_id, "prompt": prompt, "timeout": timeout}, timeout + 5)
+        return int(reply.get("rc", 1)), reply.get("out", ""), reply.get("err", "")
+
+    def ping(self, timeout: float = 5.0) -> bool:
+        try:
+            return self.call({"op": "ping"}, timeout).get("op") == "pong"
+        except (WorkerError, TimeoutError):
+            return False
+
+    def close(self) -> None:
+        try:
+            self.proc.stdin.close()
+            self.proc.wait(timeout=1)
+        except Exception:
+            self.proc.kill()
+            self.proc.wait()
+
+
+class ProviderPool:
+    """Fixed-size pool of provider workers with health checks and recycling.
+
+    Parameters
+    ----------
+    provider:
+        Provider name passed to the default worker (``"codex"`` or ``"gemini"``).
+    size:
+        Number of pre-spawned workers.
+    max_requests:
+        Recycle a worker after this many requests.
+    command:
+        Worker command line; defaults to this module run as a worker.
+    env:
+        Extra environment for workers (e.g. ``CODEX_CMD`` for a stub CLI).
+    timeout:
+        Default per-request timeout in seconds.
+    health_interval:
+        Idle seconds after which a borrowed worker is pinged before use.
+    """
+
+    def __init__(
+        self,
+        provider: str = "codex",
+        size: int = 2,
+        max_requests: int = 100,
+        command: list[str] | None = None,
+        env: dict | None = None,
+        timeout: float = 120,
+        health_interval: float = 30.0,
+    ):
+        self.provider = provider
+        self.size = size
+        self.max_requests = max_requests
+        self.command = command or [sys.executable, "-m", "neuro_lattice.provider_pool", provider]
+        self.env = {**os.environ, **(env or {})}
+        self.timeout = timeout
+        self.health_interval = health_interval
+        self.stats = {"requests": 0, "spawned": 0, "recycled": 0, "crashed": 0, "timeouts": 0}
+        self._lock = threading.Lock()
+        self._idle: queue.Queue[_Worker] = queue.Queue()
+        self._workers: set[_Worker] = set()
+        self._closed = False
+        for _ in range(size):
+            self._idle.put(self._spawn())
+
+    def _spawn(self) -> _Worker:
+        worker = _Worker(self.command, self.env)
+        with self._lock:
+            self._workers.add(worker)
+            self.stats["spawned"] += 1
+        return worker
+
+    def _retire(self, worker: _Worker) -> None:
+        with self._lock:
+            self._workers.discard(worker)
+        worker.close()
+
+    def _replace(self, worker: _Worker, reason: str) -> _Worker:
+        with self._lock:
+            self.stats[reason] += 1
+        self._retire(worker)
+        return self._spawn()
+
+    @property
+    def pids(self) -> list[int]:
+        with self._lock:
+            return sorted(w.pid for w in self._workers)
+
+    def run(self, prompt: str, timeout: float | None = None) -> tuple[int, str, str]:
+        """Run ``prompt`` on a borrowed worker; returns ``(rc, stdout, stderr)``."""
+        if self._closed:
+            raise RuntimeError("provider pool is closed")
+        timeout = self.timeout if timeout is None else timeout
+        try:
+            worker = self._idle.get(timeout=timeout)
+        except queue.Empty:
+            return 124, "", f"Timeout waiting for a free {self.provider} worker."
+        with self._lock:
+            self.stats["requests"] += 1
+        try:
+            if not worker.alive():
+                worker = self._replace(worker, "crashed")
+            elif time.monotonic() - worker.last_used > self.health_interval and not worker.ping():
+                worker = self._replace(worker, "crashed")
+            try:
+                return worker.request(prompt, timeout)
+            except WorkerError:
+                # The worker died before answering; retry once on a fresh one.
+                worker = self._replace(worker, "crashed")
+                return worker.request(prompt, timeout)
+        except TimeoutError:
+            worker = self._replace(worker, "timeouts")
+            return 124, "", f"Timeout while waiting for {self.provider} (pool worker)."
+        except WorkerError as e:
+            worker = self._replace(worker, "crashed")
+            return 1, "", str(e)
+        finally:
+            if worker.requests >= self.max_requests:
+                worker = self._replace(worker, "recycled")
+            if self._closed:
+                self._retire(worker)
+            else:
+                self._idle.put(worker)
+
+    def health_check(self) -> int:
+        """Ping every idle worker, replacing unresponsive ones; returns replacements."""
+        replaced = 0
+        for _ in range(self._idle.qsize()):
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if not worker.ping():
+                worker = self._replace(worker, "crashed")
+                replaced += 1
+            self._idle.put(worker)
+        return replaced
+
+    def close(self) -> None:
+        self._closed = True
+        while True:
+            try:
+                self._retire(self._idle.get_nowait())
+            except queue.Empty:
+                break
+
+
+_POOLS: dict[str, ProviderPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def pool_enabled() -> bool:
+    return os.environ.get("PROVIDER_POOL") == "1"
+
+
+def get_pool(provider: str) -> ProviderPool:
+    """Return the process-wide pool for ``provider``, creating it from the environment."""
+    with _POOLS_LOCK:
+        pool = _POOLS.get(provider)
+        if pool is None or pool._closed:
+            pool = _POOLS[provider] = ProviderPool(
+                provider,
+                size=int(os.environ.get("PROVIDER_POOL_SIZE", "2")),
+                max_requests=int(os.environ.get("PROVIDER_POOL_MAX_REQUESTS", "100")),
+            )
+        return pool
+
+
+def shutdown_pools() -> None:
+    with _POOLS_LOCK:
+        for pool in _POOLS.values():
+            pool.close()
+        _POOLS.clear()
+
+
+atexit.register(shutdown_pools)
+
+
+# ---- Worker side ----
+def provider_command(provider: str) -> tuple[list[str], bool, dict]:
+    """Resolve (argv prefix, prompt-on-stdin, env) for running a provider CLI directly."""
+    if provider == "gemini":
+        cmd = os.environ.get("GEMINI_CMD", "gemini")
+        args = shlex.split(os.environ.get("GEMINI_ARGS", ""))
+        use_stdin = os.environ.get("GEMINI_USE_STDIN") == "1"
+        env = {
+            **os.environ,
+            "TERM": os.environ.get("TERM", "xterm-256color"),
+            "CI": os.environ.get("CI", "1"),
+            "NO_COLOR": os.environ.get("NO_COLOR", "1"),
+            "CLICOLOR": os.environ.get("CLICOLOR", "0"),
+        }
+    else:
+        cmd = os.environ.get("CODEX_CMD", "codex")
+        args = shlex.split(os.environ.get("CODEX_ARGS", ""))
+        use_stdin = False
+        env = {
+            **os.environ,
+            "TERM": "dumb",
+            "NO_COLOR": "1",
+            "CLICOLOR": "0",
+            "CI": os.environ.get("CI", "1"),
+            "CODEX_NONINTERACTIVE": os.environ.get("CODEX_NONINTERACTIVE", "1"),
+        }
+    binary = shutil.which(cmd) or cmd
+    return [binary, *args], use_stdin, env
+
+
+def _invoke(argv: list[str], prompt: str, use_stdin: bool, provider: str, env: dict, timeout: float) -> dict:
+    try:
+        result = subprocess.run(
+            argv if use_stdin else [*argv, prompt],
+            # codex: answer a cursor-position query (DSR) up front, as run_codex does.
+            input=prompt if use_stdin else ("\033[1;1R" if provider == "codex" else ""),
+            capture_output=True,
+            text=True,
+            check=False,
+            timeout=timeout,
+            env=env,
+        )
+    except subprocess.TimeoutExpired:
+        return {"rc": 124, "out": "", "err": f"Timeout while waiting for {provider}."}
+    except OSError as e:
+        return {"rc": 127, "out": "", "err": str(e)}
+    return {"rc": result.returncode, "out": (result.stdout or "").strip(), "err": (result.stderr or "").strip()}
+
+
+def _serve(provider: str) -> None:
+    argv, use_stdin, env = provider_command(provider)
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        message = json.loads(line)
+        if message.get("op") == "ping":
+            reply = {"op": "pong"}
+        else:
+            prompt, timeout = message["prompt"], message.get("timeout", 120)
+            reply = _invoke(argv, prompt, use_stdin, provider, env, timeout)
+            if reply["rc"] != 0 and provider == "gemini" and not use_stdin:
+                # Same fallback as run_gemini: retry arg mode failures via stdin.
+                retry = _invoke(argv, prompt, True, provider, env, timeout)
+                reply = retry if retry["rc"] == 0 else {**retry, "err": retry["err"] or reply["err"]}
+            reply["id"] = message.get("id")
+        sys.stdout.write(json.dumps(reply) + "\n")
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    _serve(sys.argv[1] if len(sys.argv) > 1 else "codex")
@@ -0,0 +1,339 @@
+"""Incremental output from provider CLIs.
+
+:class:`ProviderStream` runs a provider CLI (resolved like the provider
+pool's ``provider_command``) and yields decoded text as it arrives, instead of
+waiting for EOF:
+
+* stdout and stderr are read with non-blocking ``os.read`` calls
+  multiplexed by :mod:`selectors`, with an overall deadline;
+* bytes go through an incremental UTF-8 decoder, so a multibyte character
+  split across reads is never mangled;
+* :class:`TerminalFilter` strips DSR cursor queries (``ESC[6n``) and
+  ``Update available`` notice lines on the fly; under a PTY each query is
+  answered as it is seen;
+* :attr:`ProviderStream.stats` records time to first byte and first text.
+
+:func:`stream_brand_context` is the streaming counterpart of
+``with_brand_context``, and :func:`astream_brand_context` its async
+adapter.
+"""
+from __future__ import annotations
+
+import asyncio
+import codecs
+import os
+import pty
+import selectors
+import subprocess
+import time
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Iterator
+
+from . import tracing
+from .brand_context import slice_kernel
+from .provider_pool import provider_command
+from .response_cache import ResponseCache, cache_key, default_cache, is_cacheable
+
+DSR_QUERY = "\x1b[6n"
+DSR_REPLY = b"\x1b[1;1R"
+NOTICE = "Update available"
+#: Characters of a line inspected for ``NOTICE`` before the line is streamed.
+NOTICE_WINDOW = 64
+
+
+class TerminalFilter:
+    """Incremental filter removing DSR queries and notice lines.
+
+    Text is held back only while it could still be the start of a DSR query
+    or, at the start of a line, until the line holds ``NOTICE_WINDOW``
+    characters or ends; lines whose head contains ``NOTICE`` are dropped up
+    to and including their newline, however many chunks that spans.
+    """
+
+    def __init__(self):
+        self.pending = ""
+        self.queries = 0
+        self._line_open = False  # current line already checked and streaming
+        self._dropping = False  # current line is a notice; discard up to its newline
+
+    def feed(self, text: str) -> str:
+        text = self.pending + text
+        count = text.count(DSR_QUERY)
+        if count:
+            self.queries += count
+            text = text.replace(DSR_QUERY, "")
+        # Hold back a trailing partial DSR query.
+        keep = next((k for k in range(len(DSR_QUERY) - 1, 0, -1) if text.endswith(DSR_QUERY[:k])), 0)
+        text, self.pending = (text[:-keep], text[-keep:]) if keep else (text, "")
+
+        out = []
+        while text:
+            newline = text.find("\n")
+            line, rest = (text, "") if newline < 0 else (text[:newline + 1], text[newline + 1:])
+            text = rest
+            if self._dropping:
+                self._dropping = newline < 0
+            elif self._line_open:
+                out.append(line)
+                self._line_open = newline < 0
+            elif newline < 0 and len(line) < NOTICE_WINDOW:
+                self.pending = line + self.pending
+                break
+            elif NOTICE in line[:NOTICE_WINDOW]:
+                self._dropping = newline < 0
+            else:
+                out.append(line)
+                self._line_open = newline < 0
+        return "".join(out)
+
+    def flush(self) -> str:
+        text, self.pending = self.pending, ""
+        if self._dropping or (not self._line_open and NOTICE in text):
+            self._dropping = False
+            return ""
+        return text
+
+
+@dataclass
+class StreamStats:
+    """Timing of one streamed provider call (seconds from process start)."""
+
+    provider: str
+    started: float = field(default_factory=time.monotonic)
+    first_byte: float | None = None
+    first_text: float | None = None
+    elapsed: float | None = None
+    bytes: int = 0
+    chunks: int = 0
+    returncode: int | None = None
+    timed_out: bool = False
+
+
+class ProviderStream:
+    """Iterate decoded, filtered stdout of one provider CLI call.
+
+    After iteration, ``returncode``, ``stderr`` and ``stats`` are set. A
+    timeout kills the process and ends the iteration with
+    ``stats.timed_out`` set (``returncode`` 124).
+
+    Parameters
+    ----------
+    provider:
+        ``"codex"`` or ``"gemini"`` (command from ``CODEX_CMD``/``GEMINI_CMD`` etc.).
+    use_pty:
+        Run under a pseudo-terminal (stdout and stderr merged) and answer
+        DSR queries as they appear; otherwise codex gets the reply up front
+        on stdin, as in ``run_codex``.
+    """
+
+    def __init__(self, provider: str, prompt: str, timeout: float = 120, use_pty: bool = False,
+                 force_stdin: bool = False, chunk_size: int = 4096):
+        self.provider = provider
+        self.prompt = prompt
+        self.timeout = timeout
+        self.use_pty = use_pty
+        self.force_stdin = force_stdin
+        self.chunk_size = chunk_size
+        self.stats = StreamStats(provider)
+        self.returncode: int | None = None
+        self.stderr = ""
+        self.text = ""
+
+    def _spawn(self):
+        argv, use_stdin, env = provider_command(self.provider)
+        stdin_data = b""
+        if use_stdin or self.force_stdin:
+            stdin_data = self.prompt.encode()
+        else:
+            argv = [*argv, self.prompt]
+            if self.provider == "codex" and not self.use_pty:
+                stdin_data = DSR_REPLY
+        if self.use_pty:
+            master, slave = pty.openpty()
+            try:
+                proc = subprocess.Popen(argv, stdin=slave, stdout=slave, stderr=slave, env=env, close_fds=True)
+            finally:
+                os.close(slave)
+            if stdin_data:
+                os.write(master, stdin_data)
+            return proc, {master: "out"}, master
+        proc = subprocess.Popen(argv, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env)
+        try:
+            proc.stdin.write(stdin_data)
+            proc.stdin.close()
+        except BrokenPipeError:
+            pass
+        return proc, {proc.stdout.fileno(): "out", proc.stderr.fileno(): "err"}, None
+
+    def __iter__(self) -> Iterator[str]:
+        stats = self.stats
+        stats.started = time.monotonic()
+        try:
+            proc, streams, master = self._spawn()
+        except OSError as e:
+            self.returncode = stats.returncode = 127
+            self.stderr = str(e)
+            return
+        decoders = {fd: codecs.getincrementaldecoder("utf-8")(errors="replace") for fd in streams}
+        text_filter = TerminalFilter()
+        err_parts, out_parts = [], []
+        deadline = stats.started + self.timeout
+        selector = selectors.DefaultSelector()
+        for fd in streams:
+            os.set_blocking(fd, False)
+            selector.register(fd, selectors.EVENT_READ)
+
+        def emit(piece):
+            if piece:
+                if stats.first_text is None:
+                    stats.first_text = time.monotonic() - stats.started
+                stats.chunks += 1
+                out_parts.append(piece)
+            return piece
+
+        try:
+            while selector.get_map():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    stats.timed_out = True
+                    proc.kill()
+                    break
+                for key, _ in selector.select(remaining):
+                    fd = key.fd
+                    try:
+                        data = os.read(fd, self.chunk_size)
+                    except BlockingIOError:
+                        continue
+                    except OSError:  # EIO from a PTY master once the child exits
+                        data = b""
+                    if not data:
+                        selector.unregister(fd)
+                        continue
+                    if stats.first_byte is None:
+                        stats.first_byte = time.monotonic() - stats.started
+                    stats.bytes += len(data)
+                    text = decoders[fd].decode(data)
+                    if streams[fd] == "err":
+                        err_parts.append(text)
+                        continue
+                    queries = text_filter.queries
+                    piece = emit(text_filter.feed(text))
+                    if master is not None and text_filter.queries > queries:
+                        os.write(master, DSR_REPLY * (text_filter.queries - queries))
+                    if piece:
+                        yield piece
+            for fd, kind in streams.items():
+                tail = decoders[fd].decode(b"", final=True)
+                if kind == "err":
+                    err_parts.append(tail)
+                elif tail:
+                    text_filter.feed(tail)
+            piece = emit(text_filter.flush())
+            if piece:
+                yield piece
+        finally:
+            # Output still open here means a timeout or an abandoned iteration.
+            if selector.get_map():
+                proc.kill()
+            selector.close()
+            try:
+                proc.wait(timeout=max(0.0, deadline - time.monotonic()))
+            except subprocess.TimeoutExpired:
+                stats.timed_out = True
+                proc.kill()
+                proc.wait()
+            if master is not None:
+                os.close(master)
+            for pipe in (proc.stdout, proc.stderr):
+                if pipe is not None:
+                    pipe.close()
+            stats.elapsed = time.monotonic() - stats.started
+            self.returncode = stats.returncode = 124 if stats.timed_out else proc.returncode
+            tracing.PROVIDER_SECONDS.labels(self.provider, "stream").observe(stats.elapsed)
+            if stats.first_byte is not None:
+                tracing.PROVIDER_FIRST_BYTE.labels(self.provider).observe(stats.first_byte)
+            if self.returncode != 0:
+                tracing.PROVIDER_ERRORS.labels(self.provider, "stream").inc()
+            self.stderr = "".join(err_parts).strip()
+            self.text = "".join(out_parts)
+
+
+def _result(stream: ProviderStream) -> str:
+    """The full response as the non-streaming API would return it."""
+    from .llm_interface import _codex_result, _gemini_result
+
+    if stream.stats.timed_out:
+        label = "CODEX" if stream.provider == "codex" else "GEMINI"
+        return f"[{label}_ERROR] Timeout while waiting for {stream.provider.capitalize()}."
+    args = (stream.returncode, stream.text.strip(), stream.stderr)
+    return _codex_result(*args) if stream.provider == "codex" else _gemini_result(*args)
+
+
+def stream_brand_context(provider: str, prompt: str, brand_data: dict, cache: ResponseCache | None = None,
+                         timeout: float = 120, stats: list | None = None, modal: str | None = None,
+                         event: str | None = None) -> Iterator[str]:
+    """Streaming ``with_brand_context``: yield response text as the provider produces it.
+
+    Mock providers, ``GEMINI_MOCK`` and cache hits yield the whole response at
+    once. Errors are yielded as the same ``[..._ERROR]`` text as the blocking
+    call. When ``stats`` is a list, the call's :class:`StreamStats` is appended.
+    ``modal``/``event`` slice the kernel as in ``with_brand_context``.
+    """
+    from .llm_interface import _brand_prompt
+
+    provider = (provider or "codex").lower()
+    brand_data = slice_kernel(brand_data, modal, event)
+    if provider in ("mock", "dummy"):
+        yield f"[MOCK/{provider.upper()}] {prompt[:160]}…"
+        return
+    if provider in ("google", "vertex"):
+        provider = "gemini"
+    if provider not in ("codex", "gemini"):
+        yield f"[LLM_ERROR] Unknown provider '{provider}'."
+        return
+    full_prompt = _brand_prompt(prompt, brand_data)
+    if provider == "gemini" and os.environ.get("GEMINI_MOCK") == "1":
+        yield f"[S2/GEMINI MOCK] {full_prompt[:140]}…"
+        return
+    cache = cache if cache is not None else default_cache()
+    key = cache_key(provider, prompt, brand_data) if cache is not None else None
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+
+    use_pty = os.environ.get("FORCE_PTY") == "1"
+    stream = ProviderStream(provider, full_prompt, timeout=timeout, use_pty=use_pty)
+    if stats is not None:
+        stats.append(stream.stats)
+    streamed = False
+    for piece in stream:
+        streamed = True
+        yield piece
+    if (provider == "gemini" and not streamed and stream.returncode != 0
+            and os.environ.get("GEMINI_USE_STDIN") != "1"):
+        # Same fallback as run_gemini: retry arg mode failures via stdin.
+        stream = ProviderStream(provider, full_prompt, timeout=timeout, use_pty=use_pty, force_stdin=True)
+        if stats is not None:
+            stats.append(stream.stats)
+        for piece in stream:
+            streamed = True
+            yield piece
+    response = _result(stream)
+    if not streamed or stream.returncode != 0:
+        # Nothing (or a failure) was shown: surface the final result text.
+        yield response if not streamed else f"\n{response}"
+    elif cache is not None and is_cacheable(response):
+        cache.put(key, response, provider)
+
+
+async def astream_brand_context(provider: str, prompt: str, brand_data: dict, **kwargs) -> AsyncIterator[str]:
+    """Async adapter over :func:`stream_brand_context`; each read runs in a worker thread."""
+    iterator = stream_brand_context(provider, prompt, brand_data, **kwargs)
+    done = object()
+    try:
+        while (piece := await asyncio.to_thread(next, iterator, done)) is not done:
+            yield piece
+    finally:
+        await asyncio.to_thread(iterator.close)
@@ -0,0 +1,328 @@
+"""Headless rendering of lattices and packet flow.
+
+Figures are drawn on Agg canvases (``matplotlib.figure.Figure``, never
+``pyplot``), so nothing needs a display and rendering is safe in worker
+processes. Node positions come from the stored 3D ``pos`` attributes; nodes
+without one are placed on a circle in the ``z = 0`` plane rather than run
+through a force-directed layout.
+
+Large lattices are decimated before drawing: nodes are binned into a voxel
+grid, each occupied voxel is drawn as one marker sized by its member count,
+and edges between voxels are merged (see :func:`aggregate`). Labels are only
+drawn for small lattices.
+
+:func:`render_flow` turns a :class:`~neuro_lattice.transition_log.TransitionLog`
+into frames of packet movement, renders them in parallel worker processes and
+optionally encodes them to MP4 with ``ffmpeg``.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import shutil
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+import networkx as nx
+import numpy as np
+
+from .transition_log import TransitionLog
+
+#: Lattices above this many nodes are voxel-aggregated before drawing.
+MAX_NODES = 2000
+#: Node labels are drawn only up to this many (drawn) nodes.
+MAX_LABELS = 50
+
+
+@dataclass
+class LatticeLayout:
+    """Drawable arrays for a lattice (or its voxel aggregate).
+
+    Attributes
+    ----------
+    nodes:
+        Labels of the drawn points (voxel ids after :func:`aggregate`).
+    pos:
+        ``(n, 3)`` coordinates.
+    src, dst:
+        Edges as indices into ``nodes``.
+    members:
+        Lattice nodes represented by each point (``1`` before aggregation).
+    group:
+        ``{lattice node: point index}``; the identity mapping before aggregation.
+    """
+
+    nodes: list
+    pos: np.ndarray
+    src: np.ndarray
+    dst: np.ndarray
+    members: np.ndarray
+    group: dict
+
+    @classmethod
+    def from_graph(cls, lattice: nx.Graph) -> "LatticeLayout":
+        nodes = list(lattice.nodes())
+        index = {n: i for i, n in enumerate(nodes)}
+        pos = np.zeros((len(nodes), 3))
+        missing = []
+        for i, (_, p) in enumerate(lattice.nodes(data="pos")):
+            if p is None:
+                missing.append(i)
+            else:
+                pos[i, : len(p)] = p
+        if missing:
+            angle = 2 * np.pi * np.arange(len(missing)) / len(missing)
+            pos[missing, 0] = np.cos(angle)
+            pos[missing, 1] = np.sin(angle)
+        edges = list(lattice.edges())
+        src = np.fromiter((index[u] for u, _ in edges), dtype=np.int64, count=len(edges))
+        dst = np.fromiter((index[v] for _, v in edges), dtype=np.int64, count=len(edges))
+        return cls(nodes, pos, src, dst, np.ones(len(nodes), dtype=np.int64), index)
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.nodes)
+
+
+def aggregate(layout: LatticeLayout, max_nodes: int = MAX_NODES) -> LatticeLayout:
+    """Bin ``layout`` into a voxel grid with at most ``max_nodes`` occupied voxels.
+
+    Each voxel is placed at the centroid of its members; parallel edges
+    between voxels are merged and edges within a voxel are dropped.
+    """
+
+    if layout.num_nodes <= max_nodes:
+        return layout
+    lo = layout.pos.min(axis=0)
+    extent = np.maximum(layout.pos.max(axis=0) - lo, 1e-12)
+    # Start from the resolution that would fill a cube with max_nodes voxels
+    # and coarsen until the occupied count fits.
+    bins = max(1, int(round(max_nodes ** (1 / 3))))
+    while True:
+        cell = np.minimum(((layout.pos - lo) / extent * bins).astype(np.int64), bins - 1)
+        keys = (cell[:, 0] * bins + cell[:, 1]) * bins + cell[:, 2]
+        voxels, inverse = np.unique(keys, return_inverse=True)
+        if voxels.size <= max_nodes or bins == 1:
+            break
+        bins -= 1
+
+    members = np.bincount(inverse, weights=layout.members, minlength=voxels.size)
+    pos = np.stack(
+        [np.bincount(inverse, weights=layout.pos[:, k] * layout.members, minlength=voxels.size) for k in range(3)],
+        axis=1,
+    ) / members[:, None]
+    a, b = inverse[layout.src], inverse[layout.dst]
+    pairs = np.unique(np.stack([a[a != b], b[a != b]], axis=1), axis=0)
+    group = {node: int(inverse[i]) for node, i in layout.group.items()}
+    return LatticeLayout(voxels.tolist(), pos, pairs[:, 0], pairs[:, 1], members.astype(np.int64), group)
+
+
+# ---------------------------------------------------------------------------
+def _figure(figsize=(8, 8), projection: str = "3d"):
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot(projection="3d") if projection == "3d" else fig.add_subplot()
+    return fig, ax
+
+
+def _lines(ax, projection: str, xyz: np.ndarray, src: np.ndarray, dst: np.ndarray, **style) -> None:
+    if projection == "3d":
+        from mpl_toolkits.mplot3d.art3d import Line3DCollection as Collection
+    else:
+        from matplotlib.collections import LineCollection as Collection
+    ax.add_collection(Collection(np.stack([xyz[src], xyz[dst]], axis=1), **style))
+
+
+def _draw(ax, layout: LatticeLayout, projection: str, edge_alpha, node_size, node_color, labels: bool) -> None:
+    xyz = layout.pos if projection == "3d" else layout.pos[:, :2]
+    if layout.src.size:
+        _lines(ax, projection, xyz, layout.src, layout.dst, colors="gray", linewidths=0.6, alpha=edge_alpha)
+    cmap = "viridis" if isinstance(node_color, np.ndarray) else None
+    ax.scatter(*xyz.T, s=node_size, c=node_color, cmap=cmap, edgecolors="none")
+    if labels:
+        for label, p in zip(layout.nodes, xyz):
+            ax.text(*p, str(label), fontsize=8)
+    ax.set_axis_off()
+    if projection != "3d":
+        ax.set_aspect("equal")
+        ax.autoscale_view()
+
+
+def _node_sizes(layout: LatticeLayout, base: float = 60.0) -> np.ndarray:
+    return base * np.sqrt(layout.members)
+
+
+def _save(fig, path, dpi: int) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fig.savefig(path, dpi=dpi, bbox_inches="tight")
+    return path
+
+
+def render_lattice(
+    lattice: nx.Graph | LatticeLayout,
+    path,
+    title: str = "Lattice Visualization",
+    values: dict | None = None,
+    max_nodes: int = MAX_NODES,
+    labels: bool | None = None,
+    projection: str = "3d",
+    figsize=(8, 8),
+    dpi: int = 100,
+) -> Path:
+    """Render a lattice to ``path``; the format (PNG, SVG, PDF...) follows the suffix.
+
+    Parameters
+    ----------
+    values:
+        Optional ``{node: value}`` used to colour nodes (e.g. visit counts);
+        aggregated voxels show the sum over their members.
+    max_nodes:
+        Decimation threshold passed to :func:`aggregate`.
+    labels:
+        Draw node labels; by default only when at most ``MAX_LABELS`` points are drawn.
+    projection:
+        ``"3d"`` or ``"xy"`` (orthographic projection onto the x-y plane).
+    """
+
+    layout = lattice if isinstance(lattice, LatticeLayout) else LatticeLayout.from_graph(lattice)
+    layout = aggregate(layout, max_nodes)
+    if values is not None:
+        color = np.zeros(layout.num_nodes)
+        for node, value in values.items():
+            if node in layout.group:
+                color[layout.group[node]] += value
+    else:
+        color = "skyblue"
+    fig, ax = _figure(figsize, projection)
+    if labels is None:
+        labels = layout.num_nodes <= MAX_LABELS
+    _draw(ax, layout, projection, 0.5, _node_sizes(layout), color, labels)
+    ax.set_title(title)
+    return _save(fig, path, dpi)
+
+
+# ---------------------------------------------------------------------------
+# Packet flow
+def flow_frames(log: TransitionLog, layout: LatticeLayout, frames: int = 100) -> list[tuple[np.ndarray, np.ndarray]]:
+    """Split ``log`` into ``frames`` consecutive windows of transitions.
+
+    Returns, per frame, ``(moves, arrivals)``: ``moves`` is a ``(k, 3)`` array
+    of ``(from point, to point, count)`` and ``arrivals`` the number of
+    packets arriving at each point of ``layout``.
+    """
+
+    vocab = log.vocabulary("node")
+    to_point = np.array([layout.group.get(label, -1) for label in vocab], dtype=np.int64)
+    src = to_point[log.column("from")] if vocab else np.empty(0, dtype=np.int64)
+    dst = to_point[log.column("to")] if vocab else np.empty(0, dtype=np.int64)
+    n = layout.num_nodes
+    bounds = np.linspace(0, src.size, max(1, frames) + 1).astype(np.int64)
+    out = []
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        a, b = src[lo:hi], dst[lo:hi]
+        keep = (a >= 0) & (b >= 0)
+        a, b = a[keep], b[keep]
+        arrivals = np.bincount(b, minlength=n)
+        moved = a != b
+        pairs, counts = np.unique(a[moved] * n + b[moved], return_counts=True)
+        out.append((np.stack([pairs // n, pairs % n, counts], axis=1), arrivals))
+    return out
+
+
+_FRAME_STATE: tuple | None = None
+
+
+def _init_frame_worker(layout, options) -> None:
+    global _FRAME_STATE
+    _FRAME_STATE = (layout, options)
+
+
+def _render_frame(task) -> str:
+    index, (moves, arrivals), path = task
+    layout, opts = _FRAME_STATE
+    projection = opts["projection"]
+    fig, ax = _figure(opts["figsize"], projection)
+    _draw(ax, layout, projection, 0.15, _node_sizes(layout, 20.0), "lightgray", False)
+    xyz = layout.pos if projection == "3d" else layout.pos[:, :2]
+    if moves.size:
+        width = 0.5 + 3.0 * moves[:, 2] / moves[:, 2].max()
+        _lines(ax, projection, xyz, moves[:, 0], moves[:, 1], colors="tab:red", linewidths=width, alpha=0.8)
+    hot = np.flatnonzero(arrivals)
+    if hot.size:
+        size = 20.0 + 200.0 * arrivals[hot] / arrivals[hot].max()
+        ax.scatter(*xyz[hot].T, s=size, c="tab:orange", edgecolors="none")
+    ax.set_title(f"{opts['title']} - frame {index}")
+    _save(fig, path, opts["dpi"])
+    return str(path)
+
+
+def render_flow(
+    log: TransitionLog,
+    lattice: nx.Graph | LatticeLayout,
+    path,
+    frames: int = 100,
+    workers: int | None = None,
+    fmt: str = "png",
+    fps: int = 10,
+    title: str = "Packet flow",
+    max_nodes: int = MAX_NODES,
+    projection: str = "3d",
+    figsize=(6, 6),
+    dpi: int = 100,
+) -> list[Path] | Path:
+    """Render packet movement from ``log`` over ``lattice``.
+
+    ``path`` is either a directory, which receives ``frame-00000.<fmt>``...,
+    or a ``.mp4`` file, in which case PNG frames are rendered next to it in
+    ``<name>_frames/`` and encoded with ``ffmpeg`` (``RuntimeError`` if it is
+    not installed). Frames are rendered in ``workers`` processes (``None``
+    uses ``os.cpu_count()``, ``0``/``1`` renders in this process).
+
+    Returns the frame paths, or the video path for MP4 output.
+    """
+
+    path = Path(path)
+    video = path.suffix == ".mp4"
+    if video:
+        ffmpeg = shutil.which("ffmpeg")
+        if ffmpeg is None:
+            raise RuntimeError("ffmpeg is required for MP4 output")
+        frame_dir, fmt = path.with_name(f"{path.stem}_frames"), "png"
+    else:
+        frame_dir = path
+    frame_dir.mkdir(parents=True, exist_ok=True)
+
+    layout = lattice if isinstance(lattice, LatticeLayout) else LatticeLayout.from_graph(lattice)
+    layout = aggregate(layout, max_nodes)
+    data = flow_frames(log, layout, frames)
+    tasks = [(i, frame, frame_dir / f"frame-{i:05d}.{fmt}") for i, frame in enumerate(data)]
+    options = {"title": title, "projection": projection, "figsize": figsize, "dpi": dpi}
+
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    workers = max(1, min(workers, len(tasks)))
+    if workers == 1:
+        _init_frame_worker(layout, options)
+        try:
+            written = [_render_frame(task) for task in tasks]
+        finally:
+            _init_frame_worker(None, None)
+    else:
+        chunksize = max(1, math.ceil(len(tasks) / (4 * workers)))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_frame_worker, initargs=(layout, options)) as pool:
+            written = list(pool.map(_render_frame, tasks, chunksize=chunksize))
+
+    if not video:
+        return [Path(p) for p in written]
+    subprocess.run(
+        [ffmpeg, "-y", "-loglevel", "error", "-framerate", str(fps), "-i", str(frame_dir / "frame-%05d.png"),
+         "-pix_fmt", "yuv420p", "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2", str(path)],
+        check=True,
+    )
+    return path
@@ -0,0 +1,196 @@
+"""Parallel Monte Carlo replicates of the batched router.
+
+One :meth:`RoutingEngine.run` gives a single noisy sample. :func:`run_replicates`
+runs many independent replicates of the same packet population across a
+process pool and reduces compact per-replicate summaries in the parent:
+
+* a time-to-EC histogram,
+* total ``visit_counts`` per node,
+* the mean-confidence trajectory of every replicate.
+
+Each replicate draws from its own ``numpy.random.Generator`` spawned from one
+:class:`numpy.random.SeedSequence`, so results depend only on ``seed`` and not
+on the number of workers or how replicates are chunked.
+"""
+
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import networkx as nx
+import numpy as np
+
+from .routing_engine import CompiledLattice, RoutingEngine, batched_step
+
+
+@dataclass
+class ReplicateSummary:
+    """Reduced results of :func:`run_replicates`.
+
+    Attributes
+    ----------
+    nodes:
+        Node labels in index order (as in :class:`CompiledLattice`).
+    packets:
+        Packets per replicate.
+    max_steps:
+        Step budget of every replicate.
+    hitting_times:
+        ``hitting_times[t]`` counts packets that reached ``EC`` after ``t``
+        steps (``t <= max_steps``); the last bin counts packets that never did.
+    visit_counts:
+        Arrivals per node summed over all replicates.
+    confidence:
+        ``(replicates, max_steps + 1)`` mean packet confidence after each step.
+    """
+
+    nodes: list
+    packets: int
+    max_steps: int
+    hitting_times: np.ndarray
+    visit_counts: np.ndarray
+    confidence: np.ndarray
+
+    @property
+    def replicates(self) -> int:
+        return self.confidence.shape[0]
+
+    @property
+    def absorbed_fraction(self) -> float:
+        total = self.hitting_times.sum()
+        return float(self.hitting_times[:-1].sum() / total) if total else 0.0
+
+    def mean_hitting_time(self) -> float:
+        """Mean steps to ``EC`` over absorbed packets (``nan`` if none were absorbed)."""
+        counts = self.hitting_times[:-1]
+        if not counts.sum():
+            return float("nan")
+        return float(np.arange(counts.size) @ counts / counts.sum())
+
+    def mean_confidence(self) -> np.ndarray:
+        return self.confidence.mean(axis=0)
+
+    def visits(self) -> dict:
+        return {n: int(c) for n, c in zip(self.nodes, self.visit_counts.tolist()) if c}
+
+
+def simulate_replicate(
+    compiled: CompiledLattice,
+    location: np.ndarray,
+    confidence: np.ndarray,
+    max_steps: int,
+    rng: np.random.Generator,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Run one replicate; returns ``(hitting_times, visit_counts, mean_confidence)``."""
+
+    location = location.copy()
+    confidence = confidence.copy()
+    hits = np.zeros(max_steps + 2, dtype=np.int64)
+    visits = np.zeros(compiled.num_nodes, dtype=np.int64)
+    trajectory = np.empty(max_steps + 1)
+    trajectory[0] = confidence.mean() if confidence.size else 0.0
+
+    active = np.flatnonzero(location != compiled.ec)
+    hits[0] = location.size - active.size
+    for step in range(1, max_steps + 1):
+        if active.size == 0:
+            trajectory[step:] = trajectory[step - 1]
+            break
+        nxt, after = batched_step(compiled, location[active], confidence[active], rng)
+        location[active] = nxt
+        confidence[active] = after
+        visits += np.bincount(nxt, minlength=compiled.num_nodes)
+        absorbed = nxt == compiled.ec
+        hits[step] = np.count_nonzero(absorbed)
+        active = active[~absorbed]
+        trajectory[step] = confidence.mean()
+    hits[-1] = active.size
+    return hits, visits, trajectory
+
+
+_WORKER_STATE: tuple | None = None
+
+
+def _init_worker(compiled, location, confidence, max_steps) -> None:
+    global _WORKER_STATE
+    _WORKER_STATE = (compiled, location, confidence, max_steps)
+
+
+def _run_chunk(seeds: list[np.random.SeedSequence]):
+    compiled, location, confidence, max_steps = _WORKER_STATE
+    hits = np.zeros(max_steps + 2, dtype=np.int64)
+    visits = np.zeros(compiled.num_nodes, dtype=np.int64)
+    trajectories = np.empty((len(seeds), max_steps + 1))
+    for i, seed in enumerate(seeds):
+        h, v, trajectories[i] = simulate_replicate(
+            compiled, location, confidence, max_steps, np.random.default_rng(seed)
+        )
+        hits += h
+        visits += v
+    return hits, visits, trajectories
+
+
+def run_replicates(
+    lattice: nx.DiGraph | CompiledLattice,
+    packets,
+    replicates: int = 1000,
+    max_steps: int = 100,
+    seed=None,
+    workers: int | None = None,
+    chunk_size: int | None = None,
+) -> ReplicateSummary:
+    """Run ``replicates`` independent routings of ``packets`` and reduce the results.
+
+    Parameters
+    ----------
+    lattice:
+        Lattice graph (compiled with :class:`RoutingEngine`'s System 2 nodes)
+        or an already compiled lattice.
+    packets:
+        Packet dicts with ``location`` and ``confidence``; every replicate
+        starts from this population. They are not modified.
+    replicates:
+        Number of independent replicates.
+    max_steps:
+        Step budget per replicate.
+    seed:
+        Root seed (int, ``SeedSequence`` or ``None`` for fresh entropy).
+    workers:
+        Worker processes; ``None`` uses ``os.cpu_count()`` and ``0``/``1``
+        runs everything in this process.
+    chunk_size:
+        Replicates per task; defaults to about four tasks per worker.
+    """
+
+    compiled = lattice if isinstance(lattice, CompiledLattice) else RoutingEngine(lattice).compile()
+    packets = list(packets)
+    location = np.fromiter((compiled.index[p["location"]] for p in packets), dtype=np.int64, count=len(packets))
+    confidence = np.fromiter((p["confidence"] for p in packets), dtype=np.float64, count=len(packets))
+    root = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    seeds = root.spawn(replicates)
+
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    workers = max(1, min(workers, replicates))
+    chunk_size = chunk_size or max(1, -(-replicates // (4 * workers)))
+    chunks = [seeds[i:i + chunk_size] for i in range(0, replicates, chunk_size)]
+    state = (compiled, location, confidence, max_steps)
+
+    if workers == 1:
+        _init_worker(*state)
+        try:
+            results = [_run_chunk(chunk) for chunk in chunks]
+        finally:
+            _init_worker(None, None, None, None)
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=state) as pool:
+            results = list(pool.map(_run_chunk, chunks))
+
+    hits = np.zeros(max_steps + 2, dtype=np.int64)
+    visits = np.zeros(compiled.num_nodes, dtype=np.int64)
+    for h, v, _ in results:
+        hits += h
+        visits += v
+    trajectories = np.concatenate([t for _, _, t in results]) if results else np.empty((0, max_steps + 1))
+    return ReplicateSummary(list(compiled.nodes), len(packets), max_steps, hits, visits, trajectories)
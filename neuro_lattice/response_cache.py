@@ -0,0 +1,240 @@
+"""Content-addressed cache for brand-context LLM responses.
+
+Entries are keyed on the provider, a hash of the prompt and a hash of the
+brand kernel. Lookups hit an in-process LRU first and then a SQLite database
+in WAL mode. Several processes (e.g. uvicorn workers of the mediator server)
+can share the database safely.
+
+Enable it for ``with_brand_context`` with ``RESPONSE_CACHE=1``. The database
+lives at ``RESPONSE_CACHE_PATH`` (default ``~/.cache/neuro_lattice/responses.sqlite``)
+and entries expire after ``RESPONSE_CACHE_TTL`` seconds (default: never).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable
+
+# Failed or degraded provider responses; these and mock replies are never cached.
+_ERROR_PREFIXES = ("[CODEX_ERROR]", "[GEMINI_ERROR]", "[LLM_ERROR]", "[WARN]")
+_MOCK_PREFIXES = ("[S2/GEMINI MOCK]", "[MOCK/")
+
+# Environment that decides which backend answers a provider (mock mode, command, arguments).
+_PROVIDER_ENV = {
+    "codex": ("CODEX_CMD", "CODEX_ARGS"),
+    "gemini": ("GEMINI_MOCK", "GEMINI_CMD", "GEMINI_ARGS", "GEMINI_USE_STDIN"),
+}
+_PROVIDER_ALIASES = {"google": "gemini", "vertex": "gemini"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    provider TEXT NOT NULL,
+    value TEXT NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL
+)
+"""
+
+
+def kernel_hash(kernel) -> str:
+    """SHA-256 of the kernel serialised as compact, key-sorted JSON."""
+    blob = json.dumps(kernel, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+def provider_mode(provider: str) -> str:
+    """The provider's backend-selecting environment, e.g. ``GEMINI_MOCK=1\0GEMINI_CMD=...``."""
+    provider = provider.lower()
+    names = _PROVIDER_ENV.get(_PROVIDER_ALIASES.get(provider, provider), ())
+    return "\0".join(f"{name}={os.environ.get(name, '')}" for name in names)
+
+
+def cache_key(provider: str, prompt: str, kernel) -> str:
+    """Key on the provider (aliases folded), its backend, the prompt and the kernel."""
+    provider = provider.lower()
+    provider = _PROVIDER_ALIASES.get(provider, provider)
+    prompt_hash = hashlib.sha256(prompt.encode()).hexdigest()
+    blob = f"{provider}\0{provider_mode(provider)}\0{prompt_hash}\0{kernel_hash(kernel)}"
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+def is_error(response: str) -> bool:
+    """Whether a provider reply is an error or degraded ``[...]`` text rather than a response."""
+    return not response or response.startswith(_ERROR_PREFIXES)
+
+
+def is_cacheable(response: str) -> bool:
+    return not is_error(response) and not response.startswith(_MOCK_PREFIXES)
+
+
+class ResponseCache:
+    """Two-tier (memory LRU + SQLite) response cache with TTL and size eviction.
+
+    Parameters
+    ----------
+    path:
+        SQLite database file. ``None`` keeps the cache in memory only.
+    memory_entries:
+        Capacity of the in-process LRU tier.
+    max_entries:
+        Capacity of the disk tier; least recently used rows are evicted.
+    ttl:
+        Seconds before an entry expires; ``None`` disables expiry.
+    """
+
+    def __init__(
+        self,
+        path: str | Path | None = None,
+        memory_entries: int = 256,
+        max_entries: int = 10_000,
+        ttl: float | None = None,
+    ):
+        self.path = Path(path).expanduser() if path is not None else None
+        self.memory_entries = memory_entries
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._memory: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._counts = {"hits": 0, "misses": 0, "memory_hits": 0, "disk_hits": 0, "stores": 0, "evictions": 0}
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._connection()
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread; FastAPI runs sync endpoints in a thread pool.
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(_SCHEMA)
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, *names: str) -> None:
+        with self._lock:
+            for name in names:
+                self._counts[name] += 1
+
+    def _expired(self, created: float, now: float) -> bool:
+        return self.ttl is not None and now - created > self.ttl
+
+    def _remember(self, key: str, value: str, created: float) -> None:
+        with self._lock:
+            self._memory[key] = (value, created)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    # ------------------------------------------------------------------
+    def get(self, key: str) -> str | None:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if self._expired(entry[1], now):
+                    del self._memory[key]
+                else:
+                    self._memory.move_to_end(key)
+        if entry is not None and not self._expired(entry[1], now):
+            self._count("hits", "memory_hits")
+            return entry[0]
+        if self.path is not None:
+            conn = self._connection()
+            row = conn.execute("SELECT value, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                if self._expired(row[1], now):
+                    conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                else:
+                    conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+                    self._remember(key, row[0], row[1])
+                    self._count("hits", "disk_hits")
+                    return row[0]
+        self._count("misses")
+        return None
+
+    def put(self, key: str, value: str, provider: str = "") -> None:
+        now = time.time()
+        self._remember(key, value, now)
+        self._count("stores")
+        if self.path is None:
+            return
+        conn = self._connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO responses (key, provider, value, created, accessed) VALUES (?, ?, ?, ?, ?)",
+            (key, provider, value, now, now),
+        )
+        self._evict(conn, now)
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        evicted = 0
+        if self.ttl is not None:
+            evicted += conn.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,)).rowcount
+        excess = conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0] - self.max_entries
+        if excess > 0:
+            evicted += conn.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY accessed LIMIT ?)",
+                (excess,),
+            ).rowcount
+        if evicted:
+            with self._lock:
+                self._counts["evictions"] += evicted
+
+    def get_or_call(self, provider: str, prompt: str, kernel, call: Callable[[], str]) -> str:
+        """Return the cached response or ``call()`` and cache its result if cacheable."""
+        key = cache_key(provider, prompt, kernel)
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        response = call()
+        if is_cacheable(response):
+            self.put(key, response, provider.lower())
+        return response
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+        if self.path is not None:
+            self._connection().execute("DELETE FROM responses")
+
+    def __len__(self) -> int:
+        if self.path is None:
+            return len(self._memory)
+        return self._connection().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = dict(self._counts)
+        lookups = counts["hits"] + counts["misses"]
+        counts["hit_rate"] = counts["hits"] / lookups if lookups else 0.0
+        counts["memory_size"] = len(self._memory)
+        return counts
+
+
+_DEFAULT: ResponseCache | None = None
+_DEFAULT_LOCK = threading.Lock()
+
+
+def default_cache() -> ResponseCache | None:
+    """Process-wide cache configured from the environment, or ``None`` when disabled."""
+    global _DEFAULT
+    if os.environ.get("RESPONSE_CACHE") != "1":
+        return None
+    with _DEFAULT_LOCK:
+        if _DEFAULT is None:
+            ttl = os.environ.get("RESPONSE_CACHE_TTL")
+            _DEFAULT = ResponseCache(
+                os.environ.get("RESPONSE_CACHE_PATH", "~/.cache/neuro_lattice/responses.sqlite"),
+                ttl=float(ttl) if ttl else None,
+            )
+        return _DEFAULT
@@ -6,14 +6,170 @@ centroid ("IC") represent the more deliberate *System 2* processing mode. A
 packet must build sufficient confidence before exiting these nodes. Confidence
 slowly accumulates while a packet stays in a System 2 node and increases only
 slightly when traversing to other nodes.
+
+For large packet populations :meth:`RoutingEngine.run_batched` compiles the
+lattice into CSR successor arrays (:class:`CompiledLattice`) and advances all
+active packets with one vectorised step per tick.
 """
 
 from __future__ import annotations
 
+import bisect
+import heapq
+import itertools
+import math
 import random
 from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable
 
 import networkx as nx
+import numpy as np
+
+from . import tracing
+from .transition_log import Labels, TransitionLog
+
+#: Confidence gained per step while dwelling in a gated System 2 node.
+DWELL_GAIN = 0.05
+
+#: Column layout of :attr:`RoutingEngine.transition_log`.
+TRANSITION_COLUMNS = {
+    "agent": Labels("agent"),
+    "from": Labels("node"),
+    "to": Labels("node"),
+    "confidence_before": np.float64,
+    "confidence_after": np.float64,
+}
+
+
+@dataclass(frozen=True)
+class CompiledLattice:
+    """Array form of a lattice used by the batched router.
+
+    Attributes
+    ----------
+    nodes:
+        Node labels in index order.
+    index:
+        Mapping from node label to its integer index.
+    indptr, indices:
+        CSR successor structure: the successors of node ``i`` are
+        ``indices[indptr[i]:indptr[i + 1]]``.
+    threshold:
+        Per-node confidence ``threshold`` (``0.0`` when unset).
+    system2:
+        Boolean mask of System 2 nodes.
+    agents:
+        Agent label for each node, as returned by the engine's agent mapping.
+    ec:
+        Index of the absorbing ``"EC"`` node, or ``-1`` if the lattice has none.
+    """
+
+    nodes: list
+    index: dict
+    indptr: np.ndarray
+    indices: np.ndarray
+    threshold: np.ndarray
+    system2: np.ndarray
+    agents: list
+    ec: int
+
+    @classmethod
+    def from_graph(
+        cls,
+        lattice: nx.Graph,
+        system2_nodes: Iterable[Any] = (),
+        agent_of: Callable[[Any], str] | None = None,
+    ) -> "CompiledLattice":
+        """Compile ``lattice`` into CSR arrays."""
+
+        nodes = list(lattice.nodes())
+        index = {n: i for i, n in enumerate(nodes)}
+        adj = lattice.adj
+        degree = np.fromiter((len(adj[n]) for n in nodes), dtype=np.int64, count=len(nodes))
+        indptr = np.zeros(len(nodes) + 1, dtype=np.int64)
+        np.cumsum(degree, out=indptr[1:])
+        indices = np.fromiter(
+            (index[v] for n in nodes for v in adj[n]), dtype=np.int64, count=int(indptr[-1])
+        )
+        threshold = np.fromiter(
+            (lattice.nodes[n].get("threshold", 0.0) for n in nodes), dtype=np.float64, count=len(nodes)
+        )
+        system2_nodes = set(system2_nodes)
+        system2 = np.fromiter((n in system2_nodes for n in nodes), dtype=bool, count=len(nodes))
+        agents = [agent_of(n) if agent_of else "Unknown" for n in nodes]
+        return cls(nodes, index, indptr, indices, threshold, system2, agents, index.get("EC", -1))
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.nodes)
+
+
+def dwell_confidences(confidence: float, threshold: float, limit: int) -> tuple[int, list]:
+    """Steps a packet dwells at a gated System 2 node, and its confidences.
+
+    Returns ``(stay, values)``: the packet stays ``stay`` steps (at most
+    ``limit``), ``values[k]`` is its confidence before dwell step ``k`` and
+    ``values[stay]`` the confidence it leaves with. The release step is
+    estimated in closed form as ``ceil((threshold - confidence) / 0.05)``;
+    the values come from the exact ``min(1.0, c + 0.05)`` recurrence, so the
+    ``c >= threshold`` release check agrees with :meth:`RoutingEngine.decide_next`
+    bit for bit (the estimate is only trusted to be within one step). A
+    threshold above the ``1.0`` cap is never reached and the packet dwells
+    for all ``limit`` steps.
+    """
+
+    estimate = math.ceil((min(threshold, 1.0) - confidence) / DWELL_GAIN) + 1
+    values = list(
+        itertools.accumulate(range(min(limit, max(1, estimate))), lambda c, _: min(1.0, c + DWELL_GAIN), initial=confidence)
+    )
+    for k in range(1, len(values)):
+        if values[k] >= threshold:
+            return k, values[:k + 1]
+    while len(values) <= limit:
+        after = min(1.0, values[-1] + DWELL_GAIN)
+        if after == values[-1]:
+            # Capped below the threshold: dwells for good.
+            break
+        values.append(after)
+        if after >= threshold:
+            return len(values) - 1, values
+    values.extend([values[-1]] * (limit + 1 - len(values)))
+    return limit, values[:limit + 1]
+
+
+def _row_step(row):
+    return row[0]
+
+
+def _row_order(row):
+    return row[0], row[1]
+
+
+def batched_step(compiled: CompiledLattice, location: np.ndarray, confidence: np.ndarray, rng: np.random.Generator):
+    """Advance every packet in ``location``/``confidence`` by one decision.
+
+    Applies the same gating as :meth:`RoutingEngine.decide_next`: packets in a
+    System 2 node below its threshold dwell and gain ``0.05`` confidence,
+    packets at a node without successors stay put, and all others move to a
+    uniformly chosen successor gaining ``0.02`` confidence.
+
+    Returns ``(next_location, next_confidence)`` as new arrays.
+    """
+
+    gated = compiled.system2[location] & (confidence < compiled.threshold[location])
+    start = compiled.indptr[location]
+    degree = compiled.indptr[location + 1] - start
+    movers = np.flatnonzero(~gated & (degree > 0))
+
+    next_location = location.copy()
+    next_confidence = confidence.copy()
+    next_confidence[gated] = np.minimum(1.0, confidence[gated] + 0.05)
+    if movers.size:
+        offset = rng.integers(0, degree[movers])
+        next_location[movers] = compiled.indices[start[movers] + offset]
+        next_confidence[movers] = np.minimum(1.0, confidence[movers] + 0.02)
+    return next_location, next_confidence
 
 
 class RoutingEngine:
@@ -24,15 +180,19 @@ class RoutingEngine:
     lattice:
         Directed graph representing the lattice. Nodes may define a
         ``threshold`` attribute used for confidence gating in System 2 nodes.
+    transition_log:
+        Optional preconfigured :class:`~neuro_lattice.transition_log.TransitionLog`
+        (capacity, spill directory) using :data:`TRANSITION_COLUMNS`.
     """
 
     #: Nodes considered part of the slow, deliberate System 2 processing mode.
     _SYSTEM2_NODES = {4, 5, 6, 7, "IC"}
 
-    def __init__(self, lattice: nx.DiGraph):
+    def __init__(self, lattice: nx.DiGraph, transition_log: TransitionLog | None = None):
         self.lattice = lattice
         self.visit_counts: defaultdict[int, int] = defaultdict(int)
-        self.transition_log: list[dict] = []
+        self.transition_log = transition_log if transition_log is not None else TransitionLog(TRANSITION_COLUMNS)
+        self._compiled: CompiledLattice | None = None
 
     # ------------------------------------------------------------------
     # Helper methods
@@ -81,14 +241,8 @@ class RoutingEngine:
         confidence_before = packet["confidence"]
         next_node = self.decide_next(current, packet)
 
-        self.transition_log.append(
-            {
-                "agent": self._select_agent(current),
-                "from": current,
-                "to": next_node,
-                "confidence_before": confidence_before,
-                "confidence_after": packet["confidence"],
-            }
+        self.transition_log.record(
+            self._select_agent(current), current, next_node, confidence_before, packet["confidence"]
         )
 
         packet["location"] = next_node
@@ -96,11 +250,203 @@ class RoutingEngine:
         return packet
 
     # ------------------------------------------------------------------
-    def run(self, packets, max_steps=100):
-        """Simulate routing until all packets reach ``EC`` or steps exhausted."""
+    @tracing.traced("RoutingEngine.run")
+    def run(self, packets, max_steps=100, mode="step"):
+        """Simulate routing until all packets reach ``EC`` or steps exhausted.
+
+        ``mode`` selects the executor: ``"step"`` (one decision per packet per
+        step), ``"event"`` (:meth:`run_event_driven`, identical results) or
+        ``"batched"`` (:meth:`run_batched`, NumPy random stream).
+        """
 
+        if mode == "event":
+            return self.run_event_driven(packets, max_steps=max_steps)
+        if mode == "batched":
+            return self.run_batched(packets, max_steps=max_steps)
+        if mode != "step":
+            raise ValueError(f"Unsupported mode: {mode}")
         for _ in range(max_steps):
             for p in packets:
                 if p["location"] != "EC":
                     self.route_packet(p)
         return packets
+
+    def run_event_driven(self, packets, max_steps=100, record_transitions=True):
+        """Event-driven equivalent of :meth:`run` with dwell fast-forward.
+
+        Only packets that still have to move are kept, in a heap keyed by
+        ``(decision step, packet index)``. Dwelling in a System 2 node and
+        holding at a node without successors use no randomness and are
+        deterministic, so a popped packet jumps straight to its release step
+        (see :func:`dwell_confidences`). Moves are taken in the same
+        ``(step, index)`` order as :meth:`run`, so ``random.choice`` yields the
+        same successors, and the packets, ``visit_counts`` and
+        ``transition_log`` end up identical. Rows are written to the log as the
+        heap's step frontier passes them, so at most the rows of steps not yet
+        settled are buffered. Work scales with moves (plus logged rows), not
+        ``max_steps``.
+        """
+
+        lattice = self.lattice
+        pending = []  # (step, index, *row) not yet logged; every step >= the frontier
+        held = []  # (index, agent, node, confidence, since) of packets stuck at a dead end
+        frontier = 0
+        heap = [(0, i) for i, p in enumerate(packets) if p["location"] != "EC"]
+        heapq.heapify(heap)
+        while heap:
+            popped = heap[0][0]
+            if popped > frontier and (pending or held):
+                # No packet can produce rows before ``popped`` any more.
+                self._flush_rows(pending, held, frontier, popped)
+            frontier = popped
+            popped, i = heapq.heappop(heap)
+            step = popped
+            p = packets[i]
+            current = p["location"]
+            confidence = p["confidence"]
+            agent = self._select_agent(current)
+            threshold = lattice.nodes[current].get("threshold", 0.0)
+
+            if step < max_steps and current in self._SYSTEM2_NODES and confidence < threshold:
+                stay, values = dwell_confidences(confidence, threshold, max_steps - step)
+                if record_transitions:
+                    pending.extend(
+                        (step + k, i, agent, current, current, values[k], values[k + 1]) for k in range(stay)
+                    )
+                self.visit_counts[current] += stay
+                step += stay
+                confidence = values[stay]
+            successors = list(lattice.successors(current))
+            if step < max_steps and not successors:
+                # Held at a dead end for the rest of the run; its rows are generated as steps settle.
+                stay = max_steps - step
+                if record_transitions:
+                    bisect.insort(held, (i, agent, current, confidence, step))
+                self.visit_counts[current] += stay
+                step = max_steps
+            p["confidence"] = confidence
+            if step >= max_steps:
+                continue
+            if step > popped:
+                # Other packets may move before this one is released.
+                heapq.heappush(heap, (step, i))
+                continue
+
+            next_node = random.choice(successors)
+            p["confidence"] = min(1.0, confidence + 0.02)
+            p["location"] = next_node
+            self.visit_counts[next_node] += 1
+            if record_transitions:
+                pending.append((step, i, agent, current, next_node, confidence, p["confidence"]))
+            if next_node != "EC":
+                heapq.heappush(heap, (step + 1, i))
+
+        self._flush_rows(pending, held, frontier, max_steps)
+        return packets
+
+    def _flush_rows(self, pending, held, start, before):
+        """Log, in ``(step, index)`` order, the rows of steps ``start <= t < before``.
+
+        ``pending`` holds buffered rows; ``held`` packets log one row per step
+        from their ``since`` step on.
+        """
+        pending.sort(key=_row_order)
+        cut = bisect.bisect_left(pending, before, key=_row_step)
+        rows = pending[:cut]
+        if held:
+            holds = (
+                (t, i, agent, node, node, c, c)
+                for t in range(start, before)
+                for i, agent, node, c, since in held
+                if since <= t
+            )
+            rows = heapq.merge(rows, holds, key=_row_order)
+        record = self.transition_log.record
+        for _, _, agent, src, dst, conf_before, conf_after in rows:
+            record(agent, src, dst, conf_before, conf_after)
+        del pending[:cut]
+
+    # ------------------------------------------------------------------
+    def compile(self, refresh: bool = False) -> CompiledLattice:
+        """Return the cached :class:`CompiledLattice` for this engine's lattice.
+
+        The compiled arrays are built on first use. Pass ``refresh=True`` after
+        mutating the lattice's structure or thresholds.
+        """
+
+        if self._compiled is None or refresh:
+            self._compiled = CompiledLattice.from_graph(self.lattice, self._SYSTEM2_NODES, self._select_agent)
+        return self._compiled
+
+    def solve_exact(self, packets):
+        """Exact expected routing statistics for ``packets`` without sampling.
+
+        Solves the absorbing Markov chain of :meth:`decide_next`; see
+        :func:`neuro_lattice.markov.solve_routing`. Packets are not modified.
+        """
+
+        from .markov import solve_routing
+
+        return solve_routing(self.compile(), packets)
+
+    def run_batched(self, packets, max_steps=100, rng=None, record_transitions=True):
+        """Vectorised equivalent of :meth:`run` for large packet populations.
+
+        Packet locations and confidences are held in NumPy arrays and all
+        active packets advance together each step via :func:`batched_step`.
+        Packets are updated in place and ``visit_counts`` and
+        ``transition_log`` are filled as in :meth:`run`.
+
+        Parameters
+        ----------
+        packets:
+            Sequence of packet dicts with ``location`` and ``confidence`` keys.
+        max_steps:
+            Maximum number of routing steps.
+        rng:
+            ``numpy.random.Generator`` or seed used for successor choice.
+        record_transitions:
+            When ``False`` the transition log is not written.
+        """
+
+        compiled = self.compile()
+        rng = np.random.default_rng(rng)
+        packets = list(packets)
+        location = np.fromiter((compiled.index[p["location"]] for p in packets), dtype=np.int64, count=len(packets))
+        confidence = np.fromiter((p["confidence"] for p in packets), dtype=np.float64, count=len(packets))
+        visits = np.zeros(compiled.num_nodes, dtype=np.int64)
+
+        if record_transitions:
+            node_codes = self.transition_log.intern_many("node", compiled.nodes)
+            agent_codes = self.transition_log.intern_many("agent", compiled.agents)
+
+        active = np.flatnonzero(location != compiled.ec)
+        for _ in range(max_steps):
+            if active.size == 0:
+                break
+            current = location[active]
+            before = confidence[active]
+            nxt, after = batched_step(compiled, current, before, rng)
+            location[active] = nxt
+            confidence[active] = after
+            visits += np.bincount(nxt, minlength=compiled.num_nodes)
+            if record_transitions:
+                self.transition_log.extend_columns(
+                    {
+                        "agent": agent_codes[current],
+                        "from": node_codes[current],
+                        "to": node_codes[nxt],
+                        "confidence_before": before,
+                        "confidence_after": after,
+                    },
+                    encoded=True,
+                )
+            active = active[nxt != compiled.ec]
+
+        nodes = compiled.nodes
+        for p, loc, conf in zip(packets, location.tolist(), confidence.tolist()):
+            p["location"] = nodes[loc]
+            p["confidence"] = conf
+        for i in np.flatnonzero(visits).tolist():
+            self.visit_counts[nodes[i]] += int(visits[i])
+        return packets
@@ -0,0 +1,315 @@
+"""Lightweight tracing spans and Prometheus-style metrics.
+
+Spans nest through a :class:`contextvars.ContextVar`, so they follow threads
+started with a copied context and asyncio tasks. A finished span goes to
+every registered exporter and its duration to the ``neuro_lattice_span_seconds``
+histogram. With no exporter registered a span costs two clock reads, a
+context-variable set/reset and a histogram observation.
+
+Exporters:
+
+* :class:`InMemoryExporter` keeps the last ``maxlen`` spans (tests, debugging);
+* :class:`FileExporter` appends one JSON object per span to a file. Setting
+  ``NEURO_LATTICE_TRACE_FILE`` registers one at import.
+
+Metrics live in :data:`REGISTRY` and :func:`render_metrics` renders them in
+the Prometheus text exposition format (served by the mediator's ``/metrics``).
+"""
+from __future__ import annotations
+
+import bisect
+import functools
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+
+#: Latency buckets in seconds, up to the 120 s provider timeout.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+# ---- Metrics ----
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values, extra="") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames=(), registry=None):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        (REGISTRY if registry is None else registry).register(self)
+
+    def labels(self, *values):
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._child())
+        return child
+
+    def clear(self):
+        with self._lock:
+            self._children.clear()
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for key, child in sorted(self._children.items()):
+            lines.extend(self._samples(key, child))
+        return lines
+
+
+class _Value:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1.0):
+        with self._lock:
+            self.value += amount
+
+    def set(self, value):
+        self.value = float(value)
+
+
+class Counter(_Metric):
+    """Monotonic count, e.g. ``TURNS.labels("S1").inc()``."""
+
+    kind = "counter"
+
+    def _child(self):
+        return _Value()
+
+    def _samples(self, key, child):
+        yield f"{self.name}_total{_labels(self.labelnames, key)} {_number(child.value)}"
+
+
+class Gauge(_Metric):
+    """Point-in-time value, e.g. queue depth; ``labels(...).set(v)``."""
+
+    kind = "gauge"
+
+    def _child(self):
+        return _Value()
+
+    def _samples(self, key, child):
+        yield f"{self.name}{_labels(self.labelnames, key)} {_number(child.value)}"
+
+
+class _Buckets:
+    __slots__ = ("bounds", "counts", "sum", "count", "_lock")
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        i = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+            self.count += 1
+
+
+class Histogram(_Metric):
+    """Latency distribution over cumulative ``le`` buckets."""
+
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS, registry=None):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help, labelnames, registry)
+
+    def _child(self):
+        return _Buckets(self.buckets)
+
+    def _samples(self, key, child):
+        running = 0
+        for bound, count in zip((*self.buckets, float("inf")), child.counts):
+            running += count
+            le = 'le="%s"' % _number(bound)
+            yield f"{self.name}_bucket{_labels(self.labelnames, key, le)} {running}"
+        yield f"{self.name}_sum{_labels(self.labelnames, key)} {_number(child.sum)}"
+        yield f"{self.name}_count{_labels(self.labelnames, key)} {child.count}"
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+
+    def register(self, metric):
+        if metric.name in self.metrics:
+            raise ValueError(f"Duplicate metric: {metric.name}")
+        self.metrics[metric.name] = metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+SPAN_SECONDS = Histogram("neuro_lattice_span_seconds", "Duration of traced spans.", ("span",))
+PROVIDER_SECONDS = Histogram(
+    "neuro_lattice_provider_seconds", "Provider CLI call latency per provider and invocation strategy.",
+    ("provider", "strategy"),
+)
+PROVIDER_ERRORS = Counter(
+    "neuro_lattice_provider_errors", "Provider calls that failed or timed out.", ("provider", "strategy"),
+)
+PROVIDER_FIRST_BYTE = Histogram(
+    "neuro_lattice_provider_first_byte_seconds", "Time to first output byte of streamed provider calls.",
+    ("provider",),
+)
+TURNS = Counter("neuro_lattice_turns", "Mediator session turns completed.", ("speaker",))
+QUEUE_DEPTH = Gauge("neuro_lattice_queue_depth", "Job sessions waiting for a slot or running.", ("state",))
+
+
+def render_metrics() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    return REGISTRY.render()
+
+
+# ---- Spans ----
+class Span:
+    __slots__ = ("name", "attributes", "trace_id", "span_id", "parent_id", "start", "duration", "error")
+
+    def __init__(self, name, attributes, parent):
+        self.name = name
+        self.attributes = attributes
+        self.trace_id = parent.trace_id if parent is not None else os.urandom(8).hex()
+        self.span_id = f"{os.getpid():x}-{next(_ids):x}"
+        self.parent_id = parent.span_id if parent is not None else None
+        self.start = time.time()
+        self.duration = None
+        self.error = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def to_dict(self):
+        return {
+            "name": self.name, "trace_id": self.trace_id, "span_id": self.span_id,
+            "parent_id": self.parent_id, "start": self.start, "duration": self.duration,
+            "attributes": self.attributes, "error": self.error,
+        }
+
+
+_ids = itertools.count(1)
+_current: ContextVar[Span | None] = ContextVar("neuro_lattice_span", default=None)
+_exporters: list = []
+
+
+def current_span() -> Span | None:
+    return _current.get()
+
+
+class span:
+    """``with span("name", key=value) as s:`` times a block as a child of the current span."""
+
+    __slots__ = ("_span", "_token", "_t0")
+
+    def __init__(self, name: str, **attributes):
+        self._span = Span(name, attributes, _current.get())
+
+    def __enter__(self) -> Span:
+        self._token = _current.set(self._span)
+        self._t0 = time.perf_counter()
+        return self._span
+
+    def __exit__(self, exc_type, exc, tb):
+        s = self._span
+        s.duration = time.perf_counter() - self._t0
+        _current.reset(self._token)
+        if exc_type is not None:
+            s.error = f"{exc_type.__name__}: {exc}"
+        SPAN_SECONDS.labels(s.name).observe(s.duration)
+        for exporter in _exporters:
+            exporter.export(s)
+        return False
+
+
+def traced(name: str | None = None, **attributes):
+    """Decorator running the function inside a span (named after the function by default)."""
+
+    def decorate(fn):
+        span_name = name or f"{fn.__module__}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(span_name, **attributes):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+# ---- Exporters ----
+class InMemoryExporter:
+    """Keeps finished spans in memory, oldest first."""
+
+    def __init__(self, maxlen: int = 10000):
+        self.spans = deque(maxlen=maxlen)
+
+    def export(self, s: Span) -> None:
+        self.spans.append(s)
+
+    def clear(self) -> None:
+        self.spans.clear()
+
+
+class FileExporter:
+    """Appends each finished span to ``path`` as a JSON line."""
+
+    def __init__(self, path):
+        self.path = os.fspath(path)
+        self._lock = threading.Lock()
+
+    def export(self, s: Span) -> None:
+        line = json.dumps(s.to_dict(), default=str) + "\n"
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+
+def add_exporter(exporter):
+    _exporters.append(exporter)
+    return exporter
+
+
+def remove_exporter(exporter) -> None:
+    if exporter in _exporters:
+        _exporters.remove(exporter)
+
+
+if os.environ.get("NEURO_LATTICE_TRACE_FILE"):
+    add_exporter(FileExporter(os.environ["NEURO_LATTICE_TRACE_FILE"]))
@@ -0,0 +1,307 @@
+"""Columnar, bounded storage for routing transitions.
+
+:class:`TransitionLog` replaces the unbounded ``list[dict]`` previously used
+by the routing engines. Rows are stored in preallocated NumPy columns that act
+as a ring buffer; label columns (nodes, agents) are interned to small integer
+codes. When ``spill_dir`` is set, full buffers are written to disk as ``.npy``
+(or Parquet) chunks instead of dropping the oldest rows.
+
+Consumers that expect a list of dicts keep working: indexing and iteration
+decode rows lazily into dictionaries.
+"""
+
+from __future__ import annotations
+
+import json
+import warnings
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Mapping
+
+import numpy as np
+
+
+class Labels:
+    """Column spec for hashable labels interned into ``int32`` codes.
+
+    Columns sharing a ``vocab`` name share one code table, so ``from`` and
+    ``to`` node columns decode against the same labels.
+    """
+
+    def __init__(self, vocab: str):
+        self.vocab = vocab
+
+    def __repr__(self) -> str:
+        return f"Labels({self.vocab!r})"
+
+
+class TransitionLog:
+    """Ring-buffered columnar log with optional spill-to-disk.
+
+    Parameters
+    ----------
+    columns:
+        Ordered mapping of column name to either a NumPy dtype or a
+        :class:`Labels` spec.
+    capacity:
+        Number of rows held in memory.
+    spill_dir:
+        Directory receiving full chunks. When ``None`` the oldest rows are
+        overwritten once the buffer is full; the first overwrite issues a
+        :class:`RuntimeWarning` and :attr:`dropped` counts them.
+    spill_format:
+        ``"npy"`` (one structured array per chunk) or ``"parquet"``
+        (requires ``pyarrow``).
+    """
+
+    def __init__(
+        self,
+        columns: Mapping[str, Any],
+        capacity: int = 1 << 20,
+        spill_dir: str | Path | None = None,
+        spill_format: str = "npy",
+    ):
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        if spill_format not in ("npy", "parquet"):
+            raise ValueError(f"Unsupported spill_format: {spill_format}")
+        if spill_dir is not None and spill_format == "parquet":
+            import pyarrow  # noqa: F401  (fail early if the optional dependency is missing)
+
+        self.columns = dict(columns)
+        self.names = list(self.columns)
+        self.capacity = int(capacity)
+        self.spill_dir = Path(spill_dir) if spill_dir is not None else None
+        self.spill_format = spill_format
+        if self.spill_dir is not None:
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+
+        self._labels = {n: s.vocab for n, s in self.columns.items() if isinstance(s, Labels)}
+        self._codes: dict[str, dict] = {v: {} for v in self._labels.values()}
+        self._vocab: dict[str, list] = {v: [] for v in self._labels.values()}
+        self._data = {
+            n: np.empty(self.capacity, dtype=np.int32 if n in self._labels else np.dtype(s))
+            for n, s in self.columns.items()
+        }
+        self._start = 0
+        self._size = 0
+        self._chunks: list[tuple[Path, int]] = []
+        self._spilled_rows = 0
+        self._dropped = 0
+        self._chunk_cache: tuple[int, dict[str, np.ndarray]] | None = None
+
+    # ------------------------------------------------------------------
+    # Interning
+    def intern(self, vocab: str, label) -> int:
+        """Return the code for ``label`` in ``vocab``, assigning one if new."""
+        codes = self._codes[vocab]
+        code = codes.get(label)
+        if code is None:
+            code = codes[label] = len(self._vocab[vocab])
+            self._vocab[vocab].append(label)
+        return code
+
+    def intern_many(self, vocab: str, labels: Iterable) -> np.ndarray:
+        """Vectorised :meth:`intern`; returns an ``int32`` code array."""
+        return np.fromiter((self.intern(vocab, label) for label in labels), dtype=np.int32)
+
+    def vocabulary(self, vocab: str) -> list:
+        return list(self._vocab[vocab])
+
+    # ------------------------------------------------------------------
+    # Writing
+    def record(self, *values) -> None:
+        """Append one row given positionally in column order."""
+        if self._size == self.capacity:
+            self._make_room(1)
+        i = self._start + self._size
+        if i >= self.capacity:
+            i -= self.capacity
+        labels = self._labels
+        for name, value in zip(self.names, values):
+            vocab = labels.get(name)
+            self._data[name][i] = self.intern(vocab, value) if vocab is not None else value
+        self._size += 1
+
+    def append(self, row: Mapping[str, Any]) -> None:
+        """Append one row given as a mapping (``list.append`` compatibility)."""
+        self.record(*(row[name] for name in self.names))
+
+    def extend(self, rows) -> None:
+        """Append rows; accepts an iterable of mappings or a column mapping of arrays."""
+        if isinstance(rows, Mapping):
+            self.extend_columns(rows)
+            return
+        for row in rows:
+            self.append(row)
+
+    def extend_columns(self, columns: Mapping[str, Any], encoded: bool = False) -> None:
+        """Append equally sized column arrays.
+
+        With ``encoded=True`` label columns must already hold codes returned by
+        :meth:`intern`/:meth:`intern_many`; otherwise raw labels are interned.
+        """
+        arrays = {}
+        for name in self.names:
+            vocab = self._labels.get(name)
+            if vocab is not None and not encoded:
+                arrays[name] = self.intern_many(vocab, columns[name])
+            else:
+                arrays[name] = np.asarray(columns[name])
+        n = len(arrays[self.names[0]]) if self.names else 0
+        pos = 0
+        while pos < n:
+            free = self.capacity - self._size
+            if free == 0:
+                self._make_room(n - pos)
+                free = self.capacity - self._size
+            m = min(free, n - pos)
+            tail = (self._start + self._size) % self.capacity
+            first = min(m, self.capacity - tail)
+            for name, values in arrays.items():
+                col = self._data[name]
+                col[tail:tail + first] = values[pos:pos + first]
+                if first < m:
+                    col[:m - first] = values[pos + first:pos + m]
+            self._size += m
+            pos += m
+
+    def _make_room(self, wanted: int) -> None:
+        if self.spill_dir is not None:
+            self.flush()
+            return
+        k = min(wanted, self._size)
+        if k and not self._dropped:
+            warnings.warn(
+                f"TransitionLog is full ({self.capacity} rows) and has no spill_dir; "
+                "the oldest rows are being dropped",
+                RuntimeWarning,
+                stacklevel=3,
+            )
+        self._start = (self._start + k) % self.capacity
+        self._size -= k
+        self._dropped += k
+
+    def flush(self) -> None:
+        """Write the in-memory rows to a new spill chunk and empty the buffer."""
+        if self.spill_dir is None or self._size == 0:
+            return
+        index = len(self._chunks)
+        columns = {name: self._ordered(name) for name in self.names}
+        if self.spill_format == "npy":
+            path = self.spill_dir / f"chunk-{index:06d}.npy"
+            chunk = np.empty(self._size, dtype=[(name, columns[name].dtype) for name in self.names])
+            for name in self.names:
+                chunk[name] = columns[name]
+            np.save(path, chunk)
+        else:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            path = self.spill_dir / f"chunk-{index:06d}.parquet"
+            pq.write_table(pa.table(columns), path)
+        (self.spill_dir / "vocab.json").write_text(json.dumps(self._vocab, default=str))
+        self._chunks.append((path, self._size))
+        self._spilled_rows += self._size
+        self._start = 0
+        self._size = 0
+
+    def clear(self) -> None:
+        """Forget all rows (spilled chunk files are left on disk)."""
+        self._start = 0
+        self._size = 0
+        self._chunks = []
+        self._spilled_rows = 0
+        self._dropped = 0
+        self._chunk_cache = None
+
+    # ------------------------------------------------------------------
+    # Reading
+    @property
+    def dropped(self) -> int:
+        """Rows overwritten by the ring buffer."""
+        return self._dropped
+
+    @property
+    def total(self) -> int:
+        """All rows ever appended, including dropped ones."""
+        return self._spilled_rows + self._size + self._dropped
+
+    @property
+    def chunks(self) -> list[Path]:
+        return [path for path, _ in self._chunks]
+
+    def __len__(self) -> int:
+        return self._spilled_rows + self._size
+
+    def _ordered(self, name: str) -> np.ndarray:
+        col = self._data[name]
+        end = self._start + self._size
+        if end <= self.capacity:
+            return col[self._start:end]
+        return np.concatenate((col[self._start:], col[:end - self.capacity]))
+
+    def _load_chunk(self, index: int) -> dict[str, np.ndarray]:
+        if self._chunk_cache is not None and self._chunk_cache[0] == index:
+            return self._chunk_cache[1]
+        path = self._chunks[index][0]
+        if self.spill_format == "npy":
+            data = np.load(path, mmap_mode="r")
+            columns = {name: data[name] for name in self.names}
+        else:
+            import pyarrow.parquet as pq
+
+            table = pq.read_table(path)
+            columns = {name: table.column(name).to_numpy() for name in self.names}
+        self._chunk_cache = (index, columns)
+        return columns
+
+    def column(self, name: str, decode: bool = False, include_spilled: bool = True):
+        """Return one column in row order as an array (or decoded list)."""
+        parts = [self._load_chunk(i)[name] for i in range(len(self._chunks))] if include_spilled else []
+        parts.append(self._ordered(name))
+        values = np.concatenate(parts) if len(parts) > 1 else np.array(parts[0])
+        vocab = self._labels.get(name)
+        if decode and vocab is not None:
+            labels = self._vocab[vocab]
+            return [labels[c] for c in values.tolist()]
+        return values
+
+    def _decode_rows(self, columns: Mapping[str, np.ndarray]) -> Iterator[dict]:
+        decoded = []
+        for name in self.names:
+            values = np.asarray(columns[name]).tolist()
+            vocab = self._labels.get(name)
+            if vocab is not None:
+                labels = self._vocab[vocab]
+                values = [labels[c] for c in values]
+            decoded.append(values)
+        names = self.names
+        for row in zip(*decoded):
+            yield dict(zip(names, row))
+
+    def __iter__(self) -> Iterator[dict]:
+        for i in range(len(self._chunks)):
+            yield from self._decode_rows(self._load_chunk(i))
+        yield from self._decode_rows({name: self._ordered(name) for name in self.names})
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        n = len(self)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("transition log index out of range")
+        if index >= self._spilled_rows:
+            i = (self._start + index - self._spilled_rows) % self.capacity
+            columns = {name: self._data[name][i:i + 1] for name in self.names}
+        else:
+            for chunk, (_, rows) in enumerate(self._chunks):
+                if index < rows:
+                    break
+                index -= rows
+            columns = {name: col[index:index + 1] for name, col in self._load_chunk(chunk).items()}
+        return next(self._decode_rows(columns))
+
+    def __repr__(self) -> str:
+        return f"TransitionLog(rows={len(self)}, capacity={self.capacity}, dropped={self._dropped})"
@@ -1,12 +1,23 @@
 """Visualization utilities for NeuroLattice."""
 import networkx as nx
 
-def plot_lattice(lattice: nx.Graph, title: str = "Lattice Visualization"):
-    """Draw the lattice graph using NetworkX spring layout."""
+def plot_lattice(lattice: nx.Graph, title: str = "Lattice Visualization", path=None):
+    """Draw the lattice graph from its ``pos`` attributes.
+
+    With ``path`` the figure is rendered headlessly to that file (PNG, SVG,
+    ...) by :func:`neuro_lattice.render.render_lattice` and the path is
+    returned; otherwise it is shown interactively.
+    """
+    if path is not None:
+        from .render import render_lattice
+
+        return render_lattice(lattice, path, title=title)
+
     import matplotlib.pyplot as plt
 
-    pos = nx.get_node_attributes(lattice, "pos") or nx.spring_layout(lattice)
-    nx.draw(lattice, pos, with_labels=True, node_color='skyblue', node_size=700,
+    pos = nx.get_node_attributes(lattice, "pos")
+    pos = {n: p[:2] for n, p in pos.items()} if len(pos) == len(lattice) else nx.circular_layout(lattice)
+    nx.draw(lattice, pos, with_labels=len(lattice) <= 50, node_color='skyblue', node_size=700,
             edge_color='gray', linewidths=1, font_size=12)
     plt.title(title)
     plt.show()
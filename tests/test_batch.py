@@ -0,0 +1,65 @@
+import json
+
+import pytest
+
+from cli_agent.batch import iter_briefs, run_batch
+from cli_agent.parser import setup_parser
+
+
+@pytest.fixture
+def mock_providers(monkeypatch):
+    monkeypatch.setenv("S1_PROVIDER", "mock")
+    monkeypatch.setenv("S2_PROVIDER", "gemini")
+    monkeypatch.setenv("GEMINI_MOCK", "1")
+
+
+def _write_briefs(tmp_path):
+    briefs = tmp_path / "briefs"
+    briefs.mkdir()
+    (briefs / "receipt.json").write_text(json.dumps({"prompt": "Receipt email", "modal": "linguistic"}))
+    with (briefs / "suite.jsonl").open("w") as f:
+        for i in range(5):
+            f.write(json.dumps({"request_id": f"r{i}", "title": f"Brief {i}", "body": "details"}) + "\n")
+    return briefs
+
+
+def _records(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_iter_briefs_ids(tmp_path):
+    ids = [brief_id for brief_id, _ in iter_briefs(_write_briefs(tmp_path))]
+    assert ids == ["receipt", "r0", "r1", "r2", "r3", "r4"]
+
+
+def test_batch_resumes_after_failures(tmp_path, mock_providers):
+    briefs = _write_briefs(tmp_path)
+    out = tmp_path / "results.jsonl"
+    flaky = {"r2"}
+
+    def call(provider, prompt, kernel):
+        if any(f"Brief {b[1:]}" in prompt for b in flaky):
+            raise RuntimeError("provider down")
+        return provider
+
+    first = run_batch(briefs, out, workers=3, call=call, turns=2)
+    assert (first["completed"], first["failed"], first["skipped"]) == (5, 1, 0)
+    failed = [r for r in _records(out) if r["error"]]
+    assert [r["id"] for r in failed] == ["r2"]
+
+    flaky.clear()
+    second = run_batch(briefs, out, workers=3, call=call, turns=2)
+    assert (second["completed"], second["failed"], second["skipped"]) == (1, 0, 5)
+    done = (tmp_path / "results.jsonl.done").read_text().split()
+    assert sorted(done) == ["r0", "r1", "r2", "r3", "r4", "receipt"]
+    ok = [r for r in _records(out) if not r["error"]]
+    assert all(len(r["messages"]) == 2 for r in ok)
+
+
+def test_batch_subcommand(tmp_path, mock_providers, capsys):
+    parser, _ = setup_parser({})
+    out = tmp_path / "out.jsonl"
+    args = parser.parse_args(["batch", str(_write_briefs(tmp_path)), "--out", str(out), "--workers", "2", "--turns", "2"])
+    args.func(args, {})
+    assert "Completed 6, failed 0, skipped 0" in capsys.readouterr().out
+    assert len(_records(out)) == 6
@@ -0,0 +1,65 @@
+import json
+from unittest.mock import patch
+
+import pytest
+
+from agents.session import SessionReq, session_context
+from neuro_lattice import brand_context
+from neuro_lattice.brand_context import KernelSlice, render_context, size_report, slice_kernel
+from neuro_lattice.llm_interface import _brand_prompt, with_brand_context
+
+KERNEL_PATH = "memory/brand_identity_kernel.json"
+
+
+@pytest.fixture
+def kernel():
+    with open(KERNEL_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_slice_keeps_event_and_its_resonance(kernel):
+    body = slice_kernel(kernel, "linguistic", "adapt_register")["brand_identity_kernel"]
+    assert body["core_nodes"] == kernel["brand_identity_kernel"]["core_nodes"]
+    assert body["modal_domains"] == {
+        "linguistic": {
+            "description": "Naming, microcopy, content tone, chatbot messaging",
+            "outputs": {"adapt_register": 43},
+        }
+    }
+    assert body["resonance_map"] == {"43": ["S2-N2", "S1-N1"], "∞": ["Blueprint"]}
+
+    modal = slice_kernel(kernel, "visual")["brand_identity_kernel"]
+    assert set(modal["resonance_map"]) == {"6", "10", "15", "14", "26", "33", "35", "51", "∞"}
+    assert slice_kernel(kernel) is kernel
+    with pytest.raises(KeyError):
+        slice_kernel(kernel, "visual", "no_such_event")
+
+
+def test_render_is_compact_cached_and_smaller(kernel):
+    brand_context.clear_cache()
+    text = render_context(kernel, "visual", "amplify_brand_colours")
+    assert json.loads(text) == slice_kernel(kernel, "visual", "amplify_brand_colours")
+    assert "\n" not in text
+    with patch.object(brand_context.json, "dumps", side_effect=AssertionError("re-serialised")):
+        assert render_context(kernel, "visual", "amplify_brand_colours") is text
+    report = size_report(kernel)
+    assert len(report["events"]) == 48 and report["mean_event_reduction"] > 0.7
+    assert report["compact"] < report["full"]
+
+
+def test_default_prompt_format_is_unchanged(kernel):
+    expected = json.dumps(kernel, indent=2)
+    assert expected in _brand_prompt("task", kernel)
+    sliced = _brand_prompt("task", slice_kernel(kernel, "visual", "amplify_brand_colours"))
+    assert render_context(kernel, "visual", "amplify_brand_colours") in sliced
+
+
+def test_with_brand_context_and_sessions_send_the_slice(kernel):
+    seen = []
+    with patch("neuro_lattice.llm_interface.run_codex", side_effect=lambda p: seen.append(p) or "ok"):
+        assert with_brand_context("codex", "task", kernel, modal="symbolic", event="anchor_logo") == "ok"
+    assert '"anchor_logo":48' in seen[0] and "visual" not in seen[0]
+
+    sent, prime, _ = session_context(SessionReq(prompt="p", modal="symbolic", event="anchor_logo"))
+    assert isinstance(sent, KernelSlice) and prime == 48
+    assert sent == slice_kernel(kernel, "symbolic", "anchor_logo")
@@ -0,0 +1,59 @@
+import pytest
+
+from agents.bus_writer import BusWriter, read_bus
+
+
+def test_batches_until_flush(tmp_path):
+    bus = BusWriter(tmp_path, session="s1", batch_size=3, flush_interval=60)
+    bus.post({"turn": 1})
+    bus.post({"turn": 2})
+    assert list(read_bus(tmp_path)) == []
+    bus.post({"turn": 3})
+    assert [m["turn"] for m in read_bus(tmp_path)] == [1, 2, 3]
+    bus.post({"turn": 4})
+    assert [m["turn"] for m in bus.read()] == [1, 2, 3, 4]
+    bus.close()
+
+
+@pytest.mark.parametrize("framing", ["jsonl", "binary"])
+def test_rotation_and_round_trip(tmp_path, framing):
+    msgs = [{"turn": i, "response": "line\nbreak ✓" * i} for i in range(50)]
+    with BusWriter(tmp_path, session="s", framing=framing, batch_size=5, max_bytes=512, fsync="batch") as bus:
+        for msg in msgs:
+            bus.post(msg)
+    assert len(bus.segments) > 1
+    assert list(read_bus(tmp_path / "s")) == msgs
+    assert list(read_bus(bus.segments[0]))[0] == msgs[0]
+
+
+def test_sessions_are_separate_and_resume_numbering(tmp_path):
+    with BusWriter(tmp_path, session="a", fsync="always") as bus:
+        bus.post({"who": "a"})
+    with BusWriter(tmp_path, session="b") as bus:
+        bus.post({"who": "b"})
+    with BusWriter(tmp_path, session="a") as bus:
+        bus.post({"who": "a2"})
+    assert [p.name for p in bus.segments] == ["segment-000001.jsonl", "segment-000002.jsonl"]
+    assert [m["who"] for m in read_bus(tmp_path)] == ["a", "a2", "b"]
+
+
+def test_torn_binary_frame_is_ignored(tmp_path):
+    with BusWriter(tmp_path, session="s", framing="binary") as bus:
+        bus.post({"ok": 1})
+        bus.post({"ok": 2})
+    segment = bus.segments[0]
+    segment.write_bytes(segment.read_bytes()[:-3])
+    assert list(read_bus(segment)) == [{"ok": 1}]
+
+
+def test_concurrent_writers_never_share_a_segment(tmp_path):
+    first, second = BusWriter(tmp_path), BusWriter(tmp_path)
+    assert first.session != second.session
+    # Writers forced into one session still create their own segments.
+    a, b = BusWriter(tmp_path, session="s"), BusWriter(tmp_path, session="s")
+    a.post({"w": "a"})
+    b.post({"w": "b"})
+    a.close()
+    b.close()
+    assert {p.name for p in a.segments} == {"segment-000001.jsonl", "segment-000002.jsonl"}
+    assert sorted(m["w"] for m in read_bus(tmp_path / "s")) == ["a", "b"]
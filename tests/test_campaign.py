@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from neuro_lattice.campaign import PerturbationCampaign, edge_metrics
+from neuro_lattice.lattice_builder import LatticeBuilder
+from neuro_lattice.metrics import compute_coherence, compute_strain
+
+
+@pytest.fixture
+def campaign():
+    lattice = LatticeBuilder(lattice_type="cubic").build_lattice()
+    for i, (u, v) in enumerate(lattice.edges()):
+        lattice.edges[u, v]["weight"] = 1.0 + 0.1 * (i % 4)
+    return PerturbationCampaign(lattice)
+
+
+def test_variants_share_base_until_written(campaign):
+    a = campaign.variant()
+    b = campaign.variant()
+    assert a.weight is campaign.snapshot.weight
+    a.noise(0.5, rng=0)
+    assert b.weight is campaign.snapshot.weight
+    assert not np.array_equal(a.weight, b.weight)
+    assert (a.weight >= 0.1).all()
+
+    child = a.fork()
+    child.drop(0.25, rng=1)
+    assert child.weight is a.weight
+    assert a.present.all() and child.present.sum() == campaign.snapshot.num_edges - max(1, int(campaign.snapshot.num_edges * 0.25))
+
+
+def test_journal_undo_and_rollback(campaign):
+    v = campaign.variant()
+    base_metrics = v.metrics()
+    v.noise(0.3, rng=0)
+    mark = v.checkpoint()
+    noisy = v.weight.copy()
+    v.drop(0.5, rng=1)
+    poisoned = v.poison(corruption_rate=0.5, rng=2)
+    assert v.poisoned()[poisoned].all()
+    v.undo()
+    assert not v.poisoned().any()
+    v.rollback(mark)
+    assert v.present.all() and np.array_equal(v.weight, noisy)
+    v.rollback()
+    assert v.metrics() == base_metrics
+
+
+def test_metrics_and_graph_match_networkx(campaign):
+    v = campaign.variant()
+    v.noise(0.2, rng=3)
+    v.drop(0.2, rng=4)
+    v.poison("goal", 1.0, rng=5)
+    graph = v.to_graph()
+    assert graph.number_of_edges() == v.present.sum()
+    assert all(d["goal"] == "CORRUPTED" for _, d in graph.nodes(data=True))
+    metrics = v.metrics()
+    assert metrics["strain"] == pytest.approx(compute_strain(graph))
+    assert metrics["coherence"] == pytest.approx(compute_coherence(graph))
+
+
+def test_batched_trials(campaign):
+    result = campaign.trials(500, noise_level=0.2, drop_fraction=0.1, seed=0)
+    n_edges = campaign.snapshot.num_edges
+    assert result["weight"].shape == (500, n_edges)
+    assert (result["present"].sum(axis=1) == n_edges - max(1, int(n_edges * 0.1))).all()
+    row = edge_metrics(result["weight"][7][result["present"][7]])
+    assert result["strain"][7] == pytest.approx(row["strain"])
+    assert result["coherence"][7] == pytest.approx(row["coherence"])
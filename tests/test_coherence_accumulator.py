@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from neuro_lattice.neuro_lattice.coherence import CoherenceAccumulator
+
+
+def test_matches_brute_force_aggregates():
+    values = np.random.default_rng(0).normal(size=2500)
+    acc = CoherenceAccumulator(window=100, alpha=0.05)
+    ewma = None
+    for i, v in enumerate(values, 1):
+        acc.update(v)
+        ewma = v if ewma is None else ewma + 0.05 * (v - ewma)
+        if i in (1, 99, 100, 101, 2500):
+            assert acc.coherence() == pytest.approx(values[:i].mean() + 1)
+            assert acc.coherence("window") == pytest.approx(values[max(0, i - 100):i].mean() + 1)
+            assert acc.coherence("ewma") == pytest.approx(ewma + 1)
+    assert acc.count == values.size
+
+
+def test_empty_and_invalid():
+    acc = CoherenceAccumulator(window=3)
+    assert acc.coherence() == acc.coherence("window") == acc.coherence("ewma") == 1.0
+    with pytest.raises(ValueError):
+        acc.coherence("median")
+    with pytest.raises(ValueError):
+        CoherenceAccumulator(window=0)
+
+
+def test_simulation_uses_running_coherence():
+    from neuro_lattice.neuro_lattice.simulation import Simulation
+
+    sim = Simulation()
+    sim.packets = [{"id": i, "data": "", "location": 1, "prev": None, "priority": 1.0} for i in range(20)]
+    sim.controller.log_transition(1, 2)
+    for _ in range(5):
+        sim.run_step()
+    log = sim.controller.transition_log
+    assert sim.controller.coherence.count == len(log)
+    assert sim.calculate_coherence() == pytest.approx(float(log.column("contrib").sum()) / len(log) + 1)
+    assert log[0]["prime"] == sim.network.primes[2]
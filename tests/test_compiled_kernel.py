@@ -0,0 +1,54 @@
+import json
+import os
+
+from cli_agent.actions.compiled_kernel import CompiledKernel, get_compiled_kernel
+from cli_agent.actions.evaluate_resonance import evaluate_resonance
+from cli_agent.actions.load_kernel import load_brand_kernel
+from cli_agent.actions.trace_modal import trace_modal_input
+
+KERNEL_PATH = "memory/brand_identity_kernel.json"
+
+
+def test_indexes_match_nested_lookups():
+    kernel = load_brand_kernel(KERNEL_PATH)
+    compiled = CompiledKernel(KERNEL_PATH)
+    resonance_map = kernel["brand_identity_kernel"]["resonance_map"]
+    for modal, domain in kernel["brand_identity_kernel"]["modal_domains"].items():
+        for kind in ("inputs", "outputs"):
+            for event in domain.get(kind, {}):
+                prime = trace_modal_input(modal, event, kernel, kind=kind)
+                assert compiled.prime(modal, event, kind=kind) == prime
+                assert compiled.resonance(prime) == evaluate_resonance(prime, resonance_map)
+                assert (modal, kind, event) in compiled.events_for_prime(prime)
+    assert compiled.prime("visual", "no_such_event") is None
+    assert compiled.resonance(-1) == ["No resonance found"]
+
+
+def test_modals_are_indexed_lazily(tmp_path):
+    domains = {
+        f"m{i}": {"inputs": {f"in{j}": i * 1000 + j for j in range(50)}, "outputs": {}}
+        for i in range(100)
+    }
+    path = tmp_path / "kernel.json"
+    path.write_text(json.dumps({"brand_identity_kernel": {"modal_domains": domains, "resonance_map": {"5042": ["S1-N2"]}}}))
+    compiled = CompiledKernel(path)
+    assert compiled.prime("m5", "in42", kind="inputs") == 5042
+    assert list(compiled._events) == ["m5"]
+    assert compiled.events_for_prime(5042) == [("m5", "inputs", "in42")]
+    assert compiled.resonance(5042) == ["S1-N2"]
+
+
+def test_reloads_only_when_file_changes(tmp_path):
+    path = tmp_path / "kernel.json"
+    body = {"brand_identity_kernel": {"modal_domains": {"visual": {"outputs": {"a": 2}}}, "resonance_map": {}}}
+    path.write_text(json.dumps(body))
+    first = get_compiled_kernel(str(path))
+    assert get_compiled_kernel(str(path)) is first
+    body["brand_identity_kernel"]["modal_domains"]["visual"]["outputs"]["a"] = 3
+    path.write_text(json.dumps(body))
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    second = get_compiled_kernel(str(path))
+    assert second is not first
+    assert second.prime("visual", "a") == 3
+    assert second.digest != first.digest
@@ -0,0 +1,52 @@
+import random
+
+import numpy as np
+import pytest
+
+from neuro_lattice.neuro_lattice.cognitive_network import CognitiveNetwork
+from neuro_lattice.neuro_lattice.perturbation import PerturbationEngine
+from neuro_lattice.neuro_lattice.routing_engine import NO_EDGE, RoutingEngine
+
+
+def _reference(network, prev, new):
+    edge_data = network.G.get_edge_data(prev, new)
+    if not edge_data:
+        return NO_EDGE
+    weight = edge_data.get("weight", 1.0)
+    strain = weight if (prev in [1, 5] and new == "IC") else 0
+    resonance = 1.2 if edge_data["type"] == "tetrahedral" else 0.8
+    p = network.primes.get(new, 2)
+    return strain, resonance, weight, p, strain * resonance * p ** -weight
+
+
+def _assert_matches(router, network):
+    for u, v in list(network.G.edges()) + [(0, 7), ("IC", 1)]:
+        assert router.calculate_coherence(u, v) == pytest.approx(_reference(network, u, v))
+
+
+def test_table_matches_per_edge_formula():
+    network = CognitiveNetwork()
+    network.G.add_edge(1, "IC", weight=0.7, type="tetrahedral")
+    router = RoutingEngine(network)
+    _assert_matches(router, network)
+    i = router.edge_table.index[(1, "IC")]
+    assert router.edge_table.contrib[i] == pytest.approx(0.7 * 1.2 * network.primes["IC"] ** -0.7)
+
+
+def test_table_follows_perturbations():
+    random.seed(3)
+    np.random.seed(3)
+    network = CognitiveNetwork()
+    network.G.add_edge(5, "IC", weight=1.0, type="tetrahedral")
+    router = RoutingEngine(network)
+    router.edge_table
+    engine = PerturbationEngine(network.G)
+    engine.subscribe(router.on_edge_event)
+    engine.random_weight_noise(0.3)
+    engine.inject_perturbation()
+    dropped = engine.random_edge_drop(0.3)
+    _assert_matches(router, network)
+    assert all(router.calculate_coherence(u, v) == NO_EDGE for u, v in dropped)
+    network.G.add_edge(*dropped[0], weight=2.0, type="cubic")
+    router.on_edge_event("add", *dropped[0], 2.0)
+    _assert_matches(router, network)
@@ -0,0 +1,45 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+HEAVY = ("networkx", "scipy", "numpy", "pexpect", "matplotlib", "pandas", "cv2")
+#: Cold ``import neuro_lattice`` budget in milliseconds (override with NEURO_LATTICE_IMPORT_BUDGET_MS).
+BUDGET_MS = float(os.environ.get("NEURO_LATTICE_IMPORT_BUDGET_MS", 100))
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps({{"ms": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def _cold_import(module):
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY)],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(out)
+
+
+def test_import_defers_heavy_dependencies():
+    for module in ("neuro_lattice", "neuro_lattice.neuro_lattice"):
+        assert _cold_import(module)["loaded"] == [], module
+
+
+def test_cold_import_within_budget():
+    # Best of three cold interpreters to ride out scheduler noise.
+    best = min(_cold_import("neuro_lattice")["ms"] for _ in range(3))
+    assert best < BUDGET_MS, f"import neuro_lattice took {best:.1f} ms (budget {BUDGET_MS:.0f} ms)"
+
+
+def test_lazy_attributes_resolve():
+    import neuro_lattice
+
+    assert set(neuro_lattice.__all__) <= set(dir(neuro_lattice))
+    for name in neuro_lattice.__all__:
+        assert getattr(neuro_lattice, name) is not None
@@ -0,0 +1,108 @@
+import asyncio
+import json
+import time
+from collections import Counter
+
+import pytest
+from fastapi.testclient import TestClient
+
+from agents.job_scheduler import JobScheduler
+from agents.mediator_server import SessionReq, app, run_session
+
+
+@pytest.fixture
+def mock_providers(monkeypatch):
+    monkeypatch.setenv("S1_PROVIDER", "mock")
+    monkeypatch.setenv("S2_PROVIDER", "gemini")
+    monkeypatch.setenv("GEMINI_MOCK", "1")
+
+
+def _req(turns=4):
+    return SessionReq(prompt="x", turns=turns, strain_threshold=0.9)
+
+
+def test_provider_caps_and_fair_queueing(mock_providers):
+    active, peak = Counter(), Counter()
+
+    async def call(provider, prompt, kernel):
+        active[provider] += 1
+        peak[provider] = max(peak[provider], active[provider])
+        await asyncio.sleep(0.01)
+        active[provider] -= 1
+        return provider
+
+    async def scenario():
+        scheduler = JobScheduler(call, limits={"mock": 2, "gemini": 1})
+        big = scheduler.submit([_req() for _ in range(12)])
+        small = scheduler.submit([_req() for _ in range(2)])
+        finished = []
+        for job in (big, small):
+            async def watch(job=job):
+                async for _ in job.updates():
+                    pass
+                finished.append(job.id)
+            asyncio.ensure_future(watch())
+        while len(finished) < 2:
+            await asyncio.sleep(0.01)
+        return scheduler, big, small, finished
+
+    scheduler, big, small, finished = asyncio.run(scenario())
+    assert scheduler.max_sessions == 3
+    assert peak == {"mock": 2, "gemini": 1}
+    assert finished == [small.id, big.id]
+    assert big.status().completed == 12 and big.state == "done"
+    assert all(len(r.messages) == 4 for r in big.results)
+
+
+def test_job_api_matches_session_endpoint(mock_providers):
+    expected = run_session(_req()).model_dump()
+    with TestClient(app) as client:
+        job = client.post("/jobs", json={"sessions": [_req().model_dump()] * 5}).json()
+        assert job["total"] == 5
+        for _ in range(200):
+            status = client.get(f"/jobs/{job['id']}").json()
+            if status["state"] == "done":
+                break
+            time.sleep(0.01)
+        results = client.get(f"/jobs/{job['id']}/results").json()
+        frames = [json.loads(line) for line in client.get(f"/jobs/{job['id']}/stream").text.splitlines()]
+        assert client.get("/jobs/missing").status_code == 404
+    assert results["completed"] == 5 and results["failed"] == 0
+    assert [r["index"] for r in results["results"]] == list(range(5))
+    assert all(r["messages"] == expected["messages"] for r in results["results"])
+    assert [f["event"] for f in frames] == ["result"] * 5 + ["done"]
+    assert frames[-1]["state"] == "done"
+
+
+def test_cancel_job(mock_providers):
+    async def slow(provider, prompt, kernel):
+        await asyncio.sleep(10)
+
+    async def scenario():
+        scheduler = JobScheduler(slow, limits={"mock": 1, "gemini": 1})
+        job = scheduler.submit([_req() for _ in range(3)])
+        await asyncio.sleep(0.01)
+        await scheduler.cancel(job.id)
+        await asyncio.sleep(0.01)
+        return scheduler, job
+
+    scheduler, job = asyncio.run(scenario())
+    assert job.state == "cancelled" and not job.tasks and scheduler._running == 0
+
+
+def test_external_task_cancellation_propagates(mock_providers):
+    async def slow(provider, prompt, kernel):
+        await asyncio.sleep(10)
+
+    async def scenario():
+        scheduler = JobScheduler(slow, limits={"mock": 1, "gemini": 1})
+        job = scheduler.submit([_req()])
+        await asyncio.sleep(0.01)
+        task = job.tasks[0]
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return scheduler, job, task
+
+    scheduler, job, task = asyncio.run(scenario())
+    assert task.cancelled()
+    assert not job.tasks and scheduler._running == 0 and job.results == [None]
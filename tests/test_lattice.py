@@ -1,5 +1,6 @@
+import numpy as np
 import pytest
-from neuro_lattice.lattice_builder import LatticeBuilder
+from neuro_lattice.lattice_builder import LatticeBuilder, supercell_arrays
 
 
 def test_lattice_build_and_scaling():
@@ -17,3 +18,32 @@ def test_lattice_build_and_scaling():
     w1 = lattice1.edges[(0, 1)]["weight"]
     w2 = lattice2.edges[(0, 1)]["weight"]
     assert pytest.approx(w2) == w1 * 2
+
+
+@pytest.mark.parametrize("lattice_type", ["tetrahedral", "cubic"])
+def test_unit_supercell_matches_build_lattice(lattice_type):
+    expected = LatticeBuilder(lattice_type=lattice_type, size=2.0).build_lattice()
+    tiled = LatticeBuilder(lattice_type=lattice_type, size=2.0).build_supercell((1, 1, 1))
+
+    assert dict(tiled.nodes(data="pos")) == dict(expected.nodes(data="pos"))
+    assert set(tiled.edges()) == set(expected.edges())
+    for u, v, w in expected.edges(data="weight"):
+        assert tiled.edges[u, v]["weight"] == pytest.approx(w)
+
+
+def test_tetrahedral_supercell_keeps_centroids():
+    G = LatticeBuilder(lattice_type="tetrahedral").build_supercell((2, 3, 1))
+    assert G.number_of_nodes() == 2 * 3 * 8 + 2
+    assert G.nodes["IC"]["pos"] == (1.5, 2.5, 0.5)
+    assert G.nodes["EC"]["pos"] == (2.5, 3.5, 1.5)
+    assert G.has_edge("EC", "IC")
+    assert G.out_degree("EC") == 2 * 3 * 2 + 1
+
+
+def test_periodic_cubic_supercell_is_regular():
+    arrays = supercell_arrays("cubic", (4, 3, 5), size=0.5, periodic=True)
+    assert len(arrays.nodes) == 4 * 3 * 5
+    assert arrays.num_edges == 6 * len(arrays.nodes)
+    assert np.allclose(arrays.weight, 0.5)
+    G = arrays.to_graph()
+    assert {d for _, d in G.out_degree()} == {6}
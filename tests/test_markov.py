@@ -0,0 +1,61 @@
+import math
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from neuro_lattice.lattice_builder import LatticeBuilder
+from neuro_lattice.markov import solve_routing
+from neuro_lattice.replicates import run_replicates
+from neuro_lattice.routing_engine import RoutingEngine
+
+
+def test_path_and_dead_end_chain():
+    g = nx.DiGraph([(0, 1), (1, "EC"), ("A", "EC"), ("A", "B")])
+    sol = solve_routing(g, [{"location": 0, "confidence": 0.0}, {"location": "A", "confidence": 0.0}])
+    assert sol.expected_steps[0] == 2.0 and sol.absorption[0] == 1.0
+    assert math.isinf(sol.expected_steps[1]) and sol.absorption[1] == 0.5
+    visits = sol.visits()
+    assert visits[1] == 1.0 and visits["EC"] == 1.5
+    assert math.isinf(visits["B"])
+
+
+def test_system2_dwell_is_exact():
+    g = nx.DiGraph([(5, "EC")])
+    g.nodes[5]["threshold"] = 0.7
+    sol = solve_routing(g, [{"location": 5, "confidence": 0.5}])
+    # Dwell at 0.50, 0.55, 0.60, 0.65, then move.
+    assert sol.expected_steps[0] == 5.0
+    assert sol.visits() == {5: 4.0, "EC": 1.0}
+
+
+def test_off_grid_start_confidence_keeps_its_offset():
+    g = nx.DiGraph([(5, "EC")])
+    g.nodes[5]["threshold"] = 0.7
+    packets = [{"location": 5, "confidence": c} for c in (0.648, 0.65, 0.998)]
+    sol = solve_routing(g, packets)
+    # 0.648 and 0.698 are both below 0.7; 0.65 reaches 0.70 after one dwell.
+    assert sol.expected_steps.tolist() == [3.0, 2.0, 1.0]
+    assert sol.visits() == {5: 3.0, "EC": 3.0}
+    engine = RoutingEngine(g)
+    packet = dict(packets[0])
+    steps = 0
+    while packet["location"] != "EC":
+        engine.route_packet(packet)
+        steps += 1
+    assert steps == 3
+    with pytest.raises(ValueError):
+        solve_routing(g, [{"location": 5, "confidence": 1.2}])
+
+
+def test_matches_monte_carlo():
+    lattice = LatticeBuilder().build_lattice()
+    for node in lattice.nodes:
+        lattice.nodes[node]["threshold"] = 0.7
+    packets = [{"location": 0, "confidence": 0.5}]
+    exact = RoutingEngine(lattice).solve_exact(packets)
+    mc = run_replicates(lattice, packets, replicates=4000, max_steps=2000, seed=3, workers=1)
+    assert exact.absorption[0] == 1.0
+    assert abs(exact.expected_steps[0] - mc.mean_hitting_time()) < 0.15
+    mc_visits = mc.visit_counts / mc.replicates
+    np.testing.assert_allclose(mc_visits, exact.visit_counts, atol=0.08)
@@ -0,0 +1,66 @@
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from agents import mediator_server
+from agents.mediator_server import SessionReq, app, run_session
+from neuro_lattice import llm_interface
+
+
+@pytest.fixture
+def mock_providers(monkeypatch):
+    monkeypatch.setenv("S1_PROVIDER", "mock")
+    monkeypatch.setenv("S2_PROVIDER", "gemini")
+    monkeypatch.setenv("GEMINI_MOCK", "1")
+
+
+def test_stream_matches_blocking_session(mock_providers):
+    body = {"prompt": "spring hero", "turns": 4, "strain_threshold": 0.9}
+    expected = run_session(SessionReq(**body))
+    with TestClient(app) as client:
+        resp = client.post("/session/stream", json=body)
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    frames = [json.loads(line) for line in resp.text.splitlines()]
+    turns = [f for f in frames if f.pop("event") == "turn"]
+    assert turns == [m.model_dump() for m in expected.messages]
+    assert frames[-1] == {"turns": 4, "stopped_on_strain": False}
+
+
+def test_stream_sse_stops_on_strain(mock_providers):
+    with TestClient(app) as client:
+        resp = client.post("/session/stream?format=sse", json={"prompt": "x", "turns": 6, "strain_threshold": 0.1})
+    assert resp.headers["content-type"].startswith("text/event-stream")
+    events = [block.split("\n") for block in resp.text.strip().split("\n\n")]
+    assert [e[0] for e in events] == ["event: turn", "event: turn", "event: done"]
+    assert json.loads(events[-1][1][len("data: "):]) == {"turns": 2, "stopped_on_strain": True}
+
+
+def test_first_turn_streams_before_session_finishes(mock_providers):
+    async def slow_call(provider, prompt, kernel):
+        await asyncio.sleep(0.2)
+        return provider
+
+    async def first_frame():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        frames = mediator_server._session_frames(SessionReq(prompt="x", turns=5, strain_threshold=0.9), "ndjson", slow_call)
+        first = await frames.__anext__()
+        elapsed = loop.time() - start
+        await frames.aclose()
+        return json.loads(first), elapsed
+
+    first, elapsed = asyncio.run(first_frame())
+    assert first["turn"] == 1 and first["text"] == "mock"
+    assert elapsed < 0.5
+
+
+def test_arun_codex_uses_direct_cli(tmp_path, monkeypatch):
+    stub = tmp_path / "stubcli"
+    stub.write_text("#!/bin/sh\necho \"async:$1\"\n")
+    stub.chmod(0o755)
+    monkeypatch.setenv("CODEX_CMD", str(stub))
+    assert asyncio.run(llm_interface.arun_codex("hello world")) == "async:hello world"
+    monkeypatch.setenv("CODEX_CMD", str(tmp_path / "missing"))
+    assert asyncio.run(llm_interface.arun_codex("x")).startswith("[CODEX_ERROR]")
@@ -1,11 +1,18 @@
 import math
+import random
 import numpy as np
 import networkx as nx
+import pytest
+from neuro_lattice.lattice_builder import LatticeBuilder
 from neuro_lattice.metrics import (
+    MetricsTracker,
     calculate_strain,
     calculate_coherence,
+    compute_coherence,
+    compute_strain,
     spectral_symmetry,
 )
+from neuro_lattice.perturbations import PerturbationInjector
 
 
 def build_lattice():
@@ -49,4 +56,68 @@ def test_spectral_symmetry_non_degenerate():
     eigvals, symmetry = spectral_symmetry(g)
     expected = np.sort(np.linalg.eigvalsh(nx.laplacian_matrix(g).toarray()))[: len(eigvals)]
     assert np.allclose(eigvals, expected)
-    assert not symmetry
\ No newline at end of file
+    assert not symmetry
+
+
+def _assert_tracker_matches(tracker, g):
+    assert tracker.strain() == pytest.approx(compute_strain(g), rel=1e-9, abs=1e-12)
+    assert tracker.coherence() == pytest.approx(compute_coherence(g), rel=1e-9)
+
+
+def test_metrics_tracker_matches_full_scan_under_mutation():
+    rng = random.Random(3)
+    g = LatticeBuilder(lattice_type="tetrahedral").build_supercell((2, 2, 1))
+    tracker = MetricsTracker(g)
+    _assert_tracker_matches(tracker, g)
+
+    for step in range(300):
+        edges = list(g.edges())
+        u, v = rng.choice(edges)
+        op = step % 3
+        if op == 0:
+            w = rng.uniform(0.1, 3.0)
+            g.edges[u, v]["weight"] = w
+            tracker("reweight", u, v, w)
+        elif op == 1:
+            g.remove_edge(u, v)
+            tracker("remove", u, v)
+        else:
+            a, b = rng.sample(list(g.nodes()), 2)
+            w = rng.choice([1.0, 2.0, rng.uniform(0.1, 3.0)])
+            g.add_edge(a, b, weight=w)
+            tracker("add", a, b, w)
+        _assert_tracker_matches(tracker, g)
+    assert len(tracker) == g.number_of_edges()
+
+    # Drift far from the shift fixed at reset: every weight moves to 1e4 ± 0.01.
+    for u, v in list(g.edges()):
+        w = 1e4 + rng.uniform(-0.01, 0.01)
+        g.edges[u, v]["weight"] = w
+        tracker("reweight", u, v, w)
+    _assert_tracker_matches(tracker, g)
+
+
+def test_metrics_tracker_leaves_global_rng_alone():
+    g = LatticeBuilder(lattice_type="tetrahedral").build_supercell((2, 2, 1))
+    random.seed(11)
+    expected = random.random()
+    random.seed(11)
+    tracker = MetricsTracker(g)
+    tracker("add", 0, "EC", 2.0)
+    assert random.random() == expected
+
+
+def test_metrics_tracker_follows_perturbation_events():
+    g = build_lattice()
+    tracker = MetricsTracker(g)
+    injector = PerturbationInjector()
+    injector.subscribe(tracker)
+    injector.inject_perturbation(g, perturbation_type="adversarial")
+    _assert_tracker_matches(tracker, g)
+
+
+def test_metrics_tracker_uniform_weights():
+    g = LatticeBuilder(lattice_type="cubic").build_lattice()
+    tracker = MetricsTracker(g)
+    assert tracker.strain() == compute_strain(g) == 0.0
+    assert tracker.coherence() == compute_coherence(g)
@@ -0,0 +1,100 @@
+import asyncio
+import os
+import signal
+import sys
+
+import pytest
+
+from neuro_lattice import llm_interface
+from neuro_lattice.provider_pool import ProviderPool, get_pool, shutdown_pools
+
+
+@pytest.fixture
+def stub_cli(tmp_path):
+    path = tmp_path / "stubcli"
+    path.write_text(
+        f"#!{sys.executable}\n"
+        "import sys, time\n"
+        "prompt = sys.argv[-1] if len(sys.argv) > 1 else sys.stdin.read()\n"
+        "if prompt == 'fail':\n"
+        "    sys.stderr.write('stub failure')\n"
+        "    sys.exit(3)\n"
+        "if prompt == 'slow':\n"
+        "    time.sleep(30)\n"
+        "print('stub:' + prompt)\n"
+    )
+    path.chmod(0o755)
+    return str(path)
+
+
+@pytest.fixture
+def pool(stub_cli):
+    pool = ProviderPool("codex", size=2, max_requests=3, env={"CODEX_CMD": stub_cli})
+    yield pool
+    pool.close()
+
+
+def test_pool_runs_prompts_on_warm_workers(pool):
+    pids = pool.pids
+    assert pool.run("hello") == (0, "stub:hello", "")
+    assert pool.run("multi\nline") == (0, "stub:multi\nline", "")
+    assert pool.pids == pids
+    rc, _, err = pool.run("fail")
+    assert rc == 3 and err == "stub failure"
+
+
+def test_pool_recycles_after_max_requests(pool):
+    before = set(pool.pids)
+    for i in range(6):
+        assert pool.run(f"p{i}")[1] == f"stub:p{i}"
+    assert pool.stats["recycled"] == 2
+    assert not before & set(pool.pids)
+    assert len(pool.pids) == 2
+
+
+def test_pool_replaces_crashed_worker(pool):
+    for pid in pool.pids:
+        os.kill(pid, signal.SIGKILL)
+    assert pool.run("again") == (0, "stub:again", "")
+    assert pool.stats["crashed"] == 1
+    assert pool.health_check() == 1
+    assert pool.stats["crashed"] == 2
+
+
+def test_pool_provider_timeout_keeps_worker(pool):
+    rc, _, err = pool.run("slow", timeout=0.5)
+    assert rc == 124 and "Timeout" in err
+    assert pool.stats["spawned"] == 2
+    assert pool.run("ok") == (0, "stub:ok", "")
+
+
+def test_run_codex_and_gemini_use_pool(stub_cli, monkeypatch):
+    monkeypatch.setenv("PROVIDER_POOL", "1")
+    monkeypatch.setenv("PROVIDER_POOL_SIZE", "1")
+    monkeypatch.setenv("CODEX_CMD", stub_cli)
+    monkeypatch.setenv("GEMINI_CMD", stub_cli)
+    try:
+        assert llm_interface.run_codex("hi") == "stub:hi"
+        assert llm_interface.run_gemini("there") == "stub:there"
+        assert llm_interface.run_codex("fail") == "[CODEX_ERROR] stub failure"
+        assert get_pool("codex").stats["requests"] == 2
+    finally:
+        shutdown_pools()
+
+
+def test_pool_tty_issue_falls_back_to_pty_strategies(tmp_path, monkeypatch):
+    stub = tmp_path / "ttycli"
+    stub.write_text(f"#!{sys.executable}\nimport sys\nsys.exit('Error: cursor position could not be read')\n")
+    stub.chmod(0o755)
+    monkeypatch.setenv("PROVIDER_POOL", "1")
+    monkeypatch.setenv("PROVIDER_POOL_SIZE", "1")
+    monkeypatch.setenv("CODEX_CMD", str(stub))
+    monkeypatch.delenv("FORCE_SUBPROCESS", raising=False)
+    calls = []
+    monkeypatch.setattr(llm_interface, "_run_codex_pexpect", lambda prompt: calls.append(prompt) or (0, "via pty", ""))
+    try:
+        assert llm_interface.run_codex("hi") == "via pty"
+        assert asyncio.run(llm_interface.arun_codex("again")) == "via pty"
+        assert calls == ["hi", "again"]
+    finally:
+        shutdown_pools()
@@ -0,0 +1,89 @@
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+from neuro_lattice.provider_stream import ProviderStream, TerminalFilter, astream_brand_context, stream_brand_context
+from neuro_lattice.response_cache import ResponseCache
+
+
+@pytest.fixture
+def stub_cli(tmp_path):
+    path = tmp_path / "stubcli"
+    path.write_text(
+        f"#!{sys.executable}\n"
+        "import sys, time\n"
+        "out = sys.stdout.buffer\n"
+        "prompt = sys.argv[-1]\n"
+        "if prompt == 'fail':\n"
+        "    sys.stderr.write('stub failure')\n"
+        "    sys.exit(3)\n"
+        "out.write(b'\\x1b[6nUpdate available: 9.9 -> run npm i\\nfirst\\n'); out.flush()\n"
+        "time.sleep(0.5)\n"
+        "caf = 'caf\\u00e9 \\u2713'.encode()\n"
+        "out.write(caf[:4]); out.flush()\n"  # split inside the two-byte 'é'
+        "time.sleep(0.05)\n"
+        "out.write(caf[4:] + b'\\x1b['); out.flush()\n"  # and inside a DSR query
+        "time.sleep(0.05)\n"
+        "out.write(b'6n done'); out.flush()\n"
+    )
+    path.chmod(0o755)
+    return str(path)
+
+
+def test_terminal_filter_across_chunk_boundaries():
+    f = TerminalFilter()
+    text = "".join(f.feed(c) for c in ["\x1b", "[6", "nUpdate avail", "able now\nok ", "x\x1b[6n", "y\nlast"])
+    assert text + f.flush() == "ok xy\nlast"
+    assert f.queries == 2
+
+
+def test_terminal_filter_drops_long_notice_split_across_chunks():
+    f = TerminalFilter()
+    notice = "Update available: " + "x" * 52 + "upgrade now please\n"
+    assert f.feed(notice[:70]) == ""
+    assert f.feed(notice[70:] + "hello\n") + f.flush() == "hello\n"
+    f.feed("Update available: " + "y" * 70)
+    assert f.flush() == ""
+    assert f.feed("next\n") == "next\n"
+
+
+def test_stream_decodes_and_filters_incrementally(stub_cli, monkeypatch):
+    monkeypatch.setenv("CODEX_CMD", stub_cli)
+    stream = ProviderStream("codex", "hello")
+    start = time.monotonic()
+    arrivals = [(piece, time.monotonic() - start) for piece in stream]
+    text = "".join(piece for piece, _ in arrivals)
+    assert text == "first\ncafé ✓ done"
+    assert "\ufffd" not in text
+    # The first line is shown before the provider finishes.
+    assert arrivals[0][0] == "first\n" and arrivals[0][1] < stream.stats.elapsed - 0.3
+    assert stream.returncode == 0
+    assert 0 < stream.stats.first_byte <= stream.stats.first_text < 0.5
+    assert stream.stats.chunks == len(arrivals) > 1
+
+
+def test_stream_brand_context_caches_and_reports_errors(stub_cli, monkeypatch):
+    monkeypatch.setenv("CODEX_CMD", stub_cli)
+    cache = ResponseCache(path=None)
+    stats = []
+    first = "".join(stream_brand_context("codex", "hello", {"k": 1}, cache=cache, stats=stats))
+    assert first.endswith("café ✓ done") and stats[0].first_byte is not None
+    # A cache hit replays the full response at once without running the CLI.
+    os.chmod(stub_cli, 0o644)
+    assert list(stream_brand_context("codex", "hello", {"k": 1}, cache=cache)) == [first]
+    assert "".join(stream_brand_context("codex", "other", {}, cache=cache)).startswith("[CODEX_ERROR]")
+
+
+def test_stream_timeout_and_async_adapter(stub_cli, monkeypatch):
+    monkeypatch.setenv("CODEX_CMD", stub_cli)
+    stream = ProviderStream("codex", "hello", timeout=0.3)
+    assert "".join(stream) == "first\n"
+    assert stream.stats.timed_out and stream.returncode == 124
+
+    async def collect():
+        return [piece async for piece in astream_brand_context("mock", "hi", {})]
+
+    assert asyncio.run(collect()) == ["[MOCK/MOCK] hi…"]
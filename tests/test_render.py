@@ -0,0 +1,57 @@
+import shutil
+
+import numpy as np
+import pytest
+
+from neuro_lattice.lattice_builder import LatticeBuilder
+from neuro_lattice.render import LatticeLayout, aggregate, flow_frames, render_flow, render_lattice
+from neuro_lattice.routing_engine import RoutingEngine
+from neuro_lattice.visualizer import plot_lattice
+
+
+def _routed(cells=(1, 1, 1)):
+    lattice = LatticeBuilder().build_supercell(cells)
+    router = RoutingEngine(lattice)
+    router.run_batched([{"location": 0, "confidence": 0.5} for _ in range(50)], max_steps=20, rng=0)
+    return lattice, router.transition_log
+
+
+def test_render_lattice_headless(tmp_path):
+    lattice = LatticeBuilder().build_lattice()
+    png = render_lattice(lattice, tmp_path / "lattice.png")
+    svg = plot_lattice(lattice, path=tmp_path / "lattice.svg")
+    assert png.read_bytes().startswith(b"\x89PNG")
+    assert b"<svg" in svg.read_bytes()
+
+
+def test_aggregate_decimates_large_lattices():
+    layout = LatticeLayout.from_graph(LatticeBuilder(lattice_type="cubic").build_supercell((6, 6, 6)))
+    small = aggregate(layout, max_nodes=100)
+    assert small.num_nodes <= 100
+    assert small.members.sum() == layout.num_nodes
+    assert set(small.group) == set(layout.nodes)
+    assert np.all(small.src != small.dst)
+    assert aggregate(layout, max_nodes=layout.num_nodes) is layout
+
+
+def test_flow_frames_cover_the_log():
+    lattice, log = _routed()
+    layout = LatticeLayout.from_graph(lattice)
+    frames = flow_frames(log, layout, frames=7)
+    assert len(frames) == 7
+    assert sum(int(arrivals.sum()) for _, arrivals in frames) == len(log)
+
+
+def test_render_flow_parallel_matches_serial(tmp_path):
+    lattice, log = _routed((2, 1, 1))
+    serial = render_flow(log, lattice, tmp_path / "serial", frames=4, workers=1, max_nodes=10)
+    parallel = render_flow(log, lattice, tmp_path / "parallel", frames=4, workers=2, max_nodes=10)
+    assert [p.name for p in serial] == [p.name for p in parallel] == [f"frame-{i:05d}.png" for i in range(4)]
+    assert all(p.stat().st_size for p in parallel)
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not installed")
+def test_render_flow_mp4(tmp_path):
+    lattice, log = _routed()
+    video = render_flow(log, lattice, tmp_path / "flow.mp4", frames=3, workers=1)
+    assert video.stat().st_size > 0
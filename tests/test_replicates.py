@@ -0,0 +1,35 @@
+import numpy as np
+
+from neuro_lattice.lattice_builder import LatticeBuilder
+from neuro_lattice.replicates import run_replicates
+
+
+def _lattice():
+    lattice = LatticeBuilder().build_lattice()
+    for node in lattice.nodes:
+        lattice.nodes[node]["threshold"] = 0.7
+    return lattice
+
+
+PACKETS = [{"location": 0, "confidence": 0.5}, {"location": 5, "confidence": 0.3}, {"location": "EC", "confidence": 0.9}]
+
+
+def test_reproducible_across_worker_counts():
+    serial = run_replicates(_lattice(), PACKETS, replicates=40, max_steps=30, seed=7, workers=1)
+    parallel = run_replicates(_lattice(), PACKETS, replicates=40, max_steps=30, seed=7, workers=3, chunk_size=6)
+    np.testing.assert_array_equal(serial.hitting_times, parallel.hitting_times)
+    np.testing.assert_array_equal(serial.visit_counts, parallel.visit_counts)
+    np.testing.assert_array_equal(serial.confidence, parallel.confidence)
+
+
+def test_summary_shapes_and_totals():
+    summary = run_replicates(_lattice(), PACKETS, replicates=25, max_steps=50, seed=1, workers=1)
+    assert summary.replicates == 25
+    assert summary.hitting_times.sum() == 25 * len(PACKETS)
+    assert summary.hitting_times[0] == 25  # the packet already at EC
+    assert summary.confidence.shape == (25, 51)
+    assert np.isclose(summary.confidence[:, 0], (0.5 + 0.3 + 0.9) / 3).all()
+    assert (np.diff(summary.mean_confidence()) >= 0).all()
+    # Every transition arrives somewhere; absorbed packets arrive at EC once.
+    assert summary.visits()["EC"] == summary.hitting_times[1:-1].sum()
+    assert 0 < summary.mean_hitting_time() <= 50
@@ -0,0 +1,101 @@
+import multiprocessing
+
+from neuro_lattice import llm_interface
+from neuro_lattice.response_cache import ResponseCache, cache_key, kernel_hash
+
+KERNEL = {"brand_identity_kernel": {"b": [1, 2], "a": "x"}}
+
+
+def test_key_depends_on_provider_prompt_and_kernel():
+    same_kernel = {"brand_identity_kernel": {"a": "x", "b": [1, 2]}}
+    assert kernel_hash(KERNEL) == kernel_hash(same_kernel)
+    key = cache_key("codex", "p", KERNEL)
+    assert key == cache_key("CODEX", "p", same_kernel)
+    assert key != cache_key("gemini", "p", KERNEL)
+    assert key != cache_key("codex", "q", KERNEL)
+    assert key != cache_key("codex", "p", {"brand_identity_kernel": {}})
+
+
+def test_memory_lru_and_counters():
+    cache = ResponseCache(memory_entries=2)
+    for k in "abc":
+        cache.put(k, k.upper())
+    assert cache.get("a") is None
+    assert cache.get("c") == "C"
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["memory_hits"]) == (1, 1, 1)
+    assert stats["hit_rate"] == 0.5
+
+
+def test_disk_tier_shared_and_evicted(tmp_path):
+    path = tmp_path / "cache.sqlite"
+    first = ResponseCache(path, max_entries=3)
+    for i in range(5):
+        first.put(f"k{i}", f"v{i}")
+    assert len(first) == 3
+    assert first.stats()["evictions"] == 2
+    second = ResponseCache(path)
+    assert second.get("k4") == "v4"
+    assert second.get("k0") is None
+    assert second.stats()["disk_hits"] == 1
+
+
+def test_ttl_expiry(tmp_path, monkeypatch):
+    cache = ResponseCache(tmp_path / "cache.sqlite", ttl=10)
+    now = [1000.0]
+    monkeypatch.setattr("neuro_lattice.response_cache.time.time", lambda: now[0])
+    cache.put("k", "v")
+    now[0] += 5
+    assert cache.get("k") == "v"
+    now[0] += 10
+    assert cache.get("k") is None
+    assert len(cache) == 0
+
+
+def _put_many(path, start):
+    cache = ResponseCache(path)
+    for i in range(start, start + 50):
+        cache.put(f"k{i}", f"v{i}")
+
+
+def test_concurrent_processes(tmp_path):
+    path = tmp_path / "cache.sqlite"
+    ResponseCache(path)
+    procs = [multiprocessing.Process(target=_put_many, args=(path, s)) for s in (0, 50, 100)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+        assert p.exitcode == 0
+    assert len(ResponseCache(path)) == 150
+
+
+def test_with_brand_context_uses_cache(monkeypatch):
+    calls = []
+
+    def fake_gemini(context):
+        calls.append(context)
+        return "[GEMINI_ERROR] down" if "flaky" in context else f"answer {len(calls)}"
+
+    monkeypatch.setattr(llm_interface, "run_gemini", fake_gemini)
+    cache = ResponseCache()
+    assert llm_interface.with_brand_context("gemini", "brief", KERNEL, cache=cache) == "answer 1"
+    assert llm_interface.with_brand_context("gemini", "brief", KERNEL, cache=cache) == "answer 1"
+    llm_interface.with_brand_context("gemini", "flaky", KERNEL, cache=cache)
+    llm_interface.with_brand_context("gemini", "flaky", KERNEL, cache=cache)
+    assert len(calls) == 3
+    assert cache.stats()["hits"] == 1
+
+
+def test_mock_replies_are_not_cached_and_backend_is_keyed(monkeypatch):
+    monkeypatch.setenv("GEMINI_MOCK", "1")
+    cache = ResponseCache()
+    reply = llm_interface.with_brand_context("gemini", "brief", KERNEL, cache=cache)
+    assert reply.startswith("[S2/GEMINI MOCK]")
+    assert len(cache) == 0
+    mocked = cache_key("gemini", "brief", KERNEL)
+    monkeypatch.setenv("GEMINI_MOCK", "0")
+    live = cache_key("gemini", "brief", KERNEL)
+    assert live != mocked and live == cache_key("google", "brief", KERNEL)
+    monkeypatch.setenv("GEMINI_CMD", "/opt/other-gemini")
+    assert cache_key("gemini", "brief", KERNEL) != live
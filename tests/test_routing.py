@@ -1,3 +1,4 @@
+import pytest
 from neuro_lattice.lattice_builder import LatticeBuilder
 from neuro_lattice.routing_engine import RoutingEngine
 
@@ -8,3 +9,100 @@ def test_system_routing_moves_packet():
     packet = {"location": 0, "confidence": 0.5}
     updated = engine.route_packet(packet)
     assert updated["location"] != 0
+
+
+def _thresholded_lattice():
+    lattice = LatticeBuilder().build_lattice()
+    for node in lattice.nodes:
+        lattice.nodes[node]["threshold"] = 0.7
+    return lattice
+
+
+def test_compiled_lattice_matches_successors():
+    lattice = LatticeBuilder().build_lattice()
+    compiled = RoutingEngine(lattice).compile()
+    for node in lattice.nodes:
+        i = compiled.index[node]
+        succ = {compiled.nodes[j] for j in compiled.indices[compiled.indptr[i]:compiled.indptr[i + 1]]}
+        assert succ == set(lattice.successors(node))
+    assert compiled.nodes[compiled.ec] == "EC"
+
+
+def test_batched_system2_gating():
+    engine = RoutingEngine(_thresholded_lattice())
+    packets = [{"location": 5, "confidence": 0.5}]
+    engine.run_batched(packets, max_steps=1, rng=0)
+    assert packets[0]["location"] == 5
+    assert packets[0]["confidence"] == 0.55
+    assert engine.transition_log[0]["agent"] == "AgentB"
+
+
+def test_batched_run_routes_all_packets():
+    engine = RoutingEngine(_thresholded_lattice())
+    packets = [{"location": 0, "confidence": 0.0} for _ in range(500)]
+    engine.run_batched(packets, max_steps=200, rng=1)
+    assert all(p["location"] == "EC" for p in packets)
+    assert sum(engine.visit_counts.values()) == len(engine.transition_log)
+    assert engine.visit_counts["EC"] == len(packets)
+
+
+def test_event_driven_matches_step_run():
+    import copy
+    import random
+
+    lattice = _thresholded_lattice()
+    lattice.nodes[6]["threshold"] = 1.5  # never released once entered
+    lattice.add_edge(3, "sink")  # dead end holding packets forever
+    rng = random.Random(1)
+    packets = [{"location": rng.choice([0, 1, 4, 5, "IC", "EC"]), "confidence": rng.random()} for _ in range(200)]
+    results = []
+    for mode in ("step", "event"):
+        random.seed(5)
+        engine = RoutingEngine(lattice)
+        routed = engine.run(copy.deepcopy(packets), max_steps=60, mode=mode)
+        results.append((routed, dict(engine.visit_counts), list(engine.transition_log)))
+    assert results[0] == results[1]
+
+
+def test_event_driven_fast_forwards_dwell():
+    lattice = _thresholded_lattice()
+    engine = RoutingEngine(lattice)
+    packets = [{"location": 5, "confidence": 0.5}]
+    engine.run_event_driven(packets, max_steps=3)
+    assert packets[0]["location"] == 5
+    assert packets[0]["confidence"] == pytest.approx(0.65)
+    assert engine.visit_counts[5] == 3
+    assert [row["to"] for row in engine.transition_log] == [5, 5, 5]
+
+
+def test_dwell_confidences_match_repeated_gain():
+    import random
+
+    from neuro_lattice.routing_engine import dwell_confidences
+
+    rng = random.Random(3)
+    for _ in range(2000):
+        c, threshold, limit = rng.random(), rng.choice([rng.random(), 0.7, 1.0, 1.5]), rng.randrange(0, 40)
+        if c >= threshold:
+            continue
+        values = [c]
+        while len(values) <= limit and values[-1] < threshold:
+            values.append(min(1.0, values[-1] + 0.05))
+        assert dwell_confidences(c, threshold, limit) == (len(values) - 1, values)
+
+
+def test_event_driven_logs_rows_as_steps_settle():
+    import random
+
+    lattice = _thresholded_lattice()
+    lattice.add_edge(3, "sink")  # dead end: held packets log a row every step
+    engine = RoutingEngine(lattice)
+    buffered = []
+    flush = engine._flush_rows
+    engine._flush_rows = lambda pending, *args: (buffered.append(len(pending)), flush(pending, *args))
+    random.seed(2)
+    packets = [{"location": 0, "confidence": 0.0} for _ in range(50)]
+    engine.run_event_driven(packets, max_steps=2000)
+    assert len(engine.transition_log) == sum(engine.visit_counts.values()) > 10000
+    # Only rows of unsettled steps are buffered: dwell rows, never whole holds.
+    assert max(buffered) <= 50 * 21
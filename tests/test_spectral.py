@@ -0,0 +1,78 @@
+import networkx as nx
+import numpy as np
+import pytest
+
+from neuro_lattice.lattice_builder import LatticeBuilder
+from neuro_lattice.metrics import spectral_symmetry
+from neuro_lattice.perturbations import PerturbationInjector
+from neuro_lattice.spectral import SpectralEngine
+
+
+def _dense_eigs(g, k=10):
+    return np.sort(np.linalg.eigvalsh(nx.laplacian_matrix(g).toarray()))[:k]
+
+
+def _grid():
+    g = nx.convert_node_labels_to_integers(nx.grid_2d_graph(14, 11))
+    for i, (u, v) in enumerate(g.edges()):
+        g.edges[u, v]["weight"] = 1.0 + 0.01 * (i % 7)
+    return g
+
+
+@pytest.mark.parametrize("method", ["lobpcg", "shift-invert"])
+def test_engine_matches_dense_spectrum(method):
+    g = _grid()
+    engine = SpectralEngine(g, method=method)
+    assert np.allclose(engine.eigenvalues(), _dense_eigs(g), atol=1e-7)
+    assert engine.last_solve["method"] == method
+    assert not engine.last_solve["warm"]
+
+
+@pytest.mark.parametrize("method", ["lobpcg", "shift-invert"])
+def test_engine_warm_starts_after_small_perturbation(method):
+    g = _grid()
+    engine = SpectralEngine(g, method=method)
+    engine.eigenvalues()
+
+    u, v = next(iter(g.edges()))
+    g.edges[u, v]["weight"] = 1.1
+    engine.set_edge_weight(u, v, 1.1)
+    assert abs(engine.laplacian - nx.laplacian_matrix(g, nodelist=engine.nodes)).max() < 1e-12
+    assert np.allclose(engine.eigenvalues(), _dense_eigs(g), atol=1e-7)
+    assert engine.last_solve["warm"]
+
+    engine.eigenvalues()
+    assert engine.last_solve["cached"]
+
+
+def test_engine_follows_perturbation_events():
+    g = LatticeBuilder(lattice_type="cubic").build_lattice().to_undirected()
+    engine = SpectralEngine(g)
+    injector = PerturbationInjector()
+    injector.subscribe(engine)
+    injector.inject_perturbation(g, perturbation_type="adversarial")
+    assert np.allclose(engine.eigenvalues(), _dense_eigs(g, engine.num_eigs))
+
+
+def test_engine_symmetry_agrees_with_spectral_symmetry():
+    g = LatticeBuilder(lattice_type="cubic", size=1.0).build_lattice().to_undirected()
+    eigvals, symmetry = SpectralEngine(g).symmetry()
+    expected, expected_symmetry = spectral_symmetry(g)
+    assert symmetry == expected_symmetry
+    assert np.allclose(eigvals, expected)
+
+
+def test_engine_patches_reciprocal_directed_edges_like_rebuild():
+    graph = nx.DiGraph()
+    graph.add_weighted_edges_from([(0, 1, 2.0), (1, 0, 5.0), (1, 2, 3.0), (2, 3, 1.0), (3, 2, 4.0)])
+    engine = SpectralEngine(graph, k=2)
+    for event, u, v, weight in [("remove", 0, 1, None), ("reweight", 1, 0, 7.0), ("reweight", 3, 2, 0.5),
+                                ("add", 2, 0, 1.5), ("remove", 2, 3, None)]:
+        if event == "remove":
+            graph.remove_edge(u, v)
+        else:
+            graph.add_edge(u, v, weight=weight)
+        engine(event, u, v, weight)
+        expected = SpectralEngine(graph, k=2).laplacian.toarray()
+        np.testing.assert_allclose(engine.laplacian.toarray(), expected)
+        np.testing.assert_allclose(engine.eigenpairs()[0], SpectralEngine(graph, k=2).eigenpairs()[0], atol=1e-8)
@@ -0,0 +1,85 @@
+import json
+import sys
+
+import networkx as nx
+import pytest
+from fastapi.testclient import TestClient
+
+from agents.mediator_server import app
+from neuro_lattice import llm_interface, tracing
+from neuro_lattice.metrics import spectral_symmetry
+
+
+@pytest.fixture
+def spans():
+    exporter = tracing.add_exporter(tracing.InMemoryExporter())
+    yield exporter.spans
+    tracing.remove_exporter(exporter)
+
+
+def test_spans_nest_and_record_errors(spans, tmp_path):
+    file_exporter = tracing.add_exporter(tracing.FileExporter(tmp_path / "trace.jsonl"))
+    try:
+        with tracing.span("outer", job="j1") as outer:
+            with pytest.raises(ValueError):
+                with tracing.span("inner"):
+                    raise ValueError("boom")
+            assert tracing.current_span() is outer
+    finally:
+        tracing.remove_exporter(file_exporter)
+    inner, outer = spans
+    assert inner.parent_id == outer.span_id and inner.trace_id == outer.trace_id
+    assert outer.parent_id is None and outer.attributes == {"job": "j1"}
+    assert inner.error == "ValueError: boom" and inner.duration <= outer.duration
+    lines = [json.loads(line) for line in (tmp_path / "trace.jsonl").read_text().splitlines()]
+    assert [line["name"] for line in lines] == ["inner", "outer"]
+    assert tracing.current_span() is None
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = tracing.Registry()
+    hist = tracing.Histogram("t_seconds", "Test.", ("provider",), buckets=(0.1, 1.0), registry=registry)
+    for value in (0.05, 0.5, 5.0):
+        hist.labels('co"dex').observe(value)
+    tracing.Gauge("t_depth", "Depth.", registry=registry).labels().set(3)
+    text = registry.render()
+    assert 't_seconds_bucket{provider="co\\"dex",le="0.1"} 1' in text
+    assert 't_seconds_bucket{provider="co\\"dex",le="1.0"} 2' in text
+    assert 't_seconds_bucket{provider="co\\"dex",le="+Inf"} 3' in text
+    assert 't_seconds_count{provider="co\\"dex"} 3' in text
+    assert "# TYPE t_depth gauge\nt_depth 3.0" in text
+
+
+def test_provider_attempts_are_traced_per_strategy(spans, tmp_path, monkeypatch):
+    stub = tmp_path / "gemini"
+    stub.write_text(f"#!{sys.executable}\nimport sys\nsys.exit(2) if len(sys.argv) > 1 else print('via stdin')\n")
+    stub.chmod(0o755)
+    monkeypatch.setenv("GEMINI_CMD", str(stub))
+    monkeypatch.delenv("GEMINI_MOCK", raising=False)
+    monkeypatch.delenv("PROVIDER_POOL", raising=False)
+    errors = tracing.PROVIDER_ERRORS.labels("gemini", "args")
+    before = errors.value
+    assert llm_interface.run_gemini("hi") == "via stdin"
+    args, stdin, call = spans
+    assert call.name == "provider.run_gemini"
+    assert [(s.attributes["strategy"], s.attributes["returncode"]) for s in (args, stdin)] == [("args", 2), ("stdin", 0)]
+    assert args.parent_id == call.span_id
+    assert errors.value == before + 1
+
+    spectral_symmetry(nx.cycle_graph(6))
+    assert spans[-1].name == "spectral_symmetry"
+
+
+def test_metrics_endpoint_counts_turns(spans, monkeypatch):
+    monkeypatch.setenv("S1_PROVIDER", "mock")
+    monkeypatch.setenv("S2_PROVIDER", "mock")
+    turns = tracing.TURNS.labels("S2")
+    before = turns.value
+    with TestClient(app) as client:
+        client.post("/session", json={"prompt": "x", "turns": 3, "strain_threshold": 0.9})
+        resp = client.get("/metrics")
+    assert resp.headers["content-type"].startswith("text/plain")
+    assert turns.value == before + 1
+    assert f'neuro_lattice_turns_total{{speaker="S2"}} {turns.value}' in resp.text
+    assert "# TYPE neuro_lattice_provider_seconds histogram" in resp.text
+    assert [s.attributes["speaker"] for s in spans if s.name == "mediator.turn"] == ["S1", "S2", "S1"]
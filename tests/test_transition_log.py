@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from neuro_lattice.lattice_builder import LatticeBuilder
+from neuro_lattice.routing_engine import TRANSITION_COLUMNS, RoutingEngine
+from neuro_lattice.transition_log import TransitionLog
+
+
+def _row(i):
+    return {
+        "agent": "AgentA" if i % 2 else "AgentB",
+        "from": i,
+        "to": "EC" if i % 3 == 0 else i + 1,
+        "confidence_before": i / 10,
+        "confidence_after": i / 10 + 0.02,
+    }
+
+
+def test_rows_round_trip_as_dicts():
+    log = TransitionLog(TRANSITION_COLUMNS, capacity=8)
+    for i in range(5):
+        log.append(_row(i))
+    assert len(log) == 5
+    assert list(log) == [_row(i) for i in range(5)]
+    assert log[-1] == _row(4)
+    assert log[1:3] == [_row(1), _row(2)]
+    assert log.vocabulary("agent") == ["AgentB", "AgentA"]
+
+
+def test_ring_buffer_drops_oldest_rows():
+    log = TransitionLog(TRANSITION_COLUMNS, capacity=4)
+    with pytest.warns(RuntimeWarning, match="no spill_dir") as caught:
+        for i in range(10):
+            log.append(_row(i))
+    assert len(caught) == 1  # warned on the first drop only
+    assert len(log) == 4
+    assert log.dropped == 6
+    assert log.total == 10
+    assert [r["from"] for r in log] == [6, 7, 8, 9]
+    assert np.allclose(log.column("confidence_before"), [0.6, 0.7, 0.8, 0.9])
+
+
+def test_extend_columns_wraps_around():
+    log = TransitionLog(TRANSITION_COLUMNS, capacity=5)
+    log.append(_row(0))
+    rows = [_row(i) for i in range(1, 8)]
+    with pytest.warns(RuntimeWarning):
+        log.extend_columns({name: [r[name] for r in rows] for name in log.names})
+    assert [r["from"] for r in log] == [3, 4, 5, 6, 7]
+    assert log.column("to", decode=True) == [r["to"] for r in rows[2:]]
+
+
+@pytest.mark.parametrize("fmt", ["npy", "parquet"])
+def test_spill_to_disk_keeps_every_row(tmp_path, fmt):
+    if fmt == "parquet":
+        pytest.importorskip("pyarrow")
+    log = TransitionLog(TRANSITION_COLUMNS, capacity=4, spill_dir=tmp_path, spill_format=fmt)
+    for i in range(11):
+        log.append(_row(i))
+    assert len(log.chunks) == 2
+    assert all(path.exists() for path in log.chunks)
+    assert len(log) == 11
+    assert log.dropped == 0
+    assert list(log) == [_row(i) for i in range(11)]
+    assert log[5] == _row(5)
+    assert len(log.column("from")) == 11
+
+
+def test_routing_engine_logs_columns():
+    lattice = LatticeBuilder().build_lattice()
+    engine = RoutingEngine(lattice, transition_log=TransitionLog(TRANSITION_COLUMNS, capacity=16))
+    packets = [{"location": 0, "confidence": 0.0} for _ in range(10)]
+    with pytest.warns(RuntimeWarning):
+        engine.run_batched(packets, max_steps=10, rng=0)
+    assert len(engine.transition_log) == 16
+    assert engine.transition_log.total == sum(engine.visit_counts.values())
+    assert set(engine.transition_log[0]) == set(TRANSITION_COLUMNS)
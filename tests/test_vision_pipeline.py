@@ -0,0 +1,63 @@
+import cv2
+import numpy as np
+import pytest
+
+from neuro_lattice.neuro_lattice.vision_agent import VisionAgent
+
+
+def _image(circle=True, triangle=True, size=256):
+    img = np.zeros((size, size, 3), dtype=np.uint8)
+    if circle:
+        cv2.circle(img, (80, 128), 40, (255, 255, 255), -1)
+    if triangle:
+        pts = np.array([[160, 80], [200, 180], [120, 180]], np.int32).reshape((-1, 1, 2))
+        cv2.fillPoly(img, [pts], (255, 255, 255))
+    return img
+
+
+IMAGES = [_image(), _image(triangle=False), _image(circle=False), _image(False, False)] * 3
+
+
+def test_pipeline_matches_single_image_detection():
+    expected = [sorted(VisionAgent(workers=1).detect_shapes(img)) for img in IMAGES]
+    got = [sorted(s) for s in VisionAgent(workers=4, max_in_flight=3).iter_detect(IMAGES)]
+    assert got == expected
+    assert expected[1] == ["circle"] and expected[3] == ["unknown"]
+
+
+def test_backpressure_bounds_frames_read_ahead():
+    pulled = []
+
+    def source():
+        for i, img in enumerate(IMAGES):
+            pulled.append(i)
+            yield img
+
+    agent = VisionAgent(workers=2, max_in_flight=2)
+    stream = agent.iter_detect(source())
+    next(stream)
+    assert len(pulled) <= agent.max_in_flight + 1
+    stream.close()
+
+
+def test_directory_source_packets(tmp_path):
+    for i, img in enumerate(IMAGES[:4]):
+        cv2.imwrite(str(tmp_path / f"frame{i}.png"), img)
+    (tmp_path / "notes.txt").write_text("ignored")
+
+    packets = list(VisionAgent(workers=2).stream_packets(tmp_path, start_id=10))
+    assert [p["frame"] for p in packets] == [0, 1, 2, 3]
+    assert [p["id"] for p in packets] == [10, 11, 12, 13]
+    assert all(p["location"] == "EC" for p in packets)
+    assert packets[3]["data"] == "Detected shapes: unknown"
+
+
+def test_video_source(tmp_path):
+    path = tmp_path / "clip.avi"
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), 5, (256, 256))
+    if not writer.isOpened():
+        pytest.skip("no video encoder available")
+    for img in IMAGES[:4]:
+        writer.write(img)
+    writer.release()
+    assert len(VisionAgent(workers=2).detect_batch(path)) == 4